@@ -1,15 +1,22 @@
 # multi_agent_planner.py (Final Version with Separate Flight Tables)
 
 from dotenv import load_dotenv
-import os, re
-import requests
+import os, re, sys, time
+import datetime
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
-import pandas as pd
 from amadeus import Client, ResponseError
 
-# --- LangChain Imports ---
-from langchain_community.chat_models import ChatOpenAI
-from langchain.agents import Tool, initialize_agent, AgentType 
+# Shared helpers live in the parent Agents/ folder
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.iata_index import resolve_city_code
+from common.offer_cache import get_offer_cache
+from common.weather_client import get_weather_client
+from common.agent_registry import get_agent, get_client
+from common.endpoints import amadeus_options
+from common.amadeus_gateway import get_amadeus_gateway
+from common.telemetry import get_callbacks, get_telemetry
+from common.llm_cache import get_llm_cache, llm_cache_markdown
 
 # -----------------------------
 # 1. SETUP & INITIALIZATION
@@ -21,8 +28,19 @@ AMADEUS_CLIENT_SECRET = os.getenv("AMADEUS_CLIENT_SECRET")
 WEATHER_API_KEY = os.getenv("WEATHER_API_KEY")
 
 # Initialize Clients & LLM 
-amadeus = Client(client_id=AMADEUS_CLIENT_ID, client_secret=AMADEUS_CLIENT_SECRET)
-llm = ChatOpenAI(model_name="gpt-4o-mini", temperature=0, openai_api_key=OPENAI_API_KEY)
+# Calls go through the gateway: rate limit, in-flight deduplication and retry on 429/5xx
+amadeus = get_amadeus_gateway(
+    get_client(Client, client_id=AMADEUS_CLIENT_ID, client_secret=AMADEUS_CLIENT_SECRET, **amadeus_options()))
+offer_cache = get_offer_cache()
+weather_client = get_weather_client(WEATHER_API_KEY)
+
+
+def get_llm():
+    """Shared LLM, imported and built on first use so LangChain stays out of cold start."""
+    from langchain_community.chat_models import ChatOpenAI
+
+    return get_client(ChatOpenAI, model_name="gpt-4o-mini", temperature=0, openai_api_key=OPENAI_API_KEY,
+                      cache=get_llm_cache("weekend_planner"))
 
 
 # -----------------------------
@@ -32,8 +50,7 @@ llm = ChatOpenAI(model_name="gpt-4o-mini", temperature=0, openai_api_key=OPENAI_
 def get_weather(city: str) -> str:
     """Get the current weather for a city in the world."""
     try:
-        url = f"https://api.openweathermap.org/data/2.5/weather?q={city}&appid={WEATHER_API_KEY}&units=metric"
-        data = requests.get(url).json()
+        data = weather_client.current(city)
 
         if data.get("cod") != 200:
             return f"❌ Weather API Error for {city.title()}: {data.get('message', 'Unknown error')}"
@@ -53,6 +70,8 @@ def get_flights(query: str) -> str:
     Find available flights. Input must be a string formatted like:
     'FROM: [Origin City] TO: [Destination City] DEPART: [YYYY-MM-DD] RETURN: [YYYY-MM-DD]'
     """
+    import pandas as pd  # only needed to render tables
+
     try:
         pattern = r"FROM:\s*(.+?)\s*TO:\s*(.+?)\s*DEPART:\s*(\d{4}-\d{2}-\d{2})\s*RETURN:\s*(\d{4}-\d{2}-\d{2})"
         m = re.search(pattern, query, re.IGNORECASE)
@@ -61,15 +80,15 @@ def get_flights(query: str) -> str:
 
         origin_city, dest_city, dep_date, ret_date = [g.strip() for g in m.groups()]
 
-        origin_res = amadeus.reference_data.locations.get(keyword=origin_city, subType="CITY").data
-        dest_res = amadeus.reference_data.locations.get(keyword=dest_city, subType="CITY").data
-        if not origin_res or not dest_res:
+        origin_iata = resolve_city_code(amadeus, origin_city)
+        dest_iata = resolve_city_code(amadeus, dest_city)
+        if not origin_iata or not dest_iata:
             return "❌ Could not find IATA code for flight origin or destination."
-        origin_iata = origin_res[0]["iataCode"]
-        dest_iata = dest_res[0]["iataCode"]
 
         kwargs = dict(originLocationCode=origin_iata, destinationLocationCode=dest_iata, departureDate=dep_date, adults=1, max=3, returnDate=ret_date)
-        res = amadeus.shopping.flight_offers_search.get(**kwargs).data
+        res = offer_cache.get_or_fetch(
+            "flight_offers", kwargs, lambda: amadeus.shopping.flight_offers_search.get(**kwargs).data
+        )
         if not res: return "⚠️ No flights found for the given route/date."
         
         # --- NEW LOGIC FOR SEPARATE TABLES ---
@@ -153,6 +172,8 @@ def get_hotels(query: str) -> str:
     Find hotels in a city. Input must be a string formatted like:
     'CITY: [City Name] CHECKIN: [YYYY-MM-DD] CHECKOUT: [YYYY-MM-DD]'
     """
+    import pandas as pd  # only needed to render tables
+
     try:
         pattern = r"CITY:\s*(.+?)\s*CHECKIN:\s*(\d{4}-\d{2}-\d{2})\s*CHECKOUT:\s*(\d{4}-\d{2}-\d{2})"
         m = re.search(pattern, query, re.IGNORECASE)
@@ -161,20 +182,23 @@ def get_hotels(query: str) -> str:
 
         city, check_in, check_out = [g.strip() for g in m.groups()]
 
-        loc = amadeus.reference_data.locations.get(keyword=city, subType="CITY").data
-        if not loc:
+        city_code = resolve_city_code(amadeus, city)
+        if not city_code:
             return f"❌ Could not find city '{city}' for lodging search."
-        city_code = loc[0].get("iataCode")
 
-        hotels_resp = amadeus.reference_data.locations.hotels.by_city.get(cityCode=city_code)
-        hotel_ids = [h["hotelId"] for h in getattr(hotels_resp, "data", [])[:3] if "hotelId" in h]
+        hotels = offer_cache.get_or_fetch(
+            "hotel_list", {"cityCode": city_code},
+            lambda: getattr(amadeus.reference_data.locations.hotels.by_city.get(cityCode=city_code), "data", []),
+        )
+        hotel_ids = [h["hotelId"] for h in hotels[:3] if "hotelId" in h]
 
         if not hotel_ids: return f"⚠️ No top hotels found for **{city}**."
         
-        offers_resp = amadeus.shopping.hotel_offers_search.get(
-            hotelIds=",".join(hotel_ids), checkInDate=check_in, checkOutDate=check_out, adults=1 
+        offer_params = dict(hotelIds=",".join(hotel_ids), checkInDate=check_in, checkOutDate=check_out, adults=1)
+        offers = offer_cache.get_or_fetch(
+            "hotel_offers", offer_params,
+            lambda: getattr(amadeus.shopping.hotel_offers_search.get(**offer_params), "data", []),
         )
-        offers = getattr(offers_resp, "data", [])
 
         hotel_list = []
         for offer in offers:
@@ -208,56 +232,143 @@ def get_hotels(query: str) -> str:
 # 3. INITIALIZE THE MASTER MULTI-AGENT
 # -----------------------------
 
-# Define Tools - Tool names use underscores
-tools = [
-    Tool(
-        name="weather_info", 
-        func=get_weather,
-        description="""
-        Use this tool FIRST. Useful for finding the current weather of a city. 
-        The input MUST be only the city name, e.g., 'Paris'.
-        """
-    ),
-    Tool(
-        name="flight_finder", 
-        func=get_flights,
-        description="""
-        Use this tool SECOND. Useful for finding flights. 
-        Input MUST be in the exact format: 'FROM: [Origin City] TO: [Destination City] DEPART: [YYYY-MM-DD] RETURN: [YYYY-MM-DD]'.
-        """
-    ),
-    Tool(
-        name="hotel_finder", 
-        func=get_hotels,
-        description="""
-        Use this tool THIRD. Useful for finding hotels. 
-        Input MUST be in the exact format: 'CITY: [City Name] CHECKIN: [YYYY-MM-DD] CHECKOUT: [YYYY-MM-DD]'.
-        """
-    ),
-]
-
-# Initialize the Master Agent - AgentType switched to OPENAI_FUNCTIONS
-master_agent = initialize_agent(
-    tools=tools,
-    llm=llm,
-    agent=AgentType.OPENAI_FUNCTIONS, 
-    verbose=True, 
-    handle_parsing_errors=True,
-)
+def load_master_agent():
+    """Master agent, built once per process the first time Master Agent mode is used."""
+    from langchain.agents import Tool, initialize_agent, AgentType
+
+    llm = get_llm()
+
+    # Define Tools - Tool names use underscores
+    tools = [
+        Tool(
+            name="weather_info", 
+            func=get_weather,
+            description="""
+            Use this tool FIRST. Useful for finding the current weather of a city. 
+            The input MUST be only the city name, e.g., 'Paris'.
+            """
+        ),
+        Tool(
+            name="flight_finder", 
+            func=get_flights,
+            description="""
+            Use this tool SECOND. Useful for finding flights. 
+            Input MUST be in the exact format: 'FROM: [Origin City] TO: [Destination City] DEPART: [YYYY-MM-DD] RETURN: [YYYY-MM-DD]'.
+            """
+        ),
+        Tool(
+            name="hotel_finder", 
+            func=get_hotels,
+            description="""
+            Use this tool THIRD. Useful for finding hotels. 
+            Input MUST be in the exact format: 'CITY: [City Name] CHECKIN: [YYYY-MM-DD] CHECKOUT: [YYYY-MM-DD]'.
+            """
+        ),
+    ]
+
+    # Initialize the Master Agent - AgentType switched to OPENAI_FUNCTIONS
+    return get_agent("weekend_planner", {"llm": id(llm), "tools": [t.name for t in tools]}, lambda: initialize_agent(
+        tools=tools,
+        llm=llm,
+        agent=AgentType.OPENAI_FUNCTIONS, 
+        handle_parsing_errors=True,
+    ))
 
 
 # -----------------------------
-# 4. STREAMLIT UI & AGENT EXECUTION
+# 4. PIPELINE MODE (CONCURRENT FAN-OUT)
 # -----------------------------
 
+def run_tools_concurrently(origin: str, destination: str, dep_date_str: str, ret_date_str: str) -> dict:
+    """
+    Runs the weather, flight and hotel tools at the same time. Every input they need is
+    already in the form, so there is no reason to wait for the agent to sequence them.
+    Returns the markdown of each tool plus the wall-clock time of each call.
+    """
+    jobs = {
+        "weather": (get_weather, destination),
+        "flights": (get_flights, f"FROM: {origin} TO: {destination} DEPART: {dep_date_str} RETURN: {ret_date_str}"),
+        "hotels": (get_hotels, f"CITY: {destination} CHECKIN: {dep_date_str} CHECKOUT: {ret_date_str}"),
+    }
+
+    def _timed(func, arg):
+        start = time.perf_counter()
+        output = func(arg)
+        return output, time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        futures = {name: pool.submit(_timed, func, arg) for name, (func, arg) in jobs.items()}
+        results = {name: future.result() for name, future in futures.items()}
+
+    return {
+        "outputs": {name: output for name, (output, _) in results.items()},
+        "timings": {name: elapsed for name, (_, elapsed) in results.items()},
+    }
+
+
+def compose_plan(origin: str, destination: str, dep_date_str: str, ret_date_str: str, outputs: dict) -> str:
+    """Single LLM call that turns the three tool outputs into the final markdown plan."""
+    compose_prompt = f"""
+    Write a travel plan from {origin} to {destination} ({dep_date_str} to {ret_date_str}) using ONLY the tool outputs below.
+
+    **Final Response Structure (CRITICAL):**
+    The final answer must be a single, cohesive markdown response. Start with a short summary introduction, then include
+    the weather section, the outbound and return flight tables (two separate tables) and the Lodging Options table exactly
+    as provided, keeping the hotel name, price and address. If a tool reported an error, mention it briefly instead of inventing data.
+
+    --- WEATHER TOOL OUTPUT ---
+    {outputs["weather"]}
+
+    --- FLIGHT TOOL OUTPUT ---
+    {outputs["flights"]}
+
+    --- HOTEL TOOL OUTPUT ---
+    {outputs["hotels"]}
+    """
+    return get_llm().invoke(compose_prompt, config={"callbacks": get_callbacks("weekend_planner")}).content
+
+
+def plan_trip_pipeline(origin: str, destination: str, dep_date_str: str, ret_date_str: str) -> dict:
+    """Fan out the three tools concurrently, then compose the plan with one LLM call."""
+    start = time.perf_counter()
+    fan_out = run_tools_concurrently(origin, destination, dep_date_str, ret_date_str)
+    tools_done = time.perf_counter()
+    plan = compose_plan(origin, destination, dep_date_str, ret_date_str, fan_out["outputs"])
+    end = time.perf_counter()
+
+    timings = dict(fan_out["timings"])
+    timings["tools (wall clock)"] = tools_done - start
+    timings["compose (LLM)"] = end - tools_done
+    timings["total"] = end - start
+    return {"plan": plan, "timings": timings}
+
+
+# -----------------------------
+# 5. STREAMLIT UI & AGENT EXECUTION
+# -----------------------------
+
+def render_sidebar():
+    # Also called before st.stop() in pipeline mode, which skips the end of the script
+    st.sidebar.markdown(offer_cache.stats_markdown())
+    st.sidebar.markdown(weather_client.stats_markdown())
+    st.sidebar.markdown(amadeus.stats_markdown())
+    st.sidebar.markdown(llm_cache_markdown("weekend_planner"))
+    get_telemetry().render_sidebar(st, "weekend_planner")
+
+
 st.title("✈️🏨 Weekend Planner 🤖")
-st.markdown("This uses a single **Master Agent (LLM)** to decide the sequence and inputs for the three specialized tools.")
+st.markdown(
+    "**Pipeline** mode runs the three specialized tools concurrently and composes the plan with a single LLM call. "
+    "**Master Agent** mode lets the LLM decide the sequence and inputs for the tools (slower, kept as a fallback)."
+)
+
+planning_mode = st.radio("Planning mode:", ["Pipeline (concurrent)", "Master Agent"], horizontal=True)
 
 # Input fields
 current_city = st.text_input("1. Your Current City (for flight origin):", "Delhi")
 dest_city = st.text_input("2. Destination City:", "Paris")
-default_dep_date = pd.to_datetime('today').date()
-default_ret_date = pd.to_datetime('today').date() + pd.Timedelta(days=2) 
+default_dep_date = datetime.date.today()
+default_ret_date = datetime.date.today() + datetime.timedelta(days=2)
 dep_date = st.date_input("3. Departure Date", value=default_dep_date)
 ret_date = st.date_input("4. Return Date", value=default_ret_date)
 
@@ -269,6 +380,23 @@ if st.button("🚀 Plan Trip (Multi-Agent)"):
         dep_date_str = dep_date.strftime("%Y-%m-%d")
         ret_date_str = ret_date.strftime("%Y-%m-%d")
 
+        if planning_mode.startswith("Pipeline"):
+            st.subheader("Pipeline Execution")
+            with st.spinner("Fetching weather, flights and hotels concurrently..."):
+                try:
+                    result = plan_trip_pipeline(current_city, dest_city, dep_date_str, ret_date_str)
+
+                    st.markdown("---")
+                    st.subheader("✅ Final Trip Plan Summary")
+                    st.markdown(result["plan"])
+                    with st.expander("⏱️ Timings"):
+                        st.table({"Step": list(result["timings"]), "Seconds": [f"{t:.2f}" for t in result["timings"].values()]})
+                    st.balloons()
+                except Exception as e:
+                    st.error(f"Pipeline failed, try the Master Agent mode. Error: {e}")
+            render_sidebar()
+            st.stop()
+
         # 2. Construct the single, complex prompt for the Master Agent
         complex_prompt = f"""
         Execute a full travel plan based on the following steps and details, ensuring the final output is explanatory and structured using the information provided by the tools.
@@ -289,14 +417,16 @@ if st.button("🚀 Plan Trip (Multi-Agent)"):
         """
         
         st.subheader("Master Agent Execution Log")
-        with st.spinner("Master Agent is reasoning and delegating tasks... (Check your terminal for verbose output)"):
+        with st.spinner("Master Agent is reasoning and delegating tasks... (step timings appear in the sidebar)"):
             
             try:
-                final_response = master_agent.run(complex_prompt)
+                final_response = load_master_agent().run(complex_prompt, callbacks=get_callbacks("weekend_planner"))
                 
                 st.markdown("---")
                 st.subheader("✅ Final Trip Plan Summary")
                 st.write(final_response) 
                 st.balloons()
             except Exception as e:
-                st.error(f"Master Agent failed to complete the task. Please check your API keys and the terminal output. Error: {e}")
\ No newline at end of file
+                st.error(f"Master Agent failed to complete the task. Please check your API keys and the Telemetry panel. Error: {e}")
+
+render_sidebar()
@@ -0,0 +1,496 @@
+# agent_service.py
+"""
+Headless ASGI service for the flight, lodging, weather, to-do and KnowledgeBot agents.
+
+The Streamlit apps serve one user per script run and block the script thread on `agent.run`.
+This module exposes the same agents (same tools from common/travel_tools.py and
+common/todo_tools.py, same prompts, LLM cache and telemetry) as HTTP endpoints for other services:
+
+    uvicorn agent_service:app --app-dir Agents --port 8080
+
+    GET  /health
+    GET  /metrics                     Prometheus text: agent telemetry, service gauges, Amadeus calls
+    POST /agents/{name}               {"input": "...", "session_id": "..."} -> {"output": ..., "elapsed_ms": ...}
+    POST /agents/{name}/stream        same body, NDJSON events (action / observation / token / output)
+
+with {name} one of flight, lodging, weather, todo, knowledgebot. `session_id` only matters for the
+conversational agents (to-do memory, KnowledgeBot history). The to-do *list* is not per session:
+like the Streamlit app, /agents/todo manages one global list (AGENT_SERVICE_TODO_DB) shared by
+every caller, so one client's "clear my list" clears it for all of them.
+
+- agents run through `ainvoke` / `astream` on one event loop; the blocking tools (Amadeus,
+  OpenWeather, SQLite) run in the loop's default thread pool, enlarged to AGENT_SERVICE_THREADS;
+- every ChatOpenAI shares one pooled `httpx.AsyncClient` (AGENT_SERVICE_LLM_CONNECTIONS);
+- each endpoint runs at most AGENT_SERVICE_CONCURRENCY requests at once (per endpoint:
+  AGENT_SERVICE_CONCURRENCY_<NAME>) and queues up to AGENT_SERVICE_MAX_QUEUE more. Beyond that it
+  answers 503 with Retry-After instead of piling up work; a request running longer than
+  AGENT_SERVICE_TIMEOUT seconds gets a 504.
+
+No web framework is needed: `app` is a plain ASGI callable. Any ASGI server runs it (uvicorn,
+hypercorn). benchmarks/check_service.py checks its responses (200/400/404/405/413/503/504)
+in-process against the local stand-ins; benchmarks/bench_service.py load-tests it.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+
+from common.agent_registry import get_agent, get_client, get_or_create
+from common.endpoints import amadeus_options
+from common.llm_cache import get_llm_cache
+from common.offer_cache import get_offer_cache
+from common.prompt_registry import load_prompt
+from common.telemetry import get_callbacks, get_telemetry
+from common.todo_store import TodoStore
+from common.todo_tools import TodoTools
+from common.travel_tools import FLIGHT_TOOL, HOTEL_TOOL, WEATHER_TOOL, search_flights, search_hotels, weather_report
+from common.weather_client import get_weather_client
+
+# KnowledgeBot lives next to Agents/, not in common/
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "KnowledgeBot"))
+
+# -----------------------------
+# Configuration
+# -----------------------------
+load_dotenv()
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+AMADEUS_CLIENT_ID = os.getenv("AMADEUS_CLIENT_ID")
+AMADEUS_CLIENT_SECRET = os.getenv("AMADEUS_CLIENT_SECRET")
+WEATHER_API_KEY = os.getenv("WEATHER_API_KEY")
+
+CONCURRENCY = int(os.getenv("AGENT_SERVICE_CONCURRENCY", "50"))
+MAX_QUEUE = int(os.getenv("AGENT_SERVICE_MAX_QUEUE", "200"))
+TIMEOUT = float(os.getenv("AGENT_SERVICE_TIMEOUT", "120"))
+THREADS = int(os.getenv("AGENT_SERVICE_THREADS", "64"))
+LLM_CONNECTIONS = int(os.getenv("AGENT_SERVICE_LLM_CONNECTIONS", "100"))
+MAX_SESSIONS = int(os.getenv("AGENT_SERVICE_MAX_SESSIONS", "1000"))
+TODO_DB = os.getenv("AGENT_SERVICE_TODO_DB", "todo_list.sqlite3")
+KNOWLEDGEBOT_HISTORY_TOKENS = int(os.getenv("KNOWLEDGEBOT_HISTORY_TOKENS", "2000"))
+MAX_BODY = 64 * 1024
+
+KNOWLEDGEBOT_SYSTEM_MESSAGE = "You are KnowledgeBot, a helpful and professional AI assistant."
+
+
+# -----------------------------
+# Backpressure
+# -----------------------------
+class Overloaded(Exception):
+    pass
+
+
+class EndpointLimiter:
+    """At most `concurrency` requests running and `max_queue` waiting; anything beyond is rejected."""
+
+    def __init__(self, name: str, concurrency: int, max_queue: int):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    async def __aenter__(self):
+        if self.semaphore.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise Overloaded(self.name)
+        self.waiting += 1
+        try:
+            await self.semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        self.in_flight -= 1
+        self.semaphore.release()
+
+
+class SessionStore:
+    """Per-session state (memory, history) for the conversational agents, least recently used dropped first."""
+
+    def __init__(self, factory, max_sessions: int = MAX_SESSIONS):
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, session_id: str):
+        """(state, lock) for the session; the lock keeps one session's turns in order."""
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            entry = (self.factory(), asyncio.Lock())
+            self._sessions[session_id] = entry
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(session_id)
+        return entry
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+# -----------------------------
+# Shared clients
+# -----------------------------
+_http_pool = None
+_pool_loop = None
+_executor_loops = set()
+
+
+def _configure_loop() -> None:
+    """Bigger default thread pool for the blocking tools; done once per event loop."""
+    loop = asyncio.get_running_loop()
+    if id(loop) not in _executor_loops:
+        loop.set_default_executor(ThreadPoolExecutor(THREADS, thread_name_prefix="agent-tool"))
+        _executor_loops.add(id(loop))
+
+
+def llm_pool():
+    """One pooled async HTTP client for every ChatOpenAI in this process (per event loop)."""
+    global _http_pool, _pool_loop
+    import httpx
+
+    loop = asyncio.get_running_loop()
+    if _http_pool is None or _pool_loop is not loop:
+        _http_pool = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=LLM_CONNECTIONS, max_keepalive_connections=LLM_CONNECTIONS),
+            timeout=httpx.Timeout(60.0, connect=5.0),
+        )
+        _pool_loop = loop
+    return _http_pool
+
+
+def chat_model(namespace: Optional[str], pool, **kwargs):
+    """Shared ChatOpenAI on the pooled client; `namespace` None for sampled (uncacheable) models."""
+    from langchain_openai import ChatOpenAI
+
+    return get_client(ChatOpenAI, openai_api_key=OPENAI_API_KEY, http_async_client=pool,
+                      cache=get_llm_cache(namespace) if namespace else None, **kwargs)
+
+
+def amadeus():
+    """Shared Amadeus client behind the rate-limiting, deduplicating gateway."""
+    from amadeus import Client
+    from common.amadeus_gateway import get_amadeus_gateway
+
+    return get_amadeus_gateway(
+        get_client(Client, client_id=AMADEUS_CLIENT_ID, client_secret=AMADEUS_CLIENT_SECRET, **amadeus_options()))
+
+
+def todo_store() -> TodoStore:
+    """The one to-do list behind /agents/todo, shared by every session (see the module docstring)."""
+    return get_or_create("todo_store", {"path": TODO_DB}, lambda: TodoStore(TODO_DB))
+
+
+# -----------------------------
+# Tools (blocking; LangChain runs them in the default thread pool)
+# -----------------------------
+def get_flights(query: str) -> str:
+    return search_flights(amadeus(), get_offer_cache(), query)[0]
+
+
+def get_hotels(query: str) -> str:
+    return search_hotels(amadeus(), get_offer_cache(), query)
+
+
+def get_weather(city: str) -> str:
+    return weather_report(get_weather_client(WEATHER_API_KEY), city)
+
+
+# -----------------------------
+# Agents
+# -----------------------------
+def _tool_agent(name: str, tool_spec: dict, func, pool):
+    from langchain.agents import Tool, initialize_agent, AgentType
+
+    llm = chat_model(name, pool, model="gpt-3.5-turbo", temperature=0)
+    tool = Tool(func=func, **tool_spec)
+    return get_agent(f"service:{name}", {"llm": id(llm), "tools": [tool.name]}, lambda: initialize_agent(
+        tools=[tool],
+        llm=llm,
+        agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
+        handle_parsing_errors=True,
+    ))
+
+
+def _todo_sessions(pool) -> SessionStore:
+    """The ReAct runnable is shared; each session gets its own executor and window memory."""
+    from langchain.agents import create_react_agent, AgentExecutor
+    from langchain.memory import ConversationBufferWindowMemory
+
+    llm = chat_model("todo", pool, model="gpt-3.5-turbo", temperature=0)
+    tools = TodoTools(todo_store()).as_tools()
+    agent = create_react_agent(llm=llm, tools=tools, prompt=load_prompt("react-chat"))
+
+    def new_session():
+        memory = ConversationBufferWindowMemory(memory_key="chat_history", k=5, return_messages=True)
+        return AgentExecutor(agent=agent, tools=tools, handle_parsing_errors=True, memory=memory)
+
+    return get_or_create("service:todo_sessions", {"llm": id(llm)}, lambda: SessionStore(new_session))
+
+
+def _knowledgebot_sessions(pool) -> SessionStore:
+    from langchain_core.messages import SystemMessage
+    from history_manager import ConversationHistory
+
+    summarizer = chat_model("knowledgebot", pool, model="gpt-4o-mini", temperature=0)
+
+    def new_session():
+        return ConversationHistory(SystemMessage(content=KNOWLEDGEBOT_SYSTEM_MESSAGE), summarizer=summarizer,
+                                   token_budget=KNOWLEDGEBOT_HISTORY_TOKENS)
+
+    return get_or_create("service:knowledgebot_sessions", {"llm": id(summarizer)}, lambda: SessionStore(new_session))
+
+
+AGENT_BUILDERS = {
+    "flight": lambda pool: _tool_agent("flight", FLIGHT_TOOL, get_flights, pool),
+    "lodging": lambda pool: _tool_agent("lodging", HOTEL_TOOL, get_hotels, pool),
+    "weather": lambda pool: _tool_agent("weather", WEATHER_TOOL, get_weather, pool),
+    "todo": _todo_sessions,
+    "knowledgebot": _knowledgebot_sessions,
+}
+limiters: Dict[str, EndpointLimiter] = {
+    name: EndpointLimiter(name, int(os.getenv(f"AGENT_SERVICE_CONCURRENCY_{name.upper()}", CONCURRENCY)), MAX_QUEUE)
+    for name in AGENT_BUILDERS
+}
+
+
+async def load(name: str):
+    """Build the agent off the event loop (first call imports LangChain); cached per process afterwards."""
+    pool = llm_pool()
+    return await asyncio.to_thread(AGENT_BUILDERS[name], pool)
+
+
+# -----------------------------
+# Running agents
+# -----------------------------
+async def run_agent(name: str, text: str, session_id: str) -> str:
+    agent = await load(name)
+    config = {"callbacks": get_callbacks(name)}
+
+    if name == "knowledgebot":
+        history, lock = agent.get(session_id)
+        async with lock:
+            llm = chat_model(None, llm_pool(), model="gpt-4o-mini", temperature=0.6)
+            reply = await llm.ainvoke(history.build_prompt() + [_human(text)], config=config)
+            await asyncio.to_thread(_record_turn, history, text, reply.content)
+            return reply.content
+
+    if name == "todo":
+        agent, lock = agent.get(session_id)
+        async with lock:
+            result = await agent.ainvoke({"input": text}, config=config)
+    else:
+        result = await agent.ainvoke({"input": text}, config=config)
+    return result.get("output", "")
+
+
+async def stream_agent(name: str, text: str, session_id: str):
+    """NDJSON events as the agent works: tool actions and observations, tokens, then the output."""
+    agent = await load(name)
+    config = {"callbacks": get_callbacks(name)}
+
+    if name == "knowledgebot":
+        history, lock = agent.get(session_id)
+        async with lock:
+            llm = chat_model(None, llm_pool(), model="gpt-4o-mini", temperature=0.6, streaming=True)
+            parts = []
+            async for chunk in llm.astream(history.build_prompt() + [_human(text)], config=config):
+                if chunk.content:
+                    parts.append(chunk.content)
+                    yield {"type": "token", "text": chunk.content}
+            await asyncio.to_thread(_record_turn, history, text, "".join(parts))
+            yield {"type": "output", "output": "".join(parts)}
+        return
+
+    lock = None
+    if name == "todo":
+        agent, lock = agent.get(session_id)
+    async with (lock or _NO_LOCK):
+        async for step in agent.astream({"input": text}, config=config):
+            for action in step.get("actions", []):
+                yield {"type": "action", "tool": action.tool, "input": str(action.tool_input)}
+            for item in step.get("steps", []):
+                yield {"type": "observation", "tool": item.action.tool, "output": str(item.observation)}
+            if "output" in step:
+                yield {"type": "output", "output": step["output"]}
+
+
+class _NoLock:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+_NO_LOCK = _NoLock()
+
+
+def _human(text: str):
+    from langchain_core.messages import HumanMessage
+    return HumanMessage(content=text)
+
+
+def _ai(text: str):
+    from langchain_core.messages import AIMessage
+    return AIMessage(content=text)
+
+
+def _record_turn(history, text: str, reply: str) -> None:
+    # Both messages are added only once the reply is complete: a timeout or upstream error must
+    # not leave an unanswered user message in the session history.
+    history.append(_human(text))
+    history.append(_ai(reply))
+
+
+# -----------------------------
+# Metrics
+# -----------------------------
+requests_total: Dict[tuple, int] = defaultdict(int)
+
+
+def service_metrics() -> str:
+    lines = [
+        "# TYPE agent_service_in_flight gauge",
+        *(f'agent_service_in_flight{{endpoint="{n}"}} {l.in_flight}' for n, l in limiters.items()),
+        "# TYPE agent_service_queued gauge",
+        *(f'agent_service_queued{{endpoint="{n}"}} {l.waiting}' for n, l in limiters.items()),
+        "# TYPE agent_service_rejected_total counter",
+        *(f'agent_service_rejected_total{{endpoint="{n}"}} {l.rejected}' for n, l in limiters.items()),
+        "# TYPE agent_service_requests_total counter",
+        *(f'agent_service_requests_total{{endpoint="{n}",status="{s}"}} {c}'
+          for (n, s), c in sorted(requests_total.items())),
+    ]
+    return "\n".join(lines) + "\n"
+
+
+# -----------------------------
+# ASGI plumbing
+# -----------------------------
+async def _send(send, status: int, body: bytes, content_type: str, headers=()) -> None:
+    await send({"type": "http.response.start", "status": status, "headers": [
+        (b"content-type", content_type.encode()), (b"content-length", str(len(body)).encode()), *headers]})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_json(send, status: int, payload: dict, headers=()) -> None:
+    await _send(send, status, json.dumps(payload).encode(), "application/json", headers)
+
+
+async def _read_body(receive) -> Optional[bytes]:
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if len(body) > MAX_BODY:
+            return None
+        if not message.get("more_body"):
+            return body
+
+
+async def _lifespan(receive, send) -> None:
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            _configure_loop()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            if _http_pool is not None:
+                await _http_pool.aclose()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        return await _lifespan(receive, send)
+    if scope["type"] != "http":
+        return
+    _configure_loop()  # servers and test transports that skip lifespan
+
+    method, path = scope["method"], scope["path"].rstrip("/") or "/"
+    if method == "GET" and path == "/health":
+        return await _send_json(send, 200, {"status": "ok", "agents": sorted(AGENT_BUILDERS)})
+    if method == "GET" and path == "/metrics":
+        text = get_telemetry().prometheus_text() + service_metrics()
+        if AMADEUS_CLIENT_ID:
+            text += amadeus().prometheus_text()
+        return await _send(send, 200, text.encode(), "text/plain; version=0.0.4")
+
+    parts = path.strip("/").split("/")
+    if len(parts) not in (2, 3) or parts[0] != "agents" or (len(parts) == 3 and parts[2] != "stream"):
+        return await _send_json(send, 404, {"error": f"unknown path {path}"})
+    name, streaming = parts[1], len(parts) == 3
+    if name not in AGENT_BUILDERS:
+        return await _send_json(send, 404, {"error": f"unknown agent '{name}'", "agents": sorted(AGENT_BUILDERS)})
+    if method != "POST":
+        return await _send_json(send, 405, {"error": "use POST"}, [(b"allow", b"POST")])
+
+    body = await _read_body(receive)
+    if body is None:
+        return await _send_json(send, 413, {"error": "request body too large"})
+    try:
+        request = json.loads(body or b"{}")
+        text = str(request["input"]).strip()
+        session_id = str(request.get("session_id") or "default")
+    except (ValueError, KeyError, TypeError):
+        return await _send_json(send, 400, {"error": 'expected a JSON body like {"input": "...", "session_id": "..."}'})
+    if not text:
+        return await _send_json(send, 400, {"error": "input is empty"})
+
+    status = 500
+    try:
+        async with limiters[name]:
+            if streaming:
+                status = 200
+                return await _stream(send, name, text, session_id)
+            start = time.perf_counter()
+            output = await asyncio.wait_for(run_agent(name, text, session_id), TIMEOUT)
+            status = 200
+            await _send_json(send, 200, {"agent": name, "output": output,
+                                         "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)})
+    except Overloaded:
+        status = 503
+        await _send_json(send, 503, {"error": f"{name} is at capacity, retry shortly"}, [(b"retry-after", b"1")])
+    except asyncio.TimeoutError:
+        status = 504
+        await _send_json(send, 504, {"error": f"{name} did not finish within {TIMEOUT:.0f}s"})
+    except Exception as e:
+        status = 500
+        await _send_json(send, 500, {"error": f"{type(e).__name__}: {e}"})
+    finally:
+        requests_total[(name, status)] += 1
+
+
+async def _stream(send, name: str, text: str, session_id: str) -> None:
+    """Chunked NDJSON response; failures after the headers are sent become an "error" event."""
+    await send({"type": "http.response.start", "status": 200, "headers": [
+        (b"content-type", b"application/x-ndjson"), (b"cache-control", b"no-cache")]})
+    deadline = time.monotonic() + TIMEOUT
+    events = stream_agent(name, text, session_id).__aiter__()
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(events.__anext__(), max(0.0, deadline - time.monotonic()))
+            except StopAsyncIteration:
+                break
+            await _send_event(send, event)
+    except asyncio.TimeoutError:
+        await _send_event(send, {"type": "error", "error": f"{name} did not finish within {TIMEOUT:.0f}s"})
+    except Exception as e:
+        await _send_event(send, {"type": "error", "error": f"{type(e).__name__}: {e}"})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _send_event(send, event: dict) -> None:
+    await send({"type": "http.response.body", "body": json.dumps(event).encode() + b"\n", "more_body": True})
@@ -1,8 +1,10 @@
 from dotenv import load_dotenv
 import os
-from langchain_openai import ChatOpenAI
-from langchain.agents import Tool, initialize_agent, AgentType
 import streamlit as st
+from common.math_engine import evaluate_expression, evaluate_task, format_number
+from common.agent_registry import get_agent, get_client
+from common.telemetry import get_callbacks, get_telemetry
+from common.llm_cache import get_llm_cache, llm_cache_markdown
 
 # Load API key
 load_dotenv()
@@ -11,30 +13,31 @@ api_key = os.getenv("OPENAI_API_KEY")
 # Tool
 def calculator_tool(query: str) -> str:
     try:
-        a, operator, b = query.split()
-        a, b = float(a), float(b)
-        if operator == '+':
-            return str(a + b)
-        elif operator == '-':
-            return str(a - b)
-        elif operator == '*':
-            return str(a * b)
-        elif operator == '/':
-            return str(a / b)
-        else:
-            return "Error: Invalid operator"
-    except:
-        return "Error: Use format 'number operator number'"
-
-tools = [
-    Tool(name="Calculator", func=calculator_tool, description="Perform basic arithmetic operations")
-]
-
-# LLM
-llm = ChatOpenAI(model="gpt-3.5-turbo", temperature=0, openai_api_key=api_key)
-
-# Initialize agent
-agent = initialize_agent(tools, llm, agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION, verbose=True)
+        return format_number(evaluate_expression(query))
+    except ZeroDivisionError:
+        return "Error: Division by zero"
+    except Exception:
+        return "Error: Input must be an arithmetic expression, e.g. '(12 * 12) + 5' or 'sqrt(16) ^ 2'"
+
+def load_agent():
+    """LLM + agent, built once per process on first use (LangChain is only imported when needed)."""
+    from langchain_openai import ChatOpenAI
+    from langchain.agents import Tool, initialize_agent, AgentType
+
+    tools = [
+        Tool(
+            name="Calculator",
+            func=calculator_tool,
+            description="Evaluate a full arithmetic expression in one step. Supports + - * / % ^, parentheses and functions like sqrt, log, sin.",
+        )
+    ]
+    llm = get_client(ChatOpenAI, model="gpt-3.5-turbo", temperature=0, openai_api_key=api_key,
+                     cache=get_llm_cache("calculator"))
+    return get_agent(
+        "calculator",
+        {"llm": id(llm), "tools": [t.name for t in tools], "agent": AgentType.ZERO_SHOT_REACT_DESCRIPTION},
+        lambda: initialize_agent(tools, llm, agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION),
+    )
 
 # Streamlit UI
 st.title("🧮 Genius Calculator Agent")
@@ -44,5 +47,14 @@ st.subheader("Your friendly assistant to crunch numbers and solve arithmetic tas
 task = st.text_input("💡 Enter your math task (e.g., '12 * 12' or '20 + 5' or 12 * 12 and then add 5):")
 
 if task:
-    response = agent.invoke(task)
-    st.success(f"✨ Results:\n {response}")
+    # Fast path: pure arithmetic is evaluated locally, the agent is only used for everything else
+    result = evaluate_task(task)
+    if result is not None:
+        st.success(f"✨ Results:\n {format_number(result)}")
+        st.caption("⚡ Computed locally (no LLM call).")
+    else:
+        response = load_agent().invoke(task, config={"callbacks": get_callbacks("calculator")})
+        st.success(f"✨ Results:\n {response}")
+
+st.sidebar.markdown(llm_cache_markdown("calculator"))
+get_telemetry().render_sidebar(st, "calculator")
@@ -0,0 +1 @@
+"""Shared helpers used by the Streamlit agent apps in this folder."""
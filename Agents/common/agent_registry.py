@@ -0,0 +1,88 @@
+# agent_registry.py
+"""
+Process-wide registry for LLM clients, API clients and agents.
+
+Streamlit re-executes the whole script on every widget interaction, so building `ChatOpenAI`, the
+Amadeus client, `SerpAPIWrapper` and `initialize_agent(...)` at module level meant paying for all of
+it again on every click. The helpers here build each object once per process and hand out the
+cached instance afterwards. Keys include the full configuration (class, model, parameters, hashed
+credentials), so changing a setting builds a new instance instead of returning a stale one.
+Creation is guarded by a per-key lock, so concurrent sessions never build the same object twice.
+"""
+
+import hashlib
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+_instances: Dict[Tuple, Any] = {}
+_key_locks: Dict[Tuple, threading.Lock] = {}
+_registry_lock = threading.Lock()
+stats = {"hits": 0, "builds": 0, "build_seconds": 0.0}
+
+# Config values that must never end up in a key (or a repr) in clear text
+_SECRET_MARKERS = ("key", "secret", "token", "password")
+
+
+def _freeze(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, type):
+        return f"{value.__module__}.{value.__qualname__}"
+    if callable(value):
+        return f"{getattr(value, '__module__', '')}.{getattr(value, '__qualname__', repr(value))}"
+    return value if isinstance(value, Hashable) else repr(value)
+
+
+def _config_key(kind: str, config: Dict[str, Any]) -> Tuple:
+    safe = {}
+    for name, value in config.items():
+        if isinstance(value, str) and any(marker in name.lower() for marker in _SECRET_MARKERS):
+            value = hashlib.sha256(value.encode()).hexdigest()[:16]
+        safe[name] = value
+    return (kind, _freeze(safe))
+
+
+def get_or_create(kind: str, config: Dict[str, Any], factory: Callable[[], Any]) -> Any:
+    """Return the instance registered for (kind, config), calling `factory()` only the first time."""
+    key = _config_key(kind, config)
+    instance = _instances.get(key)
+    if instance is not None:
+        stats["hits"] += 1
+        return instance
+
+    with _registry_lock:
+        lock = _key_locks.setdefault(key, threading.Lock())
+    with lock:
+        instance = _instances.get(key)
+        if instance is None:
+            start = time.perf_counter()
+            instance = factory()
+            stats["build_seconds"] += time.perf_counter() - start
+            stats["builds"] += 1
+            _instances[key] = instance
+        else:
+            stats["hits"] += 1
+    return instance
+
+
+def get_client(cls: type, **kwargs) -> Any:
+    """Shared instance of `cls(**kwargs)`: ChatOpenAI, amadeus.Client, SerpAPIWrapper, ..."""
+    return get_or_create(f"client:{cls.__module__}.{cls.__qualname__}", kwargs, lambda: cls(**kwargs))
+
+
+def get_agent(name: str, config: Dict[str, Any], build: Callable[[], Any]) -> Any:
+    """
+    Shared agent for `name`. `config` should hold everything the agent depends on (model, tool
+    names, agent type, ...) so a configuration change produces a fresh agent.
+    """
+    return get_or_create(f"agent:{name}", config, build)
+
+
+def clear() -> None:
+    """Drop every cached instance (tests, benchmarks, key rotation)."""
+    with _registry_lock:
+        _instances.clear()
+        _key_locks.clear()
@@ -0,0 +1,250 @@
+# amadeus_gateway.py
+"""
+Rate-limited, deduplicating wrapper around the shared `amadeus.Client`.
+
+The travel apps called the global client directly: a burst of searches could exceed the API quota
+(and get 429s with no retry), and several users searching the same route at the same moment each
+sent their own request. `AmadeusGateway` has the same call surface for the four endpoints the apps
+use, so it replaces the client without changing callers:
+
+    reference_data.locations.get(...)               -> "locations"
+    reference_data.locations.hotels.by_city.get(...) -> "hotel_list"
+    shopping.hotel_offers_search.get(...)           -> "hotel_offers"
+    shopping.flight_offers_search.get(...)          -> "flight_offers"
+
+Every call goes through, in order:
+
+- singleflight: a call with the same endpoint and normalized parameters as one already in flight
+  waits for that call and shares its response (or its error) instead of reaching Amadeus;
+- a token bucket of AMADEUS_RATE_LIMIT requests per second with bursts of AMADEUS_BURST. The
+  defaults match the test environment quota (10 TPS, at most one request per 100 ms); production
+  keys allow 40 TPS. 0 disables the limiter. The quota is per API key, so each process gets
+  its share when several apps run side by side;
+- retries on 429, 5xx and network errors, up to AMADEUS_RETRIES times with exponential backoff
+  and full jitter (AMADEUS_BACKOFF seconds, doubled each attempt, capped at AMADEUS_BACKOFF_MAX).
+  A Retry-After header takes precedence.
+
+Per-endpoint latency histograms (one observation per upstream attempt) and call, coalesced, retry
+and throttling counters are kept in memory: `stats_markdown()` for the Streamlit sidebars,
+`prometheus_text()` for the agent service's /metrics.
+
+Other client attributes are passed through to the client untouched.
+"""
+
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Optional
+
+from amadeus import NetworkError, ResponseError
+
+from common.agent_registry import get_or_create
+from common.offer_cache import make_key
+from common.telemetry import Histogram, _labels
+
+RATE_LIMIT = float(os.getenv("AMADEUS_RATE_LIMIT", "10"))   # requests per second per API key
+BURST = float(os.getenv("AMADEUS_BURST", "1"))
+RETRIES = int(os.getenv("AMADEUS_RETRIES", "3"))
+BACKOFF = float(os.getenv("AMADEUS_BACKOFF", "0.5"))
+BACKOFF_MAX = float(os.getenv("AMADEUS_BACKOFF_MAX", "8"))
+
+ENDPOINTS = ("locations", "hotel_list", "hotel_offers", "flight_offers")
+
+
+class TokenBucket:
+    """Thread-safe token bucket. Callers reserve a token and sleep until it is theirs, in arrival order."""
+
+    def __init__(self, rate: float, burst: float = 1.0):
+        self.rate = rate
+        self.capacity = max(1.0, burst)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Block until a request may be sent; returns the seconds waited."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+def _status(error: ResponseError) -> Optional[int]:
+    return getattr(getattr(error, "response", None), "status_code", None)
+
+
+def _retry_after(error: ResponseError) -> Optional[float]:
+    http_response = getattr(getattr(error, "response", None), "http_response", None)
+    value = getattr(http_response, "headers", {}).get("Retry-After") if http_response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, NetworkError):
+        return True
+    status = _status(error) if isinstance(error, ResponseError) else None
+    return status is not None and (status == 429 or status >= 500)
+
+
+class _Endpoint:
+    """Stands in for one SDK resource: `.get(**params)` goes through the gateway."""
+
+    def __init__(self, gateway: "AmadeusGateway", name: str, get: Callable[..., Any]):
+        self._gateway = gateway
+        self._name = name
+        self._get = get
+
+    def get(self, **params):
+        return self._gateway.call(self._name, params, lambda: self._get(**params))
+
+
+class AmadeusGateway:
+    def __init__(self, client, rate: float = RATE_LIMIT, burst: float = BURST, retries: int = RETRIES,
+                 backoff: float = BACKOFF, backoff_max: float = BACKOFF_MAX):
+        self.client = client
+        self.bucket = TokenBucket(rate, burst)
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, _Call] = {}
+        self.stats: Dict[str, Dict[str, float]] = defaultdict(
+            lambda: {"calls": 0, "upstream": 0, "coalesced": 0, "retries": 0, "errors": 0, "throttled_seconds": 0.0})
+        self.latency: Dict[str, Histogram] = {name: Histogram() for name in ENDPOINTS}
+
+        locations = _Endpoint(self, "locations", client.reference_data.locations.get)
+        locations.hotels = SimpleNamespace(
+            by_city=_Endpoint(self, "hotel_list", client.reference_data.locations.hotels.by_city.get))
+        self.reference_data = SimpleNamespace(locations=locations)
+        self.shopping = SimpleNamespace(
+            hotel_offers_search=_Endpoint(self, "hotel_offers", client.shopping.hotel_offers_search.get),
+            flight_offers_search=_Endpoint(self, "flight_offers", client.shopping.flight_offers_search.get),
+        )
+
+    def __getattr__(self, name):
+        # Everything the gateway does not wrap (other APIs, client settings) comes from the client
+        if name == "client":
+            raise AttributeError(name)
+        return getattr(self.client, name)
+
+    # -----------------------------
+    # Calls
+    # -----------------------------
+    def call(self, endpoint: str, params: Dict[str, Any], fetch: Callable[[], Any]) -> Any:
+        """`fetch()` (an SDK call), deduplicated against identical calls in flight, rate-limited and retried."""
+        key = make_key(endpoint, params)
+        with self._lock:
+            self.stats[endpoint]["calls"] += 1
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+            else:
+                self.stats[endpoint]["coalesced"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._fetch_with_retry(endpoint, fetch)
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self.stats[endpoint]["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            call.done.set()
+        return call.result
+
+    def _fetch_with_retry(self, endpoint: str, fetch: Callable[[], Any]) -> Any:
+        attempt = 0
+        while True:
+            waited = self.bucket.acquire()
+            start = time.perf_counter()
+            try:
+                return fetch()
+            except ResponseError as e:
+                if attempt >= self.retries or not is_retryable(e):
+                    raise
+                error = e
+            finally:
+                self._observe(endpoint, time.perf_counter() - start, waited)
+
+            delay = _retry_after(error)
+            if delay is None:
+                delay = random.uniform(0, min(self.backoff_max, self.backoff * 2 ** attempt))
+            attempt += 1
+            with self._lock:
+                self.stats[endpoint]["retries"] += 1
+            time.sleep(delay)
+
+    def _observe(self, endpoint: str, elapsed: float, waited: float) -> None:
+        with self._lock:
+            stats = self.stats[endpoint]
+            stats["upstream"] += 1
+            stats["throttled_seconds"] += waited
+            self.latency.setdefault(endpoint, Histogram()).observe(elapsed)
+
+    # -----------------------------
+    # Metrics
+    # -----------------------------
+    def stats_markdown(self) -> str:
+        with self._lock:
+            total = {k: sum(s[k] for s in self.stats.values())
+                     for k in ("calls", "upstream", "coalesced", "retries", "errors", "throttled_seconds")}
+            latency = ", ".join(f"{name} {h.sum / h.count * 1000:.0f} ms"
+                                for name, h in self.latency.items() if h.count)
+        return (
+            f"**Amadeus** — calls: {total['calls']:.0f}, upstream: {total['upstream']:.0f}, "
+            f"coalesced: {total['coalesced']:.0f}, retries: {total['retries']:.0f}, errors: {total['errors']:.0f}, "
+            f"throttled: {total['throttled_seconds']:.1f}s" + (f"  \nupstream avg: {latency}" if latency else "")
+        )
+
+    def prometheus_text(self) -> str:
+        lines = []
+        with self._lock:
+            for name, kind in (("calls", "calls_total"), ("upstream", "upstream_requests_total"),
+                               ("coalesced", "coalesced_total"), ("retries", "retries_total"),
+                               ("errors", "errors_total"), ("throttled_seconds", "throttled_seconds_total")):
+                lines.append(f"# TYPE amadeus_{kind} counter")
+                lines += [f"amadeus_{kind}{_labels(endpoint=endpoint)} {s[name]:g}"
+                          for endpoint, s in sorted(self.stats.items())]
+            lines.append("# TYPE amadeus_request_duration_seconds histogram")
+            for endpoint, hist in sorted(self.latency.items()):
+                for bound, count in zip(hist.buckets, hist.counts):
+                    lines.append(f"amadeus_request_duration_seconds_bucket{_labels(endpoint=endpoint, le=bound)} {count}")
+                lines.append(f"amadeus_request_duration_seconds_bucket{_labels(endpoint=endpoint, le='+Inf')} {hist.count}")
+                lines.append(f"amadeus_request_duration_seconds_sum{_labels(endpoint=endpoint)} {hist.sum:.6f}")
+                lines.append(f"amadeus_request_duration_seconds_count{_labels(endpoint=endpoint)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+
+def get_amadeus_gateway(client) -> AmadeusGateway:
+    """The gateway for a shared client (`get_client(Client, ...)`): one limiter per client per process."""
+    return get_or_create("amadeus_gateway", {"client": id(client)}, lambda: AmadeusGateway(client))
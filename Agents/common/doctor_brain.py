@@ -0,0 +1,69 @@
+# doctor_brain.py
+"""
+Core image analysis for TheAIDoctorBrain, shared by the Streamlit app and the batch CLI.
+
+`analyze_image` is the body of the app's `get_image_analysis` without the Streamlit parts: it takes
+the OpenAI client as an argument (so a stub can be passed offline) and lets API errors propagate, so
+callers decide whether to show them or to retry.
+"""
+
+from typing import Optional
+
+from common.image_pipeline import AnalysisCache, content_hash, get_analysis_cache, prepare_image
+
+DEFAULT_MODEL = "gpt-4o"
+
+SYSTEM_PROMPT = (
+    "You are TheAI Doctor Brain, a highly specialized, expert medical diagnostic assistant. "
+    "Your task is to analyze the provided medical image (e.g., X-ray, MRI, CT) and answer "
+    "the user's diagnostic question. Structure your response clearly with the following sections: "
+    "1. **Image Summary:** Briefly describe the type of image and what it generally shows. "
+    "2. **Analysis:** Address the user's question directly, citing potential findings based on "
+    "the visual evidence. Use clear medical terminology. "
+    "3. **Disclaimer:** Always conclude with a strong reminder that this is an AI analysis and "
+    "is not a substitute for a human diagnosis or professional medical advice."
+)
+
+
+def build_messages(user_prompt: str, data_url: str) -> list:
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": [
+            {"type": "text", "text": user_prompt},
+            {"type": "image_url", "image_url": {"url": data_url}},
+        ]},
+    ]
+
+
+def analyze_image(client, image_bytes: bytes, user_prompt: str, model: str = DEFAULT_MODEL,
+                  metrics: Optional[dict] = None, cache: Optional[AnalysisCache] = None) -> str:
+    """
+    Diagnostic analysis of `image_bytes` for `user_prompt`. Answers are served from `cache`
+    (the process-wide analysis cache by default) when the same image and question were seen before.
+    Payload size, encode time and cache use are recorded in `metrics`.
+    """
+    metrics = metrics if metrics is not None else {}
+    cache = cache if cache is not None else get_analysis_cache()
+    cache_key = AnalysisCache.key(content_hash(image_bytes), user_prompt, model)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        metrics.update(cached=True, original_bytes=len(image_bytes))
+        return cached
+
+    image = prepare_image(image_bytes)
+    metrics.update(
+        cached=False,
+        original_bytes=image.original_bytes,
+        payload_bytes=image.payload_bytes,
+        encode_ms=image.encode_ms,
+        mime=image.mime,
+        size=image.size,
+    )
+    response = client.chat.completions.create(
+        model=model,
+        messages=build_messages(user_prompt, image.data_url),
+        temperature=0.0,
+    )
+    analysis = response.choices[0].message.content
+    cache.put(cache_key, analysis)
+    return analysis
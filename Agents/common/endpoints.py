@@ -0,0 +1,22 @@
+# endpoints.py
+"""
+Upstream API endpoints, overridable from the environment.
+
+Production uses the defaults. Benchmarks (benchmarks/standins.py) point the apps at local stand-in
+servers instead:
+
+- OpenAI: OPENAI_BASE_URL / OPENAI_API_BASE, read by the OpenAI SDK and LangChain themselves;
+- OpenWeather: OPENWEATHER_URL, read by `common.weather_client`;
+- Amadeus: AMADEUS_HOST, AMADEUS_PORT, AMADEUS_SSL, turned into `amadeus.Client` options here.
+"""
+
+import os
+
+
+def amadeus_options() -> dict:
+    """Extra keyword arguments for `amadeus.Client` (empty unless AMADEUS_HOST is set)."""
+    host = os.getenv("AMADEUS_HOST")
+    if not host:
+        return {}
+    ssl = os.getenv("AMADEUS_SSL", "true").lower() not in ("0", "false", "no")
+    return {"host": host, "ssl": ssl, "port": int(os.getenv("AMADEUS_PORT", "443" if ssl else "80"))}
@@ -0,0 +1,140 @@
+# flight_offers.py
+"""
+Columnar normalization of Amadeus flight offers.
+
+`get_flights` used to walk offers/itineraries/segments in nested loops, build one dict per segment,
+guess return legs by comparing departure airports and build pandas DataFrames just to call
+`to_markdown`. `FlightTable.from_offers` flattens the payload in one pass into parallel columns with
+one record per itinerary (outbound = itinerary 0, return = itinerary 1), so sorting and filtering
+are index operations over plain lists and only the visible page is ever rendered.
+"""
+
+import re
+from array import array
+from typing import List, Optional, Sequence
+
+OUTBOUND, RETURN = 0, 1
+
+_DURATION = re.compile(r"PT(?:(\d+)H)?(?:(\d+)M)?")
+
+SORT_KEYS = {
+    "price": "price",
+    "duration": "duration",
+    "stops": "stops",
+    "departure": "dep_at",
+}
+
+
+def parse_duration(value: str) -> int:
+    """ISO-8601 'PT7H35M' -> minutes."""
+    m = _DURATION.match(value or "")
+    if not m:
+        return 0
+    return int(m.group(1) or 0) * 60 + int(m.group(2) or 0)
+
+
+def _fmt_duration(minutes: int) -> str:
+    return f"{minutes // 60}h {minutes % 60:02d}m"
+
+
+class FlightTable:
+    """One row per itinerary, stored column-wise."""
+
+    def __init__(self):
+        self.offer = array("i")
+        self.direction = array("b")
+        self.price = array("d")
+        self.stops = array("i")
+        self.duration = array("i")
+        self.currency: List[str] = []
+        self.carriers: List[str] = []
+        self.flights: List[str] = []
+        self.origin: List[str] = []
+        self.destination: List[str] = []
+        self.dep_at: List[str] = []
+        self.arr_at: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.offer)
+
+    @classmethod
+    def from_offers(cls, offers: Sequence[dict]) -> "FlightTable":
+        table = cls()
+        for offer_no, offer in enumerate(offers):
+            price = offer.get("price", {})
+            total = float(price.get("grandTotal") or price.get("total") or "nan")
+            currency = price.get("currency", "")
+            for direction, itinerary in enumerate(offer.get("itineraries", [])[:2]):
+                segments = itinerary.get("segments") or []
+                if not segments:
+                    continue
+                first, last = segments[0], segments[-1]
+                table.offer.append(offer_no)
+                table.direction.append(direction)
+                table.price.append(total)
+                table.currency.append(currency)
+                table.stops.append(len(segments) - 1)
+                table.duration.append(parse_duration(itinerary.get("duration", "")))
+                table.carriers.append(",".join(dict.fromkeys(s["carrierCode"] for s in segments)))
+                table.flights.append(" / ".join(f"{s['carrierCode']}{s['number']}" for s in segments))
+                table.origin.append(first["departure"]["iataCode"])
+                table.destination.append(last["arrival"]["iataCode"])
+                table.dep_at.append(first["departure"]["at"])
+                table.arr_at.append(last["arrival"]["at"])
+        return table
+
+    # -----------------------------
+    # Query operations (return row indexes)
+    # -----------------------------
+    def select(self, direction: Optional[int] = None, direct_only: bool = False,
+               depart_after: Optional[str] = None, depart_before: Optional[str] = None,
+               max_price: Optional[float] = None, carrier: Optional[str] = None) -> List[int]:
+        """
+        Row indexes matching every given filter. `depart_after`/`depart_before` are 'HH:MM' times
+        of day, compared on the ISO timestamp without parsing.
+        """
+        rows = range(len(self))
+        if direction is not None:
+            rows = [i for i in rows if self.direction[i] == direction]
+        if direct_only:
+            rows = [i for i in rows if self.stops[i] == 0]
+        if depart_after:
+            rows = [i for i in rows if self.dep_at[i][11:16] >= depart_after]
+        if depart_before:
+            rows = [i for i in rows if self.dep_at[i][11:16] <= depart_before]
+        if max_price is not None:
+            rows = [i for i in rows if self.price[i] <= max_price]
+        if carrier:
+            carrier = carrier.upper()
+            rows = [i for i in rows if carrier in self.carriers[i].split(",")]
+        return list(rows)
+
+    def sort(self, rows: List[int], by: str = "price", descending: bool = False) -> List[int]:
+        column = getattr(self, SORT_KEYS[by])
+        return sorted(rows, key=lambda i: (column[i], self.price[i]), reverse=descending)
+
+    def cheapest(self, direction: Optional[int] = None) -> Optional[int]:
+        rows = self.select(direction=direction)
+        return min(rows, key=self.price.__getitem__) if rows else None
+
+    # -----------------------------
+    # Rendering (visible page only)
+    # -----------------------------
+    def to_markdown(self, rows: List[int], page: int = 0, page_size: int = 10) -> str:
+        visible = rows[page * page_size:(page + 1) * page_size]
+        if not visible:
+            return "_No flights match the current filters._"
+        lines = [
+            "| Price | Flights | Carriers | From | To | Departure | Arrival | Duration | Stops |",
+            "|---:|---|---|---|---|---|---|---|---:|",
+        ]
+        for i in visible:
+            lines.append(
+                f"| {self.price[i]:.2f} {self.currency[i]} | {self.flights[i]} | {self.carriers[i]} "
+                f"| {self.origin[i]} | {self.destination[i]} | {self.dep_at[i].replace('T', ' ')[:16]} "
+                f"| {self.arr_at[i].replace('T', ' ')[:16]} | {_fmt_duration(self.duration[i])} "
+                f"| {'Direct' if self.stops[i] == 0 else self.stops[i]} |"
+            )
+        if len(rows) > len(visible):
+            lines.append(f"\n_Showing {page * page_size + 1}–{page * page_size + len(visible)} of {len(rows)}._")
+        return "\n".join(lines)
@@ -0,0 +1,102 @@
+# hotel_search.py
+"""
+Scalable hotel offer retrieval.
+
+`get_hotels` used to keep only the first 5 hotels of `hotels.by_city`, send one
+`hotel_offers_search` call for them and pair offers to hotels with O(n*m) `next(...)` scans. This
+module splits the city's hotel list into chunks sized to the API limit, fetches the chunks
+concurrently under a configurable cap, joins offers to hotels through a dict index and yields a
+ranked table (cheapest first) each time a chunk completes, so the UI can render partial results.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional
+
+from amadeus import ResponseError
+
+# Hotel IDs per hotel_offers_search request (keeps the query string within Amadeus limits)
+CHUNK_SIZE = int(os.getenv("HOTEL_OFFERS_CHUNK_SIZE", "20"))
+MAX_CONCURRENCY = int(os.getenv("HOTEL_OFFERS_CONCURRENCY", "4"))
+MAX_HOTELS = int(os.getenv("HOTEL_SEARCH_MAX_HOTELS", "60"))
+
+# Amadeus error codes meaning "nothing to sell for these hotels": NO ROOMS AVAILABLE AT REQUESTED
+# PROPERTY and INVALID PROPERTY CODE (retired IDs still listed by hotels.by_city)
+NO_AVAILABILITY_CODES = {"3664", "1257"}
+
+
+def chunked(items: List[str], size: int) -> List[List[str]]:
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _is_no_availability(error: ResponseError) -> bool:
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) != 400:
+        return False
+    errors = (getattr(response, "result", None) or {}).get("errors") or []
+    return bool(errors) and all(str(e.get("code")) in NO_AVAILABILITY_CODES for e in errors)
+
+
+def _fetch_chunk(amadeus, hotel_ids: List[str], check_in: str, check_out: str, adults: int, cache) -> list:
+    params = dict(hotelIds=",".join(hotel_ids), checkInDate=check_in, checkOutDate=check_out, adults=adults)
+
+    def fetch():
+        return getattr(amadeus.shopping.hotel_offers_search.get(**params), "data", [])
+
+    try:
+        return cache.get_or_fetch("hotel_offers", params, fetch) if cache else fetch()
+    except ResponseError as e:
+        # Amadeus rejects a whole chunk when none of its hotels has availability; treat it as empty.
+        # Anything else (auth, quota, network) propagates so the search reports the real cause.
+        if _is_no_availability(e):
+            return []
+        raise
+
+
+def _row(hotel: dict, offer: Optional[dict]) -> dict:
+    price = (offer or {}).get("price", {})
+    total = price.get("total")
+    return {
+        "Hotel Name": hotel.get("name", "N/A"),
+        "Address": ", ".join(hotel.get("address", {}).get("lines", ["N/A"])),
+        "Price": total or "N/A",
+        "Currency": price.get("currency", ""),
+        "_sort": (0, float(total), hotel.get("name", "")) if total else (1, 0.0, hotel.get("name", "")),
+    }
+
+
+def rank(rows_by_id: Dict[str, dict]) -> List[dict]:
+    """Priced hotels first, cheapest first, then by name; drops the internal sort key."""
+    ordered = sorted(rows_by_id.values(), key=lambda r: r["_sort"])
+    return [{k: v for k, v in r.items() if k != "_sort"} for r in ordered]
+
+
+def stream_hotel_offers(amadeus, hotels: List[dict], check_in: str, check_out: str, adults: int = 2,
+                        cache=None, chunk_size: int = CHUNK_SIZE, max_concurrency: int = MAX_CONCURRENCY,
+                        max_hotels: int = MAX_HOTELS, priced_only: bool = True) -> Iterator[List[dict]]:
+    """
+    Yields the ranked table after every completed chunk. The last value yielded is the final table.
+    With `priced_only`, hotels without an offer for the dates are left out.
+    """
+    hotels_by_id = {h["hotelId"]: h for h in hotels[:max_hotels] if "hotelId" in h}
+    chunks = chunked(list(hotels_by_id), chunk_size)
+    rows_by_id: Dict[str, dict] = {}
+    if not priced_only:
+        rows_by_id = {hotel_id: _row(hotel, None) for hotel_id, hotel in hotels_by_id.items()}
+
+    if not chunks:
+        yield []
+        return
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(chunks)))) as pool:
+        futures = [pool.submit(_fetch_chunk, amadeus, ids, check_in, check_out, adults, cache) for ids in chunks]
+        for future in as_completed(futures):
+            for result in future.result():
+                hotel_id = result.get("hotel", {}).get("hotelId")
+                hotel = hotels_by_id.get(hotel_id)
+                if hotel is None:
+                    continue
+                offers = result.get("offers") or [{}]
+                cheapest = min(offers, key=lambda o: float(o.get("price", {}).get("total") or "inf"))
+                rows_by_id[hotel_id] = _row(hotel, cheapest)
+            yield rank(rows_by_id)
@@ -0,0 +1,281 @@
+# iata_index.py
+"""
+Offline IATA city/airport index.
+
+The travel tools used to call `amadeus.reference_data.locations.get(keyword=..., subType="CITY")`
+before every flight or hotel search just to turn a city name into an IATA code. This module loads
+a bundled dataset once into a normalized-name hash index plus a prefix trie, and falls back to
+typo-tolerant matching (trigram candidates confirmed by edit distance). Only exact name or alias
+hits skip the Amadeus API: a prefix or fuzzy match may be a different city that happens to be
+spelled alike ("Udaipur" -> Jaipur), so those keywords are sent to the API first and the
+approximate match is only used when the API fails or finds nothing. API answers are written back
+to the index (and to a local CSV) so the next lookup is an exact hit served offline.
+"""
+
+import csv
+import os
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+BUNDLED_CSV = os.path.join(DATA_DIR, "iata_cities.csv")
+LEARNED_CSV = os.path.join(DATA_DIR, "iata_learned.csv")
+
+CSV_FIELDS = ["iata", "name", "type", "city_code", "country", "aliases"]
+
+# Maximum edit distance accepted for a fuzzy match, scaled by name length.
+MAX_EDIT_RATIO = 0.34
+MIN_TRIGRAM_SCORE = 0.3
+
+_TERMINAL = "$"
+
+
+def normalize(text: str) -> str:
+    """Lowercase, strip accents and punctuation, collapse whitespace."""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    text = re.sub(r"[^a-z0-9]+", " ", text.lower())
+    return " ".join(text.split())
+
+
+def trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance with an early exit once every cell in a row exceeds `limit`."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class IataIndex:
+    """In-memory name -> IATA index with exact, prefix and fuzzy lookups."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_name: Dict[str, List[dict]] = {}
+        self._by_code: Dict[str, dict] = {}
+        self._trie: dict = {}
+        self._trigrams: Dict[str, Set[str]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._by_code)
+
+    # -----------------------------
+    # Loading
+    # -----------------------------
+    def load_csv(self, path: str) -> int:
+        if not os.path.exists(path):
+            return 0
+        count = 0
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                self.add(row)
+                count += 1
+        return count
+
+    def add(self, row: dict) -> bool:
+        """Index a row; returns False when its code and every name were already indexed."""
+        entry = {
+            "iata": row["iata"].strip().upper(),
+            "name": row.get("name", "").strip(),
+            "type": (row.get("type") or "CITY").strip().upper(),
+            "city_code": (row.get("city_code") or row["iata"]).strip().upper(),
+            "country": (row.get("country") or "").strip().upper(),
+        }
+        names = [entry["name"]] + [a for a in (row.get("aliases") or "").split("|") if a]
+        with self._lock:
+            added = entry["iata"] not in self._by_code
+            self._by_code.setdefault(entry["iata"], entry)
+            for name in names:
+                key = normalize(name)
+                if not key:
+                    continue
+                bucket = self._by_name.setdefault(key, [])
+                if any(e["iata"] == entry["iata"] for e in bucket):
+                    continue
+                bucket.append(entry)
+                added = True
+                self._insert_trie(key)
+                for gram in trigrams(key):
+                    self._trigrams[gram].add(key)
+        return added
+
+    def _insert_trie(self, key: str) -> None:
+        node = self._trie
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node[_TERMINAL] = True
+
+    # -----------------------------
+    # Lookups
+    # -----------------------------
+    # `add` may run concurrently (API write-back from parallel searches), so reads hold the lock
+    # while they walk the trie and trigram sets.
+    def prefix_matches(self, prefix: str, limit: int = 10) -> List[str]:
+        """Normalized names starting with `prefix` (used for autocomplete and unique-prefix resolution)."""
+        with self._lock:
+            return self._prefix_matches(normalize(prefix), limit)
+
+    def _prefix_matches(self, prefix: str, limit: int) -> List[str]:
+        node = self._trie
+        for ch in prefix:
+            node = node.get(ch)
+            if node is None:
+                return []
+        found, stack = [], [(node, prefix)]
+        while stack and len(found) < limit:
+            node, path = stack.pop()
+            if node.get(_TERMINAL):
+                found.append(path)
+            for ch, child in node.items():
+                if ch != _TERMINAL:
+                    stack.append((child, path + ch))
+        return found
+
+    def fuzzy_match(self, key: str) -> Optional[str]:
+        """Closest indexed name by trigram overlap, confirmed by edit distance."""
+        with self._lock:
+            return self._fuzzy_match(key)
+
+    def _fuzzy_match(self, key: str) -> Optional[str]:
+        grams = trigrams(key)
+        scores: Dict[str, int] = defaultdict(int)
+        for gram in grams:
+            for name in self._trigrams.get(gram, ()):
+                scores[name] += 1
+
+        limit = max(1, int(len(key) * MAX_EDIT_RATIO))
+        best, best_distance = None, limit + 1
+        ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)[:20]
+        for name, shared in ranked:
+            if shared / len(grams | trigrams(name)) < MIN_TRIGRAM_SCORE:
+                continue
+            distance = edit_distance(key, name, limit)
+            if distance < best_distance:
+                best, best_distance = name, distance
+        return best
+
+    def lookup(self, keyword: str, sub_type: str = "CITY", approximate: bool = True) -> Optional[dict]:
+        """
+        Resolve a city/airport name to an index entry. Tries, in order: exact normalized name,
+        raw IATA code (only when typed in upper case, so "Los" or "San" stay words) and, with
+        `approximate`, unique trie prefix and fuzzy match. For `sub_type="CITY"` airport matches
+        are mapped to their metropolitan city code.
+        """
+        key = normalize(keyword)
+        if not key:
+            return None
+
+        typed = (keyword or "").strip()
+        with self._lock:
+            entries = self._by_name.get(key)
+            if not entries and re.fullmatch(r"[A-Z]{3}", typed) and typed in self._by_code:
+                entries = [self._by_code[typed]]
+            if not entries and approximate:
+                candidates = self._prefix_matches(key, limit=2)
+                if len(candidates) == 1:
+                    entries = self._by_name[candidates[0]]
+            if not entries and approximate:
+                match = self._fuzzy_match(key)
+                if match:
+                    entries = self._by_name[match]
+            if not entries:
+                return None
+
+            preferred = [e for e in entries if e["type"] == sub_type.upper()] or entries
+            entry = preferred[0]
+            if sub_type.upper() == "CITY" and entry["type"] != "CITY":
+                return self._by_code.get(entry["city_code"], entry)
+            return entry
+
+    def code_for(self, keyword: str, sub_type: str = "CITY", approximate: bool = True) -> Optional[str]:
+        entry = self.lookup(keyword, sub_type, approximate)
+        return entry["iata"] if entry else None
+
+
+# -----------------------------
+# Process-wide default index
+# -----------------------------
+_default_index: Optional[IataIndex] = None
+_default_lock = threading.Lock()
+_learned_lock = threading.Lock()
+
+
+def get_default_index() -> IataIndex:
+    """Load the bundled and learned datasets once per process."""
+    global _default_index
+    if _default_index is None:
+        with _default_lock:
+            if _default_index is None:
+                index = IataIndex()
+                index.load_csv(BUNDLED_CSV)
+                index.load_csv(LEARNED_CSV)
+                _default_index = index
+    return _default_index
+
+
+def _remember(index: IataIndex, keyword: str, location: dict) -> None:
+    """Write an API answer back to the index and persist it for future processes."""
+    row = {
+        "iata": location["iataCode"],
+        "name": (location.get("name") or keyword).title(),
+        "type": location.get("subType", "CITY"),
+        "city_code": location.get("address", {}).get("cityCode") or location["iataCode"],
+        "country": location.get("address", {}).get("countryCode", ""),
+        "aliases": normalize(keyword),
+    }
+    if not index.add(row):
+        # Already known (e.g. a concurrent miss for the same keyword wrote it): no duplicate row.
+        return
+    try:
+        with _learned_lock:
+            is_new = not os.path.exists(LEARNED_CSV)
+            with open(LEARNED_CSV, "a", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+                if is_new:
+                    writer.writeheader()
+                writer.writerow(row)
+    except OSError:
+        # Read-only deployments still benefit from the in-memory write-back.
+        pass
+
+
+def resolve_city_code(amadeus, keyword: str, index: Optional[IataIndex] = None) -> Optional[str]:
+    """
+    Offline-first replacement for
+    `amadeus.reference_data.locations.get(keyword=keyword, subType="CITY").data[0]["iataCode"]`.
+    Exact index hits are served offline; anything else asks the API, and a prefix/fuzzy match is
+    only returned when the API raises or has no result.
+    """
+    index = index or get_default_index()
+    code = index.code_for(keyword, "CITY", approximate=False)
+    if code:
+        return code
+    fallback = index.code_for(keyword, "CITY")
+    if amadeus is None:
+        return fallback
+
+    try:
+        data = amadeus.reference_data.locations.get(keyword=keyword, subType="CITY").data
+    except Exception:
+        if fallback:
+            return fallback
+        raise
+    if not data:
+        return fallback
+    _remember(index, keyword, data[0])
+    return data[0]["iataCode"]
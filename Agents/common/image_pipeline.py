@@ -0,0 +1,189 @@
+# image_pipeline.py
+"""
+Image preprocessing and analysis cache for TheAIDoctorBrain.
+
+The app used to write every upload to /tmp, read it back, base64-encode the original bytes and
+label them `image/jpeg` whatever the real format was, so a 20 MB scan became a ~27 MB request.
+`prepare_image` works straight from the upload buffer: it downscales to the largest size the
+vision model actually looks at (at "high" detail GPT-4o fits the image into 2048x2048 and then
+scales the short side to 768 px), recompresses what it resizes, and reports the real MIME type.
+
+`AnalysisCache` keys answers by a hash of the original image bytes plus model and prompt, so asking
+the same question about the same scan again is answered without preprocessing or an API call.
+"""
+
+import base64
+import hashlib
+import io
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+MAX_SIDE = int(os.getenv("DOCTOR_IMAGE_MAX_SIDE", "2048"))
+SHORT_SIDE = int(os.getenv("DOCTOR_IMAGE_SHORT_SIDE", "768"))
+JPEG_QUALITY = int(os.getenv("DOCTOR_IMAGE_JPEG_QUALITY", "90"))
+CACHE_ENTRIES = int(os.getenv("DOCTOR_ANALYSIS_CACHE_ENTRIES", "256"))
+
+MIME_TYPES = {"JPEG": "image/jpeg", "PNG": "image/png", "WEBP": "image/webp", "GIF": "image/gif"}
+
+# Magic numbers, used when Pillow is not available
+_SIGNATURES = [
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+]
+
+
+def sniff_mime(data: bytes) -> str:
+    for signature, mime in _SIGNATURES:
+        if data.startswith(signature):
+            return mime
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def target_size(width: int, height: int, max_side: int = MAX_SIDE, short_side: int = SHORT_SIDE) -> tuple:
+    """Largest size the model will use: fit into max_side x max_side, then short side <= short_side."""
+    scale = min(1.0, max_side / max(width, height), short_side / min(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+class PreparedImage:
+    """Request-ready image: payload bytes, MIME type and what it cost to produce them."""
+
+    def __init__(self, payload: bytes, mime: str, original_bytes: int, size: Optional[tuple],
+                 original_size: Optional[tuple], encode_ms: float):
+        self.payload = payload
+        self.mime = mime
+        self.original_bytes = original_bytes
+        self.size = size
+        self.original_size = original_size
+        self.encode_ms = encode_ms
+        self.base64 = base64.b64encode(payload).decode("ascii")
+
+    @property
+    def data_url(self) -> str:
+        return f"data:{self.mime};base64,{self.base64}"
+
+    @property
+    def payload_bytes(self) -> int:
+        """Size of the base64 text actually sent in the request."""
+        return len(self.base64)
+
+
+def prepare_image(data: bytes, max_side: int = MAX_SIDE, short_side: int = SHORT_SIDE,
+                  quality: int = JPEG_QUALITY) -> PreparedImage:
+    """
+    Downscale and recompress `data` (the raw upload bytes) for the vision model. The original bytes
+    are sent unchanged when they are already within the model's resolution and in a format the API
+    accepts; anything else (oversized scans, TIFF/BMP, 16-bit PNG) is re-encoded as JPEG, or PNG
+    when it has transparency.
+    """
+    start = time.perf_counter()
+    try:
+        from PIL import Image  # ships with Streamlit
+    except ImportError:
+        return PreparedImage(data, sniff_mime(data), len(data), None, None,
+                             (time.perf_counter() - start) * 1000)
+
+    image = Image.open(io.BytesIO(data))
+    original_size = image.size
+    size = target_size(*original_size, max_side=max_side, short_side=short_side)
+    mime = MIME_TYPES.get(image.format)
+    if size == original_size and mime is not None:
+        return PreparedImage(data, mime, len(data), size, original_size, (time.perf_counter() - start) * 1000)
+
+    if image.format == "JPEG":
+        image.draft(image.mode, size)  # let libjpeg decode at reduced scale
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+    image = _to_8bit(image, has_alpha)
+    if image.size != size:
+        image = image.resize(size, Image.LANCZOS)
+
+    buffer = io.BytesIO()
+    if has_alpha:
+        image.save(buffer, format="PNG", optimize=True)
+        mime = "image/png"
+    else:
+        image.save(buffer, format="JPEG", quality=quality, optimize=True)
+        mime = "image/jpeg"
+    return PreparedImage(buffer.getvalue(), mime, len(data), size, original_size,
+                         (time.perf_counter() - start) * 1000)
+
+
+def _to_8bit(image, has_alpha: bool):
+    """8-bit RGB(A)/L copy; 16-bit and float scans (common for DICOM exports) are rescaled, not clipped."""
+    if image.mode in ("I;16", "I;16B", "I;16L", "I", "F"):
+        lo, hi = image.convert("F").getextrema()
+        scale = 255.0 / (hi - lo) if hi > lo else 1.0
+        return image.convert("F").point(lambda v: (v - lo) * scale).convert("L")
+    if has_alpha:
+        return image.convert("RGBA")
+    return image.convert("L" if image.mode in ("L", "1") else "RGB")
+
+
+class AnalysisCache:
+    """In-process LRU of analyses keyed by (image content hash, model, prompt)."""
+
+    def __init__(self, max_entries: int = CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(image_hash: str, prompt: str, model: str) -> str:
+        normalized = " ".join(prompt.split()).lower()
+        return hashlib.sha256(f"{image_hash}\x00{model}\x00{normalized}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            answer = self._entries.get(key)
+            if answer is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return answer
+
+    def put(self, key: str, answer: str) -> None:
+        with self._lock:
+            self._entries[key] = answer
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats_markdown(self) -> str:
+        return (
+            f"**Analysis cache** — {len(self)} answers, hit rate: {self.hit_rate():.0%} "
+            f"({self.hits}/{self.hits + self.misses})"
+        )
+
+
+_cache: Optional[AnalysisCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_analysis_cache() -> AnalysisCache:
+    """Process-wide cache shared by all Streamlit sessions."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = AnalysisCache()
+        return _cache
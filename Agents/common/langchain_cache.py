@@ -0,0 +1,51 @@
+# langchain_cache.py
+"""
+LangChain `BaseCache` adapter for `common.llm_cache`.
+
+LangChain calls `lookup(prompt, llm_string)` before every LLM call and `update(...)` after a miss.
+For chat models `prompt` is the serialized message list and `llm_string` the model with all its
+parameters, so identical requests map to one key. Generations are stored with
+`langchain_core.load.dumps` and restored with `loads`, so cached steps come back as the same
+message objects the agent parsed the first time.
+"""
+
+import threading
+from typing import Any, Dict, Optional
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+
+from common.llm_cache import LLMCacheStore, make_key
+
+
+class NamespaceCache(BaseCache):
+    def __init__(self, namespace: str, store: LLMCacheStore):
+        self.namespace = namespace
+        self.store = store
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Any]:
+        payload = self.store.get(self.namespace, make_key(llm_string, prompt))
+        if payload is None:
+            return None
+        try:
+            return loads(payload)
+        except Exception:
+            return None  # written by an incompatible LangChain version; fetch it again
+
+    def update(self, prompt: str, llm_string: str, return_val: Any) -> None:
+        self.store.put(self.namespace, make_key(llm_string, prompt), dumps(return_val))
+
+    def clear(self, **kwargs: Any) -> None:
+        self.store.clear(self.namespace)
+
+
+_caches: Dict[str, NamespaceCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_namespace_cache(namespace: str, store: LLMCacheStore) -> NamespaceCache:
+    with _caches_lock:
+        cache = _caches.get(namespace)
+        if cache is None:
+            cache = _caches[namespace] = NamespaceCache(namespace, store)
+        return cache
@@ -0,0 +1,190 @@
+# llm_cache.py
+"""
+Persistent exact-match cache for LLM responses (opt-in with LLM_CACHE=1).
+
+The agents run at temperature 0, so the same prompt to the same model gets the same answer. A
+resubmitted form sends the same ReAct prompts again, step by step. With the cache on, each step
+is answered from SQLite in milliseconds, so the agent replays its earlier reasoning without a
+round-trip. Tools still run; they have their own caches.
+
+- keys: SHA-256 of the model string (model name and every parameter, including stop words and
+  function schemas) and the full serialized message list, exactly as LangChain passes them;
+- one SQLite file per process (LLM_CACHE_PATH), shared by every app, with one namespace per app;
+- entries expire after LLM_CACHE_TTL seconds; above LLM_CACHE_MAX_MB the least recently used
+  entries are evicted;
+- hits, misses, writes, evictions and the LLM time saved are counted per namespace.
+
+`get_llm_cache(namespace)` returns the LangChain cache to pass as `ChatOpenAI(cache=...)`, or None
+when the cache is off. This module does not import LangChain; the adapter lives in `langchain_cache.py`.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Optional
+
+ENABLED = os.getenv("LLM_CACHE", "0").lower() in ("1", "true", "yes", "on")
+DEFAULT_PATH = os.getenv(
+    "LLM_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "llm_cache.sqlite3"),
+)
+DEFAULT_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))   # 7 days
+MAX_BYTES = int(float(os.getenv("LLM_CACHE_MAX_MB", "64")) * 1024 * 1024)
+EVICT_EVERY = 50   # writes between size checks
+
+
+def make_key(llm_string: str, prompt: str) -> str:
+    return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+
+class LLMCacheStore:
+    """SQLite table of serialized generations, keyed by (namespace, key)."""
+
+    def __init__(self, path: str = DEFAULT_PATH, ttl: float = DEFAULT_TTL, max_bytes: int = MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._writes_since_evict = 0
+        self._pending: Dict[tuple, float] = {}   # (namespace, key) -> monotonic time of the miss
+        self.stats: Dict[str, Dict[str, float]] = defaultdict(
+            lambda: {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "saved_seconds": 0.0})
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, stored_at REAL NOT NULL, last_used REAL NOT NULL,"
+                " latency REAL NOT NULL DEFAULT 0, size INTEGER NOT NULL, payload TEXT NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_last_used ON llm_cache (last_used)")
+            self._conn.commit()
+
+    # -----------------------------
+    # Lookup / store
+    # -----------------------------
+    def get(self, namespace: str, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT stored_at, latency, payload FROM llm_cache WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+            stats = self.stats[namespace]
+            if row is None or now - row[0] >= self.ttl:
+                stats["misses"] += 1
+                if len(self._pending) > 1000:  # misses whose LLM call failed never reach put()
+                    self._pending.clear()
+                self._pending[(namespace, key)] = time.monotonic()
+                return None
+            stats["hits"] += 1
+            stats["saved_seconds"] += row[1]
+            self._conn.execute("UPDATE llm_cache SET last_used = ? WHERE namespace = ? AND key = ?", (now, namespace, key))
+            self._conn.commit()
+            return row[2]
+
+    def put(self, namespace: str, key: str, payload: str) -> None:
+        now = time.time()
+        with self._lock:
+            missed_at = self._pending.pop((namespace, key), None)
+            latency = time.monotonic() - missed_at if missed_at is not None else 0.0
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (namespace, key, stored_at, last_used, latency, size, payload)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (namespace, key, now, now, latency, len(payload), payload),
+            )
+            self.stats[namespace]["writes"] += 1
+            self._writes_since_evict += 1
+            if self._writes_since_evict >= EVICT_EVERY:
+                self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then least recently used ones until the table fits in max_bytes."""
+        self._writes_since_evict = 0
+        evicted = defaultdict(int)
+        for namespace, count in self._conn.execute(
+            "SELECT namespace, COUNT(*) FROM llm_cache WHERE stored_at < ? GROUP BY namespace", (now - self.ttl,)
+        ).fetchall():
+            evicted[namespace] += count
+        self._conn.execute("DELETE FROM llm_cache WHERE stored_at < ?", (now - self.ttl,))
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if total > self.max_bytes:
+            victims, freed = [], 0
+            target = total - int(self.max_bytes * 0.9)   # evict a little extra so this runs rarely
+            for rowid, namespace, size in self._conn.execute(
+                "SELECT rowid, namespace, size FROM llm_cache ORDER BY last_used"
+            ):
+                if freed >= target:
+                    break
+                victims.append((rowid,))
+                evicted[namespace] += 1
+                freed += size
+            self._conn.executemany("DELETE FROM llm_cache WHERE rowid = ?", victims)
+
+        for namespace, count in evicted.items():
+            self.stats[namespace]["evictions"] += count
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        with self._lock:
+            if namespace is None:
+                self._conn.execute("DELETE FROM llm_cache")
+            else:
+                self._conn.execute("DELETE FROM llm_cache WHERE namespace = ?", (namespace,))
+            self._conn.commit()
+
+    # -----------------------------
+    # Metrics
+    # -----------------------------
+    def hit_rate(self, namespace: str) -> float:
+        s = self.stats[namespace]
+        total = s["hits"] + s["misses"]
+        return s["hits"] / total if total else 0.0
+
+    def entries(self, namespace: str) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_cache WHERE namespace = ?", (namespace,)).fetchone()[0]
+
+    def stats_markdown(self, namespace: str) -> str:
+        s = self.stats[namespace]
+        return (
+            f"**LLM cache** — hits: {s['hits']:.0f}, misses: {s['misses']:.0f}, "
+            f"hit rate: {self.hit_rate(namespace):.0%}, entries: {self.entries(namespace)}, "
+            f"LLM time saved: {s['saved_seconds']:.1f}s"
+        )
+
+
+_store: Optional[LLMCacheStore] = None
+_store_lock = threading.Lock()
+
+
+def get_llm_cache_store() -> LLMCacheStore:
+    """One store (and one SQLite connection) per process, shared by every app."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = LLMCacheStore()
+        return _store
+
+
+def get_llm_cache(namespace: str):
+    """LangChain cache for one app's models (`ChatOpenAI(cache=...)`), or None when LLM_CACHE is off."""
+    if not ENABLED:
+        return None
+    from common.langchain_cache import get_namespace_cache
+
+    return get_namespace_cache(namespace, get_llm_cache_store())
+
+
+def llm_cache_markdown(namespace: str) -> str:
+    if not ENABLED:
+        return "**LLM cache** — off (set LLM_CACHE=1 to replay identical prompts from disk)"
+    return get_llm_cache_store().stats_markdown(namespace)
@@ -0,0 +1,208 @@
+# math_engine.py
+"""
+Safe AST-based arithmetic engine for the calculator agents.
+
+The old `calculator_tool` only accepted `a op b`, so a ZERO_SHOT_REACT agent had to spend one LLM
+round-trip per operation on something like "12 * 12 and then add 5". This module evaluates:
+
+- full expressions with precedence and parentheses: `(3 + 4) * 2 ^ 3 % 5`
+- common math functions and constants: `sqrt(16) + log(100, 10) * pi`
+- word operators: `12 times 3 plus 4`, `2 to the power of 10`, `10 mod 3`
+- chained connectors: `12 * 12 and then add 5, then divide by 7`
+
+Only whitelisted AST nodes are evaluated (no names, attributes or calls outside the table below),
+and exponents/factorials/rounding digits are bounded so a hostile input cannot hang the process.
+Integer results are limited to MAX_DIGITS digits, below the 4300-digit limit Python puts on
+converting an int to a string.
+"""
+
+import ast
+import math
+import operator
+import re
+from typing import Optional, Union
+
+Number = Union[int, float]
+
+MAX_INPUT_LENGTH = 500
+MAX_EXPONENT = 4_000   # powers stay below 10 ** MAX_EXPONENT
+MAX_DIGITS = 4_000
+MAX_FACTORIAL = 1_000
+MAX_ROUND_DIGITS = 100
+
+_BINARY_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+_UNARY_OPS = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+
+
+def _factorial(n: Number) -> int:
+    if n != int(n) or n < 0 or n > MAX_FACTORIAL:
+        raise ValueError(f"factorial is only supported for integers 0..{MAX_FACTORIAL}")
+    return math.factorial(int(n))
+
+
+def _round(x: Number, ndigits: Optional[Number] = None) -> Number:
+    if ndigits is None:
+        return round(x)
+    if ndigits != int(ndigits) or abs(ndigits) > MAX_ROUND_DIGITS:
+        raise ValueError(f"round is only supported with -{MAX_ROUND_DIGITS}..{MAX_ROUND_DIGITS} digits")
+    return round(x, int(ndigits))
+
+
+def _digits(n: int) -> int:
+    """Decimal digits of abs(n), without str() (which refuses ints over 4300 digits)."""
+    n = abs(n)
+    if n < 10:
+        return 1
+    estimate = int((n.bit_length() - 1) * math.log10(2))   # digits - 1, or one less
+    return estimate + (2 if n >= 10 ** (estimate + 1) else 1)
+
+
+FUNCTIONS = {
+    "sqrt": math.sqrt, "abs": abs, "round": _round, "floor": math.floor, "ceil": math.ceil,
+    "exp": math.exp, "ln": math.log, "log": math.log, "log10": math.log10, "log2": math.log2,
+    "sin": math.sin, "cos": math.cos, "tan": math.tan, "asin": math.asin, "acos": math.acos,
+    "atan": math.atan, "radians": math.radians, "degrees": math.degrees,
+    "factorial": _factorial, "min": min, "max": max,
+}
+CONSTANTS = {"pi": math.pi, "e": math.e, "tau": math.tau}
+
+# Word forms -> symbols, longest phrases first
+_WORD_OPERATORS = [
+    (r"\bto the power of\b", "**"), (r"\braised to\b", "**"), (r"\bdivided by\b", "/"),
+    (r"\bmultiplied by\b", "*"), (r"\btimes\b", "*"), (r"\bplus\b", "+"), (r"\bminus\b", "-"),
+    (r"\bmod(?:ulo)?\b", "%"), (r"\bover\b", "/"), (r"\bsquared\b", "**2"), (r"\bcubed\b", "**3"),
+    (r"\bsquare root of\b", "sqrt"), (r"\bx\b", "*"),
+]
+
+# Follow-up steps applied to the running result: "add 5", "multiply by 2", "square it", ...
+_STEP_PATTERNS = [
+    (r"^(?:add|plus)\s+(.+?)(?:\s+to it)?$", "({acc}) + ({arg})"),
+    (r"^(?:subtract|minus|take away)\s+(.+?)(?:\s+from it)?$", "({acc}) - ({arg})"),
+    (r"^(?:multiply|times)(?:\s+it)?(?:\s+by)?\s+(.+)$", "({acc}) * ({arg})"),
+    (r"^divide(?:\s+it)?(?:\s+by)?\s+(.+)$", "({acc}) / ({arg})"),
+    (r"^(?:raise(?:\s+it)?\s+to(?:\s+the power of)?|to the power of)\s+(.+)$", "({acc}) ** ({arg})"),
+    (r"^(?:mod(?:ulo)?|modulo by)\s+(.+)$", "({acc}) % ({arg})"),
+    (r"^square(?:\s+it)?$", "({acc}) ** 2"),
+    (r"^(?:take the\s+)?square root(?:\s+of it)?$", "sqrt({acc})"),
+    (r"^([+\-*/%^].+)$", "({acc}) {arg}"),
+]
+
+_CONNECTORS = re.compile(r"\s*(?:,\s*)?(?:\band then\b|\bthen\b|\band\b(?=\s+(?:add|subtract|multiply|divide|raise|square|take)))\s*")
+_PREFIXES = re.compile(r"^(?:please\s+)?(?:what(?:'s| is)|calculate|compute|evaluate|solve|how much is)\s+", re.IGNORECASE)
+
+
+class _Evaluator(ast.NodeVisitor):
+    def visit_Expression(self, node):
+        return self.visit(node.body)
+
+    def visit_Constant(self, node):
+        if isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+            return node.value
+        raise ValueError("only numbers are allowed")
+
+    def visit_Name(self, node):
+        if node.id in CONSTANTS:
+            return CONSTANTS[node.id]
+        raise ValueError(f"unknown name '{node.id}'")
+
+    def visit_UnaryOp(self, node):
+        op = _UNARY_OPS.get(type(node.op))
+        if op is None:
+            raise ValueError("unsupported unary operator")
+        return op(self.visit(node.operand))
+
+    def visit_BinOp(self, node):
+        op = _BINARY_OPS.get(type(node.op))
+        if op is None:
+            raise ValueError("unsupported operator")
+        left, right = self.visit(node.left), self.visit(node.right)
+        if op is operator.pow and (abs(right) > MAX_EXPONENT or (abs(left) > 1 and abs(right) * math.log10(abs(left)) > MAX_EXPONENT)):
+            raise ValueError("exponent too large")
+        return op(left, right)
+
+    def visit_Call(self, node):
+        if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS or node.keywords:
+            raise ValueError("unsupported function")
+        return FUNCTIONS[node.func.id](*[self.visit(arg) for arg in node.args])
+
+    def generic_visit(self, node):
+        raise ValueError(f"unsupported syntax: {type(node).__name__}")
+
+
+def _to_python(expression: str) -> str:
+    text = re.sub(r"(?<!\d)!+$", "", expression.strip().lower().rstrip("?. "))
+    for pattern, replacement in _WORD_OPERATORS:
+        text = re.sub(pattern, f" {replacement} ", text)
+    text = text.replace("^", "**").replace("×", "*").replace("÷", "/")
+    text = re.sub(r"(\d),(\d{3})", r"\1\2", text)            # 1,000 -> 1000
+    text = re.sub(r"(\d+(?:\.\d+)?)\s*!", r"factorial(\1)", text)
+    text = re.sub(r"\bsqrt\s+(\d+(?:\.\d+)?)", r"sqrt(\1)", text)   # "square root of 16"
+    return text
+
+
+def evaluate_expression(expression: str) -> Number:
+    """Evaluate a single arithmetic expression. Raises ValueError/ZeroDivisionError on bad input."""
+    if len(expression) > MAX_INPUT_LENGTH:
+        raise ValueError("expression too long")
+    try:
+        tree = ast.parse(_to_python(expression), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"not an arithmetic expression: {expression!r}") from e
+    result = _Evaluator().visit(tree)
+    # (-8) ** 0.5 is complex and 1e308 * 10 is inf: neither is an answer the calculator should show
+    if isinstance(result, complex):
+        raise ValueError("result is not a real number")
+    if isinstance(result, float) and not math.isfinite(result):
+        raise ValueError("result is not finite")
+    if isinstance(result, int) and _digits(result) > MAX_DIGITS:
+        raise ValueError(f"result has more than {MAX_DIGITS} digits")
+    return result
+
+
+def evaluate_task(task: str) -> Optional[Number]:
+    """
+    Evaluate a natural-language arithmetic task such as "12 * 12 and then add 5".
+    Returns None when the input is not recognizable math, so callers can fall back to the agent.
+    """
+    text = re.sub(r"(?<!\d)!+$", "", _PREFIXES.sub("", task.strip().lower()).rstrip("?. "))
+    if not text or len(text) > MAX_INPUT_LENGTH or not re.search(r"\d|\bpi\b", text):
+        return None
+
+    first, *steps = [part for part in _CONNECTORS.split(text) if part.strip()]
+    expression = _to_python(first)
+    for step in steps:
+        step = step.strip()
+        for pattern, template in _STEP_PATTERNS:
+            m = re.match(pattern, step)
+            if m:
+                arg = _to_python(m.group(1)) if m.groups() else ""
+                expression = template.format(acc=expression, arg=arg)
+                break
+        else:
+            return None
+
+    try:
+        return evaluate_expression(expression)
+    except (ValueError, ZeroDivisionError, OverflowError, TypeError):
+        return None
+
+
+def format_number(value: Number) -> str:
+    """12.0 -> '12', 0.1 + 0.2 -> '0.3', ints over MAX_DIGITS digits in scientific notation."""
+    if isinstance(value, float):
+        if value.is_integer() and abs(value) < 1e15:
+            return str(int(value))
+        return f"{value:.10g}"
+    if isinstance(value, int) and _digits(value) > MAX_DIGITS:
+        exponent = _digits(value) - 1
+        mantissa = abs(value) // 10 ** (exponent - 10) / 10 ** 10
+        return f"{'-' if value < 0 else ''}{mantissa:.10g}e+{exponent}"
+    return str(value)
@@ -0,0 +1,173 @@
+# offer_cache.py
+"""
+Shared TTL cache for Amadeus offer searches.
+
+`flight_offers_search` and `hotel_offers_search` are the slowest and most quota-limited calls the
+travel apps make, and users often repeat (or slightly re-phrase) the same search. Results are stored
+in SQLite keyed by the normalized search parameters so they survive Streamlit restarts.
+
+- age < ttl                  -> fresh hit, served from disk
+- ttl <= age < ttl + stale   -> stale hit, served immediately and refreshed in a background thread
+- older / missing            -> miss, fetched synchronously and stored
+
+Empty results ("no offers") are returned but never stored: availability changes quickly, and
+caching an empty answer would hide new offers for the whole TTL.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+DEFAULT_PATH = os.getenv(
+    "OFFER_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "offer_cache.sqlite3"),
+)
+DEFAULT_TTL = float(os.getenv("OFFER_CACHE_TTL", "900"))        # 15 minutes
+DEFAULT_STALE = float(os.getenv("OFFER_CACHE_STALE", "3600"))   # serve-while-refreshing window
+
+# Parameters whose values are codes and should be compared case-insensitively
+_UPPERCASE_PARAMS = {"originLocationCode", "destinationLocationCode", "cityCode", "hotelIds", "currencyCode"}
+
+
+def make_key(namespace: str, params: Dict[str, Any]) -> str:
+    """Stable cache key: codes upper-cased, hotel IDs sorted, parameters in a fixed order."""
+    normalized = {}
+    for name, value in params.items():
+        if value is None:
+            continue
+        if name == "hotelIds":
+            ids = value.split(",") if isinstance(value, str) else list(value)
+            value = ",".join(sorted(i.strip().upper() for i in ids if i.strip()))
+        elif name in _UPPERCASE_PARAMS:
+            value = str(value).strip().upper()
+        elif isinstance(value, str):
+            value = value.strip()
+        normalized[name] = value
+    return f"{namespace}:{json.dumps(normalized, sort_keys=True, default=str)}"
+
+
+class OfferCache:
+    """SQLite-backed TTL cache with stale-while-revalidate and hit/miss counters."""
+
+    def __init__(self, path: str = DEFAULT_PATH, ttl: float = DEFAULT_TTL, stale: float = DEFAULT_STALE):
+        self.path = path
+        self.ttl = ttl
+        self.stale = stale
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "errors": 0}
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS offers (key TEXT PRIMARY KEY, stored_at REAL NOT NULL, payload TEXT NOT NULL)"
+            )
+            self._conn.commit()
+
+    # -----------------------------
+    # Storage
+    # -----------------------------
+    def _read(self, key: str):
+        with self._lock:
+            row = self._conn.execute("SELECT stored_at, payload FROM offers WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def _write(self, key: str, value: Any) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO offers (key, stored_at, payload) VALUES (?, ?, ?)",
+                (key, now, json.dumps(value, default=str)),
+            )
+            self._conn.execute("DELETE FROM offers WHERE stored_at < ?", (now - self.ttl - self.stale,))
+            self._conn.commit()
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self.stats[stat] += 1
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    def get_or_fetch(self, namespace: str, params: Dict[str, Any], fetch: Callable[[], Any]) -> Any:
+        """
+        Return the cached result for (namespace, params) or call `fetch()` and store it (unless empty).
+        `fetch` must return something JSON-serializable (e.g. an Amadeus `response.data` list).
+        """
+        key = make_key(namespace, params)
+        cached = self._read(key)
+        if cached is not None:
+            stored_at, value = cached
+            age = time.time() - stored_at
+            if age < self.ttl:
+                self._count("hits")
+                return value
+            if age < self.ttl + self.stale:
+                self._count("stale_hits")
+                self._refresh_in_background(key, fetch)
+                return value
+
+        self._count("misses")
+        value = fetch()
+        if value:
+            self._write(key, value)
+        return value
+
+    def _refresh_in_background(self, key: str, fetch: Callable[[], Any]) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def _refresh():
+            try:
+                value = fetch()
+                if value:
+                    self._write(key, value)
+                self._count("refreshes")
+            except Exception:
+                # Keep serving the stale copy; the next request past the stale window refetches.
+                self._count("errors")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=_refresh, daemon=True).start()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM offers")
+            self._conn.commit()
+
+    def hit_rate(self) -> float:
+        served = self.stats["hits"] + self.stats["stale_hits"]
+        total = served + self.stats["misses"]
+        return served / total if total else 0.0
+
+    def stats_markdown(self) -> str:
+        s = self.stats
+        return (
+            f"**Offer cache** — hits: {s['hits']}, stale hits: {s['stale_hits']}, "
+            f"misses: {s['misses']}, hit rate: {self.hit_rate():.0%}"
+        )
+
+
+_default_cache: Optional[OfferCache] = None
+_default_lock = threading.Lock()
+
+
+def get_offer_cache() -> OfferCache:
+    """One cache (and one SQLite connection) per process, shared by every travel app."""
+    global _default_cache
+    if _default_cache is None:
+        with _default_lock:
+            if _default_cache is None:
+                _default_cache = OfferCache()
+    return _default_cache
@@ -0,0 +1,57 @@
+# prompt_registry.py
+"""
+Local registry of vendored LangChain hub prompts.
+
+`hub.pull("hwchase17/react-chat")` is a network fetch on every cold start: slow, and it fails
+outright when the network is down. The templates we use are shipped in `common/prompts/` and loaded
+from disk (and memoized per process). To update the local copies from the hub run:
+
+    python -m common.prompt_registry refresh            # every registered prompt
+    python -m common.prompt_registry refresh react-chat # a single one
+"""
+
+import os
+import sys
+from functools import lru_cache
+
+PROMPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "prompts")
+
+# Local name -> hub handle
+REGISTRY = {
+    "react": "hwchase17/react",
+    "react-chat": "hwchase17/react-chat",
+}
+
+
+def _path(name: str) -> str:
+    if name not in REGISTRY:
+        raise KeyError(f"Unknown prompt '{name}'. Registered prompts: {', '.join(sorted(REGISTRY))}")
+    return os.path.join(PROMPTS_DIR, f"{name}.txt")
+
+
+@lru_cache(maxsize=None)
+def load_prompt(name: str):
+    """Vendored template for `name` (e.g. "react-chat"), read from disk once per process."""
+    from langchain.prompts import PromptTemplate
+
+    with open(_path(name), encoding="utf-8") as f:
+        return PromptTemplate.from_template(f.read())
+
+
+def refresh_from_hub(name: str) -> str:
+    """Pull the latest template from the LangChain hub and overwrite the local copy."""
+    from langchain import hub
+
+    template = hub.pull(REGISTRY[name]).template
+    with open(_path(name), "w", encoding="utf-8") as f:
+        f.write(template)
+    load_prompt.cache_clear()
+    return template
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "refresh":
+        sys.exit("usage: python -m common.prompt_registry refresh [name ...]")
+    for prompt_name in sys.argv[2:] or sorted(REGISTRY):
+        refresh_from_hub(prompt_name)
+        print(f"✅ Refreshed '{prompt_name}' from {REGISTRY[prompt_name]}")
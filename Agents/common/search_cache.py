@@ -0,0 +1,118 @@
+# search_cache.py
+"""
+TTL-cached, deduplicated web search for the agents.
+
+Every "Web Search" action called `SerpAPIWrapper.run` again, even when the agent repeated a query
+within one run or another user had just asked the same thing. `CachedSearch` wraps any
+`query -> str` backend:
+
+- queries are normalized (case, quotes, whitespace, trailing punctuation) before lookup;
+- results are kept for `ttl` seconds in a bounded in-process cache shared by all sessions;
+- concurrent identical queries are coalesced: one caller fetches, the others wait for its result.
+"""
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+DEFAULT_TTL = float(os.getenv("SEARCH_CACHE_TTL", "3600"))   # 1 hour
+MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "512"))
+
+
+def normalize_query(query: str) -> str:
+    text = query.strip().lower()
+    text = re.sub(r"[\"'`“”‘’]", "", text)
+    text = re.sub(r"\s+", " ", text)
+    return text.rstrip("?.!, ")
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[str] = None
+        self.error: Optional[BaseException] = None
+
+
+class CachedSearch:
+    def __init__(self, backend: Callable[[str], str], ttl: float = DEFAULT_TTL, max_entries: int = MAX_ENTRIES):
+        self.backend = backend
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._inflight: Dict[str, _Call] = {}
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+        self.upstream_seconds = 0.0
+
+    def run(self, query: str) -> str:
+        key = normalize_query(query)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and time.monotonic() - cached[0] < self.ttl:
+                self._cache.move_to_end(key)
+                self.stats["hits"] += 1
+                return cached[1]
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+                self.stats["misses"] += 1
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        start = time.perf_counter()
+        try:
+            call.result = self.backend(query)
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self.stats["errors"] += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.upstream_seconds += elapsed
+                if call.error is None:
+                    self._cache[key] = (time.monotonic(), call.result)
+                    self._cache.move_to_end(key)
+                    while len(self._cache) > self.max_entries:
+                        self._cache.popitem(last=False)
+                del self._inflight[key]
+            call.done.set()
+        return call.result
+
+    def hit_rate(self) -> float:
+        served = self.stats["hits"] + self.stats["coalesced"]
+        total = served + self.stats["misses"]
+        return served / total if total else 0.0
+
+    def stats_markdown(self) -> str:
+        s = self.stats
+        avg = self.upstream_seconds / s["misses"] if s["misses"] else 0.0
+        return (
+            f"**Search cache** — hits: {s['hits']}, coalesced: {s['coalesced']}, upstream calls: {s['misses']} "
+            f"({s['errors']} failed), "
+            f"hit rate: {self.hit_rate():.0%}, upstream avg: {avg * 1000:.0f} ms"
+        )
+
+
+_searches: Dict[str, CachedSearch] = {}
+_searches_lock = threading.Lock()
+
+
+def get_cached_search(name: str, backend: Callable[[str], str]) -> CachedSearch:
+    """One cached search per backend name per process, shared by every session."""
+    with _searches_lock:
+        search = _searches.get(name)
+        if search is None:
+            search = _searches[name] = CachedSearch(backend)
+        return search
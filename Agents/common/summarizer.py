@@ -0,0 +1,110 @@
+# summarizer.py
+"""
+Local extractive summarizer (TextRank over sentences).
+
+The multi-tool agent's "Summarizer" only cut text at 150 characters, so the LLM kept iterating to
+summarize search results itself. `summarize` ranks sentences with TextRank (a sentence graph
+weighted by content-word overlap, scored by PageRank) and returns the top ones in their original
+order. Given the search query, sentences that mention its distinctive words are ranked higher. It takes milliseconds and makes no LLM call.
+"""
+
+import ast
+import math
+import re
+from typing import List
+
+MAX_SENTENCES = 3
+MAX_CHARS = 600
+DAMPING = 0.85
+ITERATIONS = 30
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(])|\n+")
+_WORD = re.compile(r"[a-z0-9][a-z0-9'-]*")
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below between
+both but by can could did do does doing down during each few for from further had has have having he her
+here hers him his how i if in into is it its itself just me more most my no nor not of off on once only or
+other our ours out over own same she should so some such than that the their theirs them then there these
+they this those through to too under until up very was we were what when where which while who whom why
+will with would you your yours also may might one two new said says
+""".split())
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in _SENTENCE_SPLIT.split(text) if len(s.strip()) > 1]
+
+
+def _words(sentence: str) -> set:
+    return {w for w in _WORD.findall(sentence.lower()) if w not in STOPWORDS}
+
+
+def _similarity(a: set, b: set) -> float:
+    # Content-word overlap, cosine-normalized so short sentences are not favoured
+    if not a or not b:
+        return 0.0
+    return len(a & b) / math.sqrt(len(a) * len(b))
+
+
+def rank_sentences(sentences: List[str], query: str = "") -> List[float]:
+    """TextRank score per sentence, biased towards `query` when given."""
+    n = len(sentences)
+    words = [_words(s) for s in sentences]
+    relevance = _query_relevance(words, query)
+    weights = [[_similarity(words[i], words[j]) if i != j else 0.0 for j in range(n)]
+               for i in range(n)]
+    out_sums = [sum(row) for row in weights]
+
+    scores = [1.0 / n] * n
+    for _ in range(ITERATIONS):
+        scores = [
+            (1 - DAMPING) / n + DAMPING * sum(weights[j][i] / out_sums[j] * scores[j] for j in range(n) if out_sums[j])
+            for i in range(n)
+        ]
+    # Mild lead bias: search snippets put the most relevant result first
+    return [score * relevance[i] * (1 + 0.2 / (1 + i)) for i, score in enumerate(scores)]
+
+
+def _query_relevance(words: List[set], query: str) -> List[float]:
+    """1.0 .. 3.0 per sentence by IDF-weighted query-word overlap (words in every sentence count 0)."""
+    query_words = _words(query)
+    if not query_words:
+        return [1.0] * len(words)
+    n = len(words)
+    idf = {w: math.log(n / sum(1 for s in words if w in s)) for w in query_words if any(w in s for s in words)}
+    raw = [sum(idf.get(w, 0.0) for w in s & query_words) for s in words]
+    top = max(raw)
+    return [1.0 + 2.0 * r / top if top else 1.0 for r in raw]
+
+
+def _flatten(text: str) -> str:
+    """SerpAPIWrapper returns a list repr ("['snippet', ...]") for multi-result answers."""
+    stripped = text.strip()
+    if stripped.startswith("[") and stripped.endswith("]"):
+        try:
+            items = ast.literal_eval(stripped)
+        except (ValueError, SyntaxError):
+            return text
+        if isinstance(items, list):
+            parts = [str(item).strip() for item in items if str(item).strip()]
+            return " ".join(p if p[-1] in ".!?" else p + "." for p in parts)
+    return text
+
+
+def summarize(text: str, max_sentences: int = MAX_SENTENCES, max_chars: int = MAX_CHARS, query: str = "") -> str:
+    """The `max_sentences` most central sentences of `text`, in original order, within `max_chars`."""
+    text = _flatten(text)
+    sentences = list(dict.fromkeys(split_sentences(text)))  # drop repeated snippets
+    if len(sentences) <= max_sentences and len(text) <= max_chars:
+        return text.strip()
+
+    scores = rank_sentences(sentences, query)
+    chosen, length = [], 0
+    for i in sorted(range(len(sentences)), key=scores.__getitem__, reverse=True):
+        if len(chosen) == max_sentences:
+            break
+        if length + len(sentences[i]) > max_chars and chosen:
+            continue
+        chosen.append(i)
+        length += len(sentences[i]) + 1
+    summary = " ".join(sentences[i] for i in sorted(chosen))
+    return summary if len(summary) <= max_chars else summary[:max_chars - 3].rsplit(" ", 1)[0] + "..."
@@ -0,0 +1,213 @@
+# telemetry.py
+"""
+Agent telemetry: per-step latency and token records for every agent.
+
+The agents used to run with `verbose=True`, which printed Thought/Action text to the terminal and
+gave no numbers. `common.telemetry_callbacks.TelemetryCallbackHandler` turns LangChain callback
+events into records, and this module stores them:
+
+- every record is appended to a rotating JSONL file (AGENT_TELEMETRY_PATH, rotated at
+  AGENT_TELEMETRY_MAX_BYTES with AGENT_TELEMETRY_BACKUPS old files kept);
+- counters and latency histograms are kept in memory and exported as Prometheus text
+  (`prometheus_text()`, also written to AGENT_TELEMETRY_PROM_PATH after every run when set,
+  e.g. for node_exporter's textfile collector);
+- `render_sidebar(st, agent)` shows the last run of an agent in a Streamlit sidebar panel.
+
+Record kinds: "llm" (latency, prompt/completion tokens), "tool" (name, input/output size, latency,
+error), "run" (end-to-end time, steps, LLM/tool totals, parse-error retries).
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from logging.handlers import RotatingFileHandler
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_PATH = os.getenv(
+    "AGENT_TELEMETRY_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "agent_telemetry.jsonl"),
+)
+MAX_BYTES = int(os.getenv("AGENT_TELEMETRY_MAX_BYTES", str(5 * 1024 * 1024)))
+BACKUPS = int(os.getenv("AGENT_TELEMETRY_BACKUPS", "5"))
+PROM_PATH = os.getenv("AGENT_TELEMETRY_PROM_PATH")
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+def _labels(**labels) -> str:
+    return "{" + ",".join(f'{k}="{str(v)}"' for k, v in labels.items()) + "}"
+
+
+class Telemetry:
+    def __init__(self, path: Optional[str] = DEFAULT_PATH, max_bytes: int = MAX_BYTES, backups: int = BACKUPS,
+                 prom_path: Optional[str] = PROM_PATH, recent: int = 500):
+        self.path = path
+        self.prom_path = prom_path
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=recent)
+        self._counters: Dict[Tuple, float] = defaultdict(float)
+        self._histograms: Dict[Tuple, Histogram] = {}
+
+        self._log = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._log = logging.getLogger(f"agent_telemetry.{id(self)}")
+            self._log.setLevel(logging.INFO)
+            self._log.propagate = False
+            handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self._log.addHandler(handler)
+
+    # -----------------------------
+    # Recording
+    # -----------------------------
+    def record(self, record: dict) -> None:
+        record.setdefault("ts", time.time())
+        with self._lock:
+            self._recent.append(record)
+            self._aggregate(record)
+        if self._log:
+            self._log.info(json.dumps(record, default=str))
+        if record["kind"] == "run" and self.prom_path:
+            self.write_prometheus(self.prom_path)
+
+    def _inc(self, name: str, value: float = 1.0, **labels) -> None:
+        self._counters[(name, tuple(sorted(labels.items())))] += value
+
+    def _observe(self, name: str, value: float, **labels) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        if key not in self._histograms:
+            self._histograms[key] = Histogram()
+        self._histograms[key].observe(value)
+
+    def _aggregate(self, r: dict) -> None:
+        agent = r.get("agent", "unknown")
+        seconds = r.get("latency_ms", 0.0) / 1000
+        if r["kind"] == "llm":
+            self._inc("agent_llm_calls_total", agent=agent)
+            self._observe("agent_llm_latency_seconds", seconds, agent=agent)
+            self._inc("agent_tokens_total", r.get("prompt_tokens", 0), agent=agent, type="prompt")
+            self._inc("agent_tokens_total", r.get("completion_tokens", 0), agent=agent, type="completion")
+        elif r["kind"] == "tool":
+            status = "error" if r.get("error") else "ok"
+            self._inc("agent_tool_calls_total", agent=agent, tool=r.get("tool"), status=status)
+            self._observe("agent_tool_latency_seconds", seconds, agent=agent, tool=r.get("tool"))
+        elif r["kind"] == "run":
+            self._inc("agent_runs_total", agent=agent, status="error" if r.get("error") else "ok")
+            self._observe("agent_run_duration_seconds", seconds, agent=agent)
+            self._inc("agent_parse_errors_total", r.get("parse_errors", 0), agent=agent)
+
+    # -----------------------------
+    # Export
+    # -----------------------------
+    def prometheus_text(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for name in sorted({key[0] for key in self._counters}):
+                lines.append(f"# TYPE {name} counter")
+                for (metric, labels), value in sorted(self._counters.items()):
+                    if metric == name:
+                        lines.append(f"{name}{_labels(**dict(labels))} {value:g}")
+            for name in sorted({key[0] for key in self._histograms}):
+                lines.append(f"# TYPE {name} histogram")
+                for (metric, labels), hist in sorted(self._histograms.items()):
+                    if metric != name:
+                        continue
+                    labels = dict(labels)
+                    for bound, count in zip(hist.buckets, hist.counts):
+                        lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {count}")
+                    lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {hist.count}")
+                    lines.append(f"{name}_sum{_labels(**labels)} {hist.sum:.6f}")
+                    lines.append(f"{name}_count{_labels(**labels)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp, path)  # atomic, so a scraper never reads a half-written file
+
+    def recent(self, agent: Optional[str] = None, kind: Optional[str] = None) -> List[dict]:
+        with self._lock:
+            return [r for r in self._recent
+                    if (agent is None or r.get("agent") == agent) and (kind is None or r["kind"] == kind)]
+
+    def last_run(self, agent: str) -> Tuple[Optional[dict], List[dict]]:
+        """The latest "run" record of `agent` and its step records."""
+        runs = self.recent(agent, "run")
+        if not runs:
+            return None, []
+        run = runs[-1]
+        return run, [r for r in self.recent(agent) if r.get("run_id") == run["run_id"] and r["kind"] != "run"]
+
+    # -----------------------------
+    # Streamlit
+    # -----------------------------
+    def render_sidebar(self, st, agent: str) -> None:
+        run, steps = self.last_run(agent)
+        st.sidebar.header("Telemetry")
+        if run is None:
+            st.sidebar.caption("No agent runs yet.")
+            return
+        st.sidebar.metric("Last run", f"{run['latency_ms'] / 1000:.2f}s", help="End-to-end agent time")
+        st.sidebar.caption(
+            f"LLM: {run['llm_calls']} calls, {run['llm_ms'] / 1000:.2f}s, "
+            f"{run['prompt_tokens']} prompt + {run['completion_tokens']} completion tokens  \n"
+            f"Tools: {run['tool_calls']} calls, {run['tool_ms'] / 1000:.2f}s  \n"
+            f"Parse-error retries: {run['parse_errors']}"
+            + (f"  \n❌ {run['error']}" if run.get("error") else "")
+        )
+        with st.sidebar.expander("Steps of the last run"):
+            st.table({
+                "Step": [r.get("tool") or r.get("model") or r["kind"] for r in steps],
+                "Kind": [r["kind"] for r in steps],
+                "Latency (ms)": [f"{r['latency_ms']:.0f}" for r in steps],
+                "Tokens / chars": [
+                    f"{r.get('prompt_tokens', 0)}+{r.get('completion_tokens', 0)}" if r["kind"] == "llm"
+                    else f"{r.get('input_chars', 0)} in / {r.get('output_chars', 0)} out"
+                    for r in steps
+                ],
+            })
+        with st.sidebar.expander("Prometheus metrics"):
+            st.code(self.prometheus_text(), language="text")
+
+
+_telemetry: Optional[Telemetry] = None
+_telemetry_lock = threading.Lock()
+
+
+def get_telemetry() -> Telemetry:
+    """Process-wide telemetry store shared by every agent."""
+    global _telemetry
+    with _telemetry_lock:
+        if _telemetry is None:
+            _telemetry = Telemetry()
+        return _telemetry
+
+
+def get_callbacks(agent: str) -> list:
+    """
+    Callback list for one agent, to pass at invocation time so LLM and tool events are inherited:
+    `agent.invoke(inputs, config={"callbacks": get_callbacks("weather")})`.
+    """
+    from common.telemetry_callbacks import get_handler
+
+    return [get_handler(agent, get_telemetry())]
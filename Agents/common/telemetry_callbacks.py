@@ -0,0 +1,168 @@
+# telemetry_callbacks.py
+"""
+LangChain callback handler that feeds `common.telemetry`.
+
+Kept separate from `telemetry.py` so that rendering the sidebar panel does not import LangChain.
+One handler per agent name is shared by all sessions; LangChain run IDs keep concurrent runs apart.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# AgentExecutor runs this pseudo-tool when the LLM output could not be parsed (handle_parsing_errors)
+PARSE_ERROR_TOOL = "_Exception"
+
+
+def _token_usage(response) -> Dict[str, int]:
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    if usage:
+        return {"prompt_tokens": usage.get("prompt_tokens", 0), "completion_tokens": usage.get("completion_tokens", 0)}
+    # Newer chat models report usage on the message instead
+    for generations in response.generations:
+        for generation in generations:
+            meta = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+            if meta:
+                return {"prompt_tokens": meta.get("input_tokens", 0), "completion_tokens": meta.get("output_tokens", 0)}
+    return {"prompt_tokens": 0, "completion_tokens": 0}
+
+
+class TelemetryCallbackHandler(BaseCallbackHandler):
+    def __init__(self, agent: str, telemetry):
+        self.agent = agent
+        self.telemetry = telemetry
+        self._lock = threading.Lock()
+        self._root: Dict[UUID, UUID] = {}       # run_id -> top-level run_id
+        self._started: Dict[UUID, float] = {}   # run_id -> perf_counter at start
+        self._tools: Dict[UUID, dict] = {}
+        self._runs: Dict[UUID, dict] = {}       # top-level run_id -> running totals
+
+    # -----------------------------
+    # Bookkeeping
+    # -----------------------------
+    def _start(self, run_id: UUID, parent_run_id: Optional[UUID]) -> UUID:
+        with self._lock:
+            root = self._root.get(parent_run_id, parent_run_id) if parent_run_id else run_id
+            self._root[run_id] = root
+            self._started[run_id] = time.perf_counter()
+            if root == run_id:
+                self._runs[run_id] = {"llm_calls": 0, "llm_ms": 0.0, "prompt_tokens": 0, "completion_tokens": 0,
+                                      "tool_calls": 0, "tool_ms": 0.0, "parse_errors": 0, "steps": 0}
+            return root
+
+    def _finish(self, run_id: UUID):
+        with self._lock:
+            started = self._started.pop(run_id, None)
+            root = self._root.get(run_id, run_id)
+            if root != run_id:
+                self._root.pop(run_id, None)
+            totals = self._runs.get(root)
+        latency_ms = (time.perf_counter() - started) * 1000 if started else 0.0
+        return root, latency_ms, totals
+
+    def _emit(self, kind: str, root: UUID, latency_ms: float, **fields) -> None:
+        self.telemetry.record({"kind": kind, "agent": self.agent, "run_id": str(root),
+                               "latency_ms": round(latency_ms, 2), **fields})
+
+    # -----------------------------
+    # Chains (the top-level chain is the agent run)
+    # -----------------------------
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, **kwargs) -> None:
+        self._start(run_id, parent_run_id)
+
+    def on_chain_end(self, outputs, *, run_id, parent_run_id=None, **kwargs) -> None:
+        self._end_chain(run_id, error=None)
+
+    def on_chain_error(self, error, *, run_id, parent_run_id=None, **kwargs) -> None:
+        self._end_chain(run_id, error=f"{type(error).__name__}: {error}")
+
+    def _end_chain(self, run_id: UUID, error: Optional[str]) -> None:
+        root, latency_ms, totals = self._finish(run_id)
+        if root == run_id:
+            self._end_run(root, latency_ms, error)
+
+    def _end_run(self, root: UUID, latency_ms: float, error: Optional[str]) -> None:
+        with self._lock:
+            totals = self._runs.pop(root, None)
+            self._root.pop(root, None)
+        self._emit("run", root, latency_ms, error=error, **(totals or {}))
+
+    def on_agent_action(self, action, *, run_id, parent_run_id=None, **kwargs) -> None:
+        with self._lock:
+            totals = self._runs.get(self._root.get(run_id, run_id))
+            if totals is not None:
+                totals["steps"] += 1
+
+    # -----------------------------
+    # LLM calls
+    # -----------------------------
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, **kwargs) -> None:
+        self._start(run_id, parent_run_id)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, **kwargs) -> None:
+        self._start(run_id, parent_run_id)
+
+    def on_llm_end(self, response, *, run_id, parent_run_id=None, **kwargs) -> None:
+        root, latency_ms, totals = self._finish(run_id)
+        usage = _token_usage(response)
+        model = (response.llm_output or {}).get("model_name")
+        if totals is not None:
+            with self._lock:
+                totals["llm_calls"] += 1
+                totals["llm_ms"] += latency_ms
+                totals["prompt_tokens"] += usage["prompt_tokens"]
+                totals["completion_tokens"] += usage["completion_tokens"]
+        self._emit("llm", root, latency_ms, model=model, **usage)
+        if root == run_id:  # a bare LLM call (no agent around it) is a run of its own
+            self._end_run(root, latency_ms, None)
+
+    def on_llm_error(self, error, *, run_id, parent_run_id=None, **kwargs) -> None:
+        root, latency_ms, _ = self._finish(run_id)
+        message = f"{type(error).__name__}: {error}"
+        self._emit("llm", root, latency_ms, error=message, prompt_tokens=0, completion_tokens=0)
+        if root == run_id:
+            self._end_run(root, latency_ms, message)
+
+    # -----------------------------
+    # Tools
+    # -----------------------------
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs) -> None:
+        self._start(run_id, parent_run_id)
+        name = (serialized or {}).get("name") or kwargs.get("name") or "tool"
+        with self._lock:
+            self._tools[run_id] = {"tool": name, "input_chars": len(str(input_str))}
+
+    def on_tool_end(self, output: Any, *, run_id, parent_run_id=None, **kwargs) -> None:
+        self._end_tool(run_id, output=output, error=None)
+
+    def on_tool_error(self, error, *, run_id, parent_run_id=None, **kwargs) -> None:
+        self._end_tool(run_id, output="", error=f"{type(error).__name__}: {error}")
+
+    def _end_tool(self, run_id: UUID, output: Any, error: Optional[str]) -> None:
+        root, latency_ms, totals = self._finish(run_id)
+        with self._lock:
+            info = self._tools.pop(run_id, {"tool": "tool", "input_chars": 0})
+            if totals is not None:
+                if info["tool"] == PARSE_ERROR_TOOL:
+                    totals["parse_errors"] += 1
+                else:
+                    totals["tool_calls"] += 1
+                    totals["tool_ms"] += latency_ms
+        self._emit("tool", root, latency_ms, output_chars=len(str(output)), error=error, **info)
+        if root == run_id:
+            self._end_run(root, latency_ms, error)
+
+
+_handlers: Dict[str, TelemetryCallbackHandler] = {}
+_handlers_lock = threading.Lock()
+
+
+def get_handler(agent: str, telemetry) -> TelemetryCallbackHandler:
+    with _handlers_lock:
+        handler = _handlers.get(agent)
+        if handler is None:
+            handler = _handlers[agent] = TelemetryCallbackHandler(agent, telemetry)
+        return handler
@@ -0,0 +1,153 @@
+# todo_store.py
+"""
+SQLite storage engine for the to-do agent.
+
+Replaces the flat `todo_list.txt`: items get stable IDs and a pending/done status, writes from
+concurrent Streamlit sessions are serialized by SQLite (WAL mode, so readers never block), and the
+rendered list is cached against a version counter that every write bumps, so an unchanged list is
+never re-read on a rerun.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+
+PENDING = "pending"
+DONE = "done"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id         INTEGER PRIMARY KEY AUTOINCREMENT,
+    text       TEXT NOT NULL,
+    status     TEXT NOT NULL DEFAULT 'pending',
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_items_status_id ON items (status, id);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0);
+"""
+
+
+class TodoStore:
+    """Thread-safe to-do list backed by SQLite in WAL mode."""
+
+    def __init__(self, path: str = "todo_list.sqlite3", legacy_txt: Optional[str] = None):
+        self.path = path
+        self._local = threading.local()
+        self._cache_lock = threading.Lock()
+        self._view_cache = {}
+
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        if legacy_txt:
+            self._import_legacy(legacy_txt)
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; Streamlit serves each session on its own thread.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _write(self, sql: str, params: Tuple = ()) -> sqlite3.Cursor:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = conn.execute(sql, params)
+            conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+            conn.execute("COMMIT")
+            return cursor
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _import_legacy(self, txt_path: str) -> None:
+        """
+        One-time import of the old flat-file list into a fresh database. Recorded in `meta`, so a
+        list cleared later stays cleared across restarts; a database that has ever been written to
+        (version > 0, including ones created before the flag existed) is never imported into.
+        """
+        if not os.path.exists(txt_path):
+            return
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            done = conn.execute("SELECT value FROM meta WHERE key = 'legacy_imported'").fetchone()
+            if done is None and self.version() == 0:
+                with open(txt_path) as f:
+                    lines = [line.strip() for line in f if line.strip()]
+                conn.executemany(
+                    "INSERT INTO items (text, status, created_at) VALUES (?, ?, ?)",
+                    [(line, PENDING, time.time()) for line in lines],
+                )
+                conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('legacy_imported', 1)")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    # -----------------------------
+    # Writes
+    # -----------------------------
+    def add(self, text: str) -> int:
+        return self._write(
+            "INSERT INTO items (text, status, created_at) VALUES (?, ?, ?)", (text, PENDING, time.time())
+        ).lastrowid
+
+    def set_status(self, item_id: int, status: str) -> bool:
+        return self._write("UPDATE items SET status = ? WHERE id = ?", (status, item_id)).rowcount > 0
+
+    def clear(self) -> None:
+        self._write("DELETE FROM items")
+
+    # -----------------------------
+    # Reads
+    # -----------------------------
+    def version(self) -> int:
+        return self._conn().execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+
+    def count(self, status: Optional[str] = None) -> int:
+        if status is None:
+            return self._conn().execute("SELECT COUNT(*) FROM items").fetchone()[0]
+        return self._conn().execute("SELECT COUNT(*) FROM items WHERE status = ?", (status,)).fetchone()[0]
+
+    def get(self, item_id: int) -> Optional[Tuple[int, str, str]]:
+        return self._conn().execute("SELECT id, text, status FROM items WHERE id = ?", (item_id,)).fetchone()
+
+    def items(self, status: Optional[str] = None, limit: int = 50) -> List[Tuple[int, str, str]]:
+        """Most recent items first, served straight from the (status, id) index."""
+        if status is None:
+            sql, params = "SELECT id, text, status FROM items ORDER BY id DESC LIMIT ?", (limit,)
+        else:
+            sql = "SELECT id, text, status FROM items WHERE status = ? ORDER BY id DESC LIMIT ?"
+            params = (status, limit)
+        return self._conn().execute(sql, params).fetchall()
+
+    def render(self, limit: int = 50) -> str:
+        """Formatted list for the agent and the sidebar, cached until the next write."""
+        version = self.version()
+        with self._cache_lock:
+            cached = self._view_cache.get(limit)
+            if cached and cached[0] == version:
+                return cached[1]
+
+        pending, done = self.count(PENDING), self.count(DONE)
+        if pending + done == 0:
+            text = "The to-do list is currently empty."
+        else:
+            rows = self.items(limit=limit)
+            lines = [f"- [{'x' if status == DONE else ' '}] #{item_id} {item}" for item_id, item, status in rows]
+            header = f"Current To-Do List ({pending} pending, {done} done):"
+            if pending + done > len(rows):
+                header += f" showing the {len(rows)} most recent"
+            text = header + "\n" + "\n".join(lines)
+
+        with self._cache_lock:
+            self._view_cache[limit] = (version, text)
+        return text
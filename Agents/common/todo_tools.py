@@ -0,0 +1,76 @@
+# todo_tools.py
+"""
+The to-do agent's tools over one `TodoStore`.
+
+Shared by the Streamlit app (to-do-list.py) and the headless agent service, so both give the LLM
+the same tool names and descriptions and format the observations in the same way.
+"""
+
+from common.todo_store import DONE, TodoStore
+
+
+class TodoTools:
+    def __init__(self, store: TodoStore):
+        self.store = store
+
+    def add_to_list(self, item: str) -> str:
+        """Adds a new single task/item to the to-do list."""
+        try:
+            item_id = self.store.add(item.strip())
+            return f"Successfully added '{item}' to the to-do list as item #{item_id}."
+        except Exception as e:
+            return f"Error adding item: {e}"
+
+    def view_list(self, query: str = "") -> str:
+        """Returns the current items in the to-do list (cached until the list changes)."""
+        try:
+            return self.store.render()
+        except Exception as e:
+            return f"Error viewing list: {e}"
+
+    def complete_item(self, item_id: str) -> str:
+        """Marks an item as done by its ID."""
+        try:
+            item_id = int(str(item_id).strip().lstrip("#"))
+            if self.store.set_status(item_id, DONE):
+                return f"Marked item #{item_id} as done."
+            return f"No item with ID #{item_id} was found."
+        except ValueError:
+            return "Error: input must be the numeric item ID, e.g. '3'."
+        except Exception as e:
+            return f"Error completing item: {e}"
+
+    def clear_list(self, query: str = "") -> str:
+        """Empties the entire to-do list."""
+        try:
+            self.store.clear()
+            return "To-do list cleared successfully."
+        except Exception as e:
+            return f"Error clearing list: {e}"
+
+    def as_tools(self) -> list:
+        """LangChain Tool objects (LangChain is imported here, not at module import)."""
+        from langchain.agents import Tool
+
+        return [
+            Tool(
+                name="Add_Item",
+                func=self.add_to_list,
+                description="Useful for adding a new task to the to-do list. Input must be the exact task string."
+            ),
+            Tool(
+                name="View_List",
+                func=self.view_list,
+                description="Useful for showing all current tasks in the list. Input is ignored (use an empty string)."
+            ),
+            Tool(
+                name="Complete_Item",
+                func=self.complete_item,
+                description="Useful for marking a task as done. Input must be the numeric item ID shown by View_List."
+            ),
+            Tool(
+                name="Clear_List",
+                func=self.clear_list,
+                description="Useful for deleting all tasks from the list. Input is ignored (use an empty string)."
+            ),
+        ]
@@ -0,0 +1,162 @@
+# travel_tools.py
+"""
+Flight, hotel and weather tools shared by the Streamlit apps and the headless agent service.
+
+The functions used to live inside the Streamlit scripts, so they could only run under
+`streamlit run`. Here they take their clients as arguments and report UI side effects through
+their return value or a callback:
+
+- `search_flights` also returns the normalized `FlightTable`, which the flight app keeps in
+  session state for re-sorting;
+- `search_hotels` calls `on_progress(markdown)` while hotel offers stream in.
+
+`*_TOOL` are the LangChain `Tool` name/description/return_direct settings, so every entry point
+describes the tools to the LLM in the same way.
+"""
+
+import os
+import re
+from typing import Callable, Optional, Tuple
+
+from amadeus import ResponseError
+
+from common.flight_offers import FlightTable, OUTBOUND, RETURN
+from common.hotel_search import stream_hotel_offers
+from common.iata_index import resolve_city_code
+
+# Offers requested per search; sorting and filtering happen locally on the normalized table
+MAX_FLIGHT_OFFERS = int(os.getenv("MAX_FLIGHT_OFFERS", "50"))
+
+FLIGHT_TOOL = {
+    "name": "Flight Search",
+    "description": "Get available flights from one city to another. Query like 'Find flights from Delhi to Mumbai on 2025-12-20 returning on 2025-12-25'.",
+    "return_direct": True,
+}
+HOTEL_TOOL = {
+    "name": "Hotel Finder",
+    "description": "Find hotels in a city. Example: 'Find hotels in Paris from 2025-11-01 to 2025-11-05'.",
+    "return_direct": True,
+}
+WEATHER_TOOL = {
+    "name": "Weather Info",
+    "description": "Get the current weather of any city in the world.",
+}
+
+
+def search_flights(amadeus, offer_cache, query: str, max_offers: int = MAX_FLIGHT_OFFERS) -> Tuple[str, Optional[FlightTable]]:
+    """Markdown tables for 'from X to Y on DATE [returning on DATE]', plus the table (None on errors)."""
+    try:
+        # Regex to extract cities and dates
+        pattern = r"from\s+([A-Za-z\s]+)\s+to\s+([A-Za-z\s]+)\s+on\s+(\d{4}-\d{2}-\d{2})(?:\s+returning\s+on\s+(\d{4}-\d{2}-\d{2}))?"
+        m = re.search(pattern, query, re.IGNORECASE)
+        if not m:
+            return "❌ Invalid query format.", None
+
+        origin_city, dest_city, dep_date, ret_date = m.groups()
+        dep_date = dep_date.replace("/", "-")
+        ret_date = ret_date.replace("/", "-") if ret_date else None
+
+        # Get IATA codes (offline index first, location API only on a miss)
+        origin = resolve_city_code(amadeus, origin_city.strip())
+        dest = resolve_city_code(amadeus, dest_city.strip())
+        if not origin or not dest:
+            return "❌ Could not find IATA code for origin or destination.", None
+
+        # Flight search
+        kwargs = dict(
+            originLocationCode=origin,
+            destinationLocationCode=dest,
+            departureDate=dep_date,
+            adults=1,
+            max=max_offers
+        )
+        if ret_date:
+            kwargs["returnDate"] = ret_date
+
+        res = offer_cache.get_or_fetch(
+            "flight_offers", kwargs, lambda: amadeus.shopping.flight_offers_search.get(**kwargs).data
+        )
+        if not res:
+            return "⚠️ No flights found for the given route/date.", None
+
+        # One pass over the payload: one row per itinerary (outbound = first, return = second)
+        table = FlightTable.from_offers(res)
+
+        result = f"### Outbound Flights\n{table.to_markdown(table.sort(table.select(direction=OUTBOUND)))}"
+        if ret_date:
+            result += f"\n\n### Return Flights\n{table.to_markdown(table.sort(table.select(direction=RETURN)))}"
+
+        return result, table
+
+    except ResponseError as e:
+        return f"Amadeus API error: {e}", None
+    except Exception as e:
+        return f"⚠️ Unexpected error: {str(e)}", None
+
+
+def search_hotels(amadeus, offer_cache, query: str, on_progress: Optional[Callable[[str], None]] = None) -> str:
+    """Ranked hotel table for 'in CITY from DATE to DATE'."""
+    import pandas as pd  # only needed to render tables
+
+    try:
+        pattern = r"in\s+([A-Za-z\s]+)\s+from\s+(\d{4}-\d{2}-\d{2})\s+to\s+(\d{4}-\d{2}-\d{2})"
+        m = re.search(pattern, query, re.IGNORECASE)
+        if not m:
+            return "❌ Invalid query format. Example: 'Find hotels in Paris from 2025-11-01 to 2025-11-05'"
+
+        city, check_in, check_out = m.groups()
+        city = city.strip()
+
+        # Get IATA city code (offline index first, location API only on a miss)
+        city_code = resolve_city_code(amadeus, city)
+        if not city_code:
+            return f"❌ Could not find city '{city}'."
+
+        # Get hotels in the city
+        hotels = offer_cache.get_or_fetch(
+            "hotel_list", {"cityCode": city_code},
+            lambda: getattr(amadeus.reference_data.locations.hotels.by_city.get(cityCode=city_code), "data", []),
+        )
+        if not hotels:
+            return f"⚠️ No hotels found for {city}."
+
+        # Fetch offers for the whole list in concurrent chunks and report the ranked table as it fills in
+        hotel_list = []
+        for hotel_list in stream_hotel_offers(amadeus, hotels, check_in, check_out, adults=2, cache=offer_cache):
+            if hotel_list and on_progress:
+                on_progress(f"⏳ {len(hotel_list)} priced hotels so far...\n\n" + pd.DataFrame(hotel_list).to_markdown(index=False))
+
+        if not hotel_list:
+            return f"⚠️ No hotel offers found for {city}."
+
+        df = pd.DataFrame(hotel_list)
+        md_table = df.to_markdown(index=False)
+        return f"### Hotels in {city} ({len(hotel_list)} priced, cheapest first)\n{md_table}"
+
+    except ResponseError as e:
+        return f"Amadeus API error: {e}"
+    except Exception as e:
+        return f"⚠️ Unexpected error: {str(e)}"
+
+
+def weather_report(weather_client, city: str) -> str:
+    """Fetch weather info for a city"""
+    try:
+        data = weather_client.current(city)
+
+        if data.get("cod") != 200:
+            return f"❌ Error: {data.get('message', 'Failed to fetch weather')}"
+
+        weather = data["weather"][0]["description"].capitalize()
+        temp = data["main"]["temp"]
+        feels_like = data["main"]["feels_like"]
+        humidity = data["main"]["humidity"]
+
+        return (
+            f"🌤️ Weather in {city.title()}\n"
+            f"- Condition: {weather}\n"
+            f"- Temperature: {temp}°C (feels like {feels_like}°C)\n"
+            f"- Humidity: {humidity}%"
+        )
+    except Exception as e:
+        return f"⚠️ Error fetching weather: {str(e)}"
@@ -0,0 +1,124 @@
+# weather_client.py
+"""
+Shared OpenWeather client.
+
+The weather tools used to call a bare `requests.get(url)`: a new TCP+TLS connection per call and no
+timeout, so one slow upstream response could hang the whole Streamlit run. This client keeps a
+pooled keep-alive session with connect/read timeouts and retry with backoff, and caches answers per
+normalized city name for a few minutes so repeated questions never reach the network. The cache is
+bounded: expired entries are dropped when looked up, and past WEATHER_CACHE_MAX_ENTRIES the least
+recently used city is evicted.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from common.iata_index import normalize
+
+WEATHER_URL = os.getenv("OPENWEATHER_URL", "https://api.openweathermap.org/data/2.5/weather")
+
+DEFAULT_TTL = float(os.getenv("WEATHER_CACHE_TTL", "300"))   # 5 minutes
+MAX_ENTRIES = int(os.getenv("WEATHER_CACHE_MAX_ENTRIES", "512"))
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 10
+
+
+class WeatherClient:
+    """Pooled, cached client for the OpenWeather current-weather endpoint."""
+
+    def __init__(self, api_key: Optional[str], ttl: float = DEFAULT_TTL, base_url: str = WEATHER_URL,
+                 timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), retries: int = 3, pool_size: int = 10,
+                 max_entries: int = MAX_ENTRIES):
+        self.api_key = api_key
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.base_url = base_url
+        self.timeout = timeout
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=0.3,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET",),
+            raise_on_status=False,
+        )
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.upstream_calls = 0
+        self.upstream_seconds = 0.0
+        self.last_latency = 0.0
+
+    def current(self, city: str, units: str = "metric") -> dict:
+        """Same payload as `requests.get(...).json()` on the current-weather endpoint."""
+        key = (normalize(city), units)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and now - cached[0] < self.ttl:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached[1]
+            if cached:
+                del self._cache[key]
+            self.misses += 1
+
+        start = time.perf_counter()
+        response = self.session.get(
+            self.base_url,
+            params={"q": city, "appid": self.api_key, "units": units},
+            timeout=self.timeout,
+        )
+        data = response.json()
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self.upstream_calls += 1
+            self.upstream_seconds += elapsed
+            self.last_latency = elapsed
+            # Only successful lookups are cached; errors (bad city, bad key) should be retried.
+            if data.get("cod") == 200:
+                self._cache[key] = (time.monotonic(), data)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+        return data
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def avg_latency(self) -> float:
+        return self.upstream_seconds / self.upstream_calls if self.upstream_calls else 0.0
+
+    def stats_markdown(self) -> str:
+        return (
+            f"**Weather cache** — hit rate: {self.hit_rate():.0%} ({self.hits}/{self.hits + self.misses}), "
+            f"upstream avg: {self.avg_latency() * 1000:.0f} ms, last: {self.last_latency * 1000:.0f} ms"
+        )
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_weather_client(api_key: Optional[str]) -> WeatherClient:
+    """One pooled client per API key per process."""
+    with _clients_lock:
+        client = _clients.get(api_key)
+        if client is None:
+            client = _clients[api_key] = WeatherClient(api_key)
+        return client
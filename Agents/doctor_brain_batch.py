@@ -0,0 +1,284 @@
+# doctor_brain_batch.py
+"""
+Batch mode for TheAIDoctorBrain: run one diagnostic question over a folder of images.
+
+    python doctor_brain_batch.py scans/ -q "Any signs of pneumonia?" -o report.jsonl
+    python doctor_brain_batch.py scans/ -q "..." -o report.jsonl --markdown report.md --workers 8 --rpm 300
+    python doctor_brain_batch.py scans/ -q "..." -o report.jsonl --stub      # offline, no API calls
+
+- A bounded worker pool analyzes images concurrently. A shared rate limiter keeps requests under
+  `--rpm`, and on 429 it pauses every worker, honouring Retry-After.
+- Transient errors (429, 5xx, timeouts, connection errors) are retried with exponential backoff
+  and jitter.
+- Each result is appended to the JSONL report as soon as its image finishes. The report is also
+  the checkpoint: re-running the same command skips images already analyzed with the same
+  question and model, keyed by content hash, and retries the ones that failed.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from dotenv import load_dotenv
+
+from common.doctor_brain import DEFAULT_MODEL, analyze_image
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".gif", ".bmp", ".tif", ".tiff")
+RETRYABLE_STATUS = (408, 409, 429, 500, 502, 503, 504)
+RETRYABLE_ERRORS = ("RateLimitError", "APITimeoutError", "APIConnectionError", "InternalServerError",
+                    "Timeout", "TimeoutError", "ConnectionError")
+
+
+# -----------------------------
+# Rate limiting and retry
+# -----------------------------
+class RateLimiter:
+    """Spaces requests evenly at `per_minute`; `pause` holds every worker back after a 429."""
+
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next = time.monotonic()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._next = max(self._next, time.monotonic() + seconds)
+
+
+def _status_code(error: Exception):
+    return getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+
+
+def _retry_after(error: Exception):
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error: Exception) -> bool:
+    return _status_code(error) in RETRYABLE_STATUS or type(error).__name__ in RETRYABLE_ERRORS
+
+
+def call_with_retry(fn, limiter: RateLimiter, retries: int = 5, base_delay: float = 1.0, max_delay: float = 60.0):
+    """Returns (result, attempts). Non-retryable errors and the last failed attempt are raised."""
+    for attempt in range(1, retries + 2):
+        limiter.acquire()
+        try:
+            return fn(), attempt
+        except Exception as e:
+            if attempt > retries or not is_retryable(e):
+                e.attempts = attempt
+                raise
+            delay = _retry_after(e) or min(max_delay, base_delay * 2 ** (attempt - 1))
+            delay *= random.uniform(1.0, 1.25)
+            if _status_code(e) == 429 or type(e).__name__ == "RateLimitError":
+                limiter.pause(delay)
+            time.sleep(delay)
+
+
+# -----------------------------
+# Offline stub client
+# -----------------------------
+class StubClient:
+    """
+    Stand-in for `openai.OpenAI` with the same `chat.completions.create` shape. Sleeps `latency`
+    seconds per call and fails a `failure_rate` fraction of calls with a retryable 503.
+    """
+
+    class _Error(Exception):
+        status_code = 503
+
+    def __init__(self, latency: float = 0.2, failure_rate: float = 0.0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self.chat = self
+        self.completions = self
+
+    def create(self, model, messages, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency)
+        if random.random() < self.failure_rate:
+            raise self._Error("stub: service unavailable")
+        question = messages[-1]["content"][0]["text"]
+        image_kb = len(messages[-1]["content"][1]["image_url"]["url"]) / 1024
+        content = (f"1. **Image Summary:** stub analysis of a {image_kb:.0f} KB image.\n"
+                   f"2. **Analysis:** no real model was called for: {question}\n"
+                   "3. **Disclaimer:** This is an offline stub response, not a diagnosis.")
+        message = type("Message", (), {"content": content})()
+        choice = type("Choice", (), {"message": message})()
+        return type("Completion", (), {"choices": [choice]})()
+
+
+# -----------------------------
+# Checkpoint / report
+# -----------------------------
+def find_images(folder: str) -> list:
+    paths = []
+    for root, _, files in os.walk(folder):
+        for name in files:
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
+
+
+def job_key(image_hash: str, question: str, model: str) -> str:
+    return hashlib.sha256(f"{image_hash}\x00{model}\x00{question}".encode()).hexdigest()
+
+
+def load_checkpoint(report_path: str) -> set:
+    """Keys of images already analyzed successfully in an earlier run."""
+    done = set()
+    if not os.path.exists(report_path):
+        return done
+    with open(report_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a line cut short by an interrupted run
+            if record.get("status") == "ok":
+                done.add(record["key"])
+    return done
+
+
+def write_markdown(report_path: str, markdown_path: str) -> None:
+    """Markdown report from the JSONL, with the latest result per image."""
+    latest = {}
+    with open(report_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            latest[record["image"]] = record
+    with open(markdown_path, "w", encoding="utf-8") as f:
+        f.write("# TheAI Doctor Brain — batch report\n\n")
+        for image, record in sorted(latest.items()):
+            f.write(f"## {image}\n\n")
+            f.write(f"**Question:** {record['question']}  \n**Model:** {record['model']}\n\n")
+            if record["status"] == "ok":
+                f.write(record["analysis"] + "\n\n")
+            else:
+                f.write(f"❌ Failed after {record['attempts']} attempts: {record['error']}\n\n")
+
+
+# -----------------------------
+# Batch run
+# -----------------------------
+def analyze_file(client, path: str, folder: str, question: str, model: str, limiter: RateLimiter,
+                 retries: int) -> dict:
+    with open(path, "rb") as f:
+        image_bytes = f.read()
+    image_hash = hashlib.sha256(image_bytes).hexdigest()
+    record = {
+        "image": os.path.relpath(path, folder),
+        "sha256": image_hash,
+        "key": job_key(image_hash, question, model),
+        "question": question,
+        "model": model,
+    }
+    metrics = {}
+    start = time.perf_counter()
+    try:
+        analysis, attempts = call_with_retry(
+            lambda: analyze_image(client, image_bytes, question, model=model, metrics=metrics),
+            limiter, retries=retries,
+        )
+        record.update(status="ok", analysis=analysis, attempts=attempts)
+    except Exception as e:
+        record.update(status="error", error=f"{type(e).__name__}: {e}", attempts=getattr(e, "attempts", 1))
+    record.update(
+        latency_ms=round((time.perf_counter() - start) * 1000, 1),
+        payload_bytes=metrics.get("payload_bytes"),
+        cached=metrics.get("cached", False),
+    )
+    return record
+
+
+def run_batch(client, folder: str, question: str, report_path: str, model: str = DEFAULT_MODEL,
+              workers: int = 4, rpm: float = 60, retries: int = 5) -> dict:
+    """Analyze every image under `folder`, appending results to `report_path`. Returns run totals."""
+    done = load_checkpoint(report_path)
+    limiter = RateLimiter(rpm)
+    images = find_images(folder)
+    pending = []
+    for path in images:
+        with open(path, "rb") as f:
+            image_hash = hashlib.sha256(f.read()).hexdigest()
+        if job_key(image_hash, question, model) not in done:
+            pending.append(path)
+
+    totals = {"images": len(images), "skipped": len(images) - len(pending), "ok": 0, "error": 0}
+    start = time.perf_counter()
+    with open(report_path, "a", encoding="utf-8") as report, ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(analyze_file, client, path, folder, question, model, limiter, retries)
+                   for path in pending]
+        for n, future in enumerate(as_completed(futures), 1):
+            record = future.result()
+            report.write(json.dumps(record, ensure_ascii=False) + "\n")
+            report.flush()
+            totals[record["status"]] += 1
+            print(f"[{n}/{len(pending)}] {record['status']:<5} {record['image']} "
+                  f"({record['latency_ms']:.0f} ms, {record['attempts']} attempt(s))", file=sys.stderr)
+
+    elapsed = time.perf_counter() - start
+    totals["seconds"] = elapsed
+    totals["per_minute"] = (totals["ok"] + totals["error"]) / elapsed * 60 if elapsed else 0.0
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("folder", help="directory of images (searched recursively)")
+    parser.add_argument("-q", "--question", required=True, help="diagnostic question asked for every image")
+    parser.add_argument("-o", "--output", default="doctor_brain_report.jsonl", help="JSONL report / checkpoint")
+    parser.add_argument("--markdown", help="also write a markdown report to this path")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("DOCTOR_BATCH_WORKERS", "4")))
+    parser.add_argument("--rpm", type=float, default=float(os.getenv("DOCTOR_BATCH_RPM", "60")),
+                        help="maximum requests per minute (your API tier limit)")
+    parser.add_argument("--retries", type=int, default=5)
+    parser.add_argument("--stub", action="store_true", help="use the offline stub client instead of OpenAI")
+    parser.add_argument("--stub-latency", type=float, default=0.2)
+    parser.add_argument("--stub-failure-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    if args.stub:
+        client = StubClient(latency=args.stub_latency, failure_rate=args.stub_failure_rate)
+    else:
+        load_dotenv()
+        if not os.getenv("OPENAI_API_KEY"):
+            sys.exit("OPENAI_API_KEY is not set. Add it to .env or run with --stub.")
+        from openai import OpenAI
+        # Retries are handled here (with the shared rate limiter), not inside the SDK
+        client = OpenAI(max_retries=0)
+
+    totals = run_batch(client, args.folder, args.question, args.output, model=args.model,
+                       workers=args.workers, rpm=args.rpm, retries=args.retries)
+    print(f"✅ {totals['ok']} analyzed, {totals['error']} failed, {totals['skipped']} already done "
+          f"in {totals['seconds']:.1f}s ({totals['per_minute']:.0f} images/min). Report: {args.output}")
+
+    if args.markdown:
+        write_markdown(args.output, args.markdown)
+        print(f"📝 Markdown report: {args.markdown}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,16 @@
 # flight_agent_app.py
 from dotenv import load_dotenv
-import os, re
-from langchain_community.chat_models import ChatOpenAI
-from langchain.agents import Tool, initialize_agent, AgentType
+import os
 import streamlit as st
-import pandas as pd
-from amadeus import Client, ResponseError
+from amadeus import Client
+from common.offer_cache import get_offer_cache
+from common.agent_registry import get_agent, get_client
+from common.endpoints import amadeus_options
+from common.amadeus_gateway import get_amadeus_gateway
+from common.telemetry import get_callbacks, get_telemetry
+from common.llm_cache import get_llm_cache, llm_cache_markdown
+from common.flight_offers import OUTBOUND, RETURN, SORT_KEYS
+from common.travel_tools import FLIGHT_TOOL, search_flights
 
 # -----------------------------
 # Load API keys
@@ -18,110 +23,39 @@ AMADEUS_CLIENT_SECRET = os.getenv("AMADEUS_CLIENT_SECRET")
 # -----------------------------
 # Initialize Amadeus client
 # -----------------------------
-amadeus = Client(client_id=AMADEUS_CLIENT_ID, client_secret=AMADEUS_CLIENT_SECRET)
-
-# -----------------------------
-# Initialize LLM
-# -----------------------------
-llm = ChatOpenAI(model_name="gpt-3.5-turbo", temperature=0, openai_api_key=OPENAI_API_KEY)
+# Calls go through the gateway: rate limit, in-flight deduplication and retry on 429/5xx
+amadeus = get_amadeus_gateway(
+    get_client(Client, client_id=AMADEUS_CLIENT_ID, client_secret=AMADEUS_CLIENT_SECRET, **amadeus_options()))
+offer_cache = get_offer_cache()
 
 # -----------------------------
 # Define Flight Tool
 # -----------------------------
 def get_flights(query: str) -> str:
-
-    try:
-        # Regex to extract cities and dates
-        pattern = r"from\s+([A-Za-z\s]+)\s+to\s+([A-Za-z\s]+)\s+on\s+(\d{4}-\d{2}-\d{2})(?:\s+returning\s+on\s+(\d{4}-\d{2}-\d{2}))?"
-        m = re.search(pattern, query, re.IGNORECASE)
-        if not m:
-            return "❌ Invalid query format."
-
-        origin_city, dest_city, dep_date, ret_date = m.groups()
-        dep_date = dep_date.replace("/", "-")
-        ret_date = ret_date.replace("/", "-") if ret_date else None
-        # origin_city, dest_city = origin_city.strip(), dest_city.strip()
-
-        # Get IATA codes
-        origin_res = amadeus.reference_data.locations.get(keyword=origin_city.strip(), subType="CITY").data
-        dest_res = amadeus.reference_data.locations.get(keyword=dest_city.strip(), subType="CITY").data
-        if not origin_res or not dest_res:
-            return "❌ Could not find IATA code for origin or destination."
-        origin = origin_res[0]["iataCode"]
-        dest = dest_res[0]["iataCode"]
-
-        # Flight search
-        kwargs = dict(
-            originLocationCode=origin,
-            destinationLocationCode=dest,
-            departureDate=dep_date,
-            adults=1,
-            max=5
-        )
-        if ret_date:
-            kwargs["returnDate"] = ret_date
-
-        res = amadeus.shopping.flight_offers_search.get(**kwargs).data
-        if not res:
-            return "⚠️ No flights found for the given route/date."
-
-        # Separate outbound and return flights
-        outbound = []
-        return_flights = []
-
-        for offer in res:
-            for itinerary in offer["itineraries"]:
-                for seg in itinerary["segments"]:
-                    flight_info = {
-                        "Airline": seg["carrierCode"],
-                        "Flight No": seg["number"],
-                        "From": seg["departure"]["iataCode"],
-                        "To": seg["arrival"]["iataCode"],
-                        "Departure": seg["departure"]["at"],
-                        "Arrival": seg["arrival"]["at"],
-                        "Price": offer["price"]["total"],
-                        "Direct": len(itinerary["segments"]) == 1
-                    }
-                    if seg["departure"]["iataCode"] == origin:
-                        outbound.append(flight_info)
-                    elif seg["departure"]["iataCode"] == dest:
-                        return_flights.append(flight_info)
-
-        # Convert to Markdown tables
-        md_outbound = pd.DataFrame(outbound).to_markdown(index=False)
-        md_return = pd.DataFrame(return_flights).to_markdown(index=False) if return_flights else None
-
-        result = f"### Outbound Flights\n{md_outbound}"
-        if md_return:
-            result += f"\n\n### Return Flights\n{md_return}"
-
-        return result
-
-    except ResponseError as e:
-        return f"Amadeus API error: {e}"
-    except Exception as e:
-        return f"⚠️ Unexpected error: {str(e)}"
+    result, table = search_flights(amadeus, offer_cache, query)
+    if table is not None:
+        st.session_state.flight_table = table
+    return result
 
 # -----------------------------
-# Define Tool
+# Initialize LLM, Tool and Agent (on first search, once per process)
 # -----------------------------
-flight_tool = Tool(
-    name="Flight Search",
-    func=get_flights,
-    description="Get available flights from one city to another. Query like 'Find flights from Delhi to Mumbai on 2025-12-20 returning on 2025-12-25'.",
-    return_direct=True
-)
+def load_agent():
+    """Built lazily so LangChain is not imported on cold start or on plain reruns."""
+    from langchain_community.chat_models import ChatOpenAI
+    from langchain.agents import Tool, initialize_agent, AgentType
 
-# -----------------------------
-# Initialize Agent
-# -----------------------------
-agent = initialize_agent(
-    tools=[flight_tool],
-    llm=llm,
-    agent_type=AgentType.CHAT_CONVERSATIONAL_REACT_DESCRIPTION,
-    verbose=True,
-    handle_parsing_errors=True
-)
+    llm = get_client(ChatOpenAI, model_name="gpt-3.5-turbo", temperature=0, openai_api_key=OPENAI_API_KEY,
+                     cache=get_llm_cache("flight"))
+
+    flight_tool = Tool(func=get_flights, **FLIGHT_TOOL)
+
+    return get_agent("flight", {"llm": id(llm), "tools": [flight_tool.name]}, lambda: initialize_agent(
+        tools=[flight_tool],
+        llm=llm,
+        agent_type=AgentType.CHAT_CONVERSATIONAL_REACT_DESCRIPTION,
+        handle_parsing_errors=True
+    ))
 
 # -----------------------------
 # Streamlit UI
@@ -142,12 +76,40 @@ if st.button("Search Flights"):
         if return_date:
             query += f" returning on {return_date}"
 
+        st.session_state.flight_table = None
         try:
-            response = agent.run(query)
+            response = load_agent().run(query, callbacks=get_callbacks("flight"))
         except Exception:
             response = get_flights(query)
 
-        # Display outbound and return flights one below another
-        st.markdown(response)
+        # Errors are shown as-is; successful searches are rendered from the table below
+        if st.session_state.flight_table is None:
+            st.markdown(response)
     else:
-        st.warning("Please fill in source, destination, and departure date.")
\ No newline at end of file
+        st.warning("Please fill in source, destination, and departure date.")
+
+table = st.session_state.get("flight_table")
+if table is not None and len(table):
+    st.subheader("Refine results")
+    col1, col2, col3 = st.columns(3)
+    sort_by = col1.selectbox("Sort by", list(SORT_KEYS))
+    direct_only = col2.checkbox("Direct flights only")
+    page_size = col3.selectbox("Rows per page", [10, 25, 50])
+    window = st.slider("Departure time window", value=(0, 24), min_value=0, max_value=24)
+    depart_after, depart_before = f"{window[0]:02d}:00", f"{window[1]:02d}:00" if window[1] < 24 else "23:59"
+
+    for label, direction in (("Outbound Flights", OUTBOUND), ("Return Flights", RETURN)):
+        rows = table.sort(
+            table.select(direction=direction, direct_only=direct_only, depart_after=depart_after, depart_before=depart_before),
+            by=sort_by,
+        )
+        if direction == RETURN and not table.select(direction=RETURN):
+            continue
+        pages = max(1, -(-len(rows) // page_size))
+        page = st.number_input(f"{label} page", min_value=1, max_value=pages, value=1, key=f"page_{direction}") - 1
+        st.markdown(f"### {label}\n{table.to_markdown(rows, page=page, page_size=page_size)}")
+
+st.sidebar.markdown(offer_cache.stats_markdown())
+st.sidebar.markdown(amadeus.stats_markdown())
+st.sidebar.markdown(llm_cache_markdown("flight"))
+get_telemetry().render_sidebar(st, "flight")
@@ -1,11 +1,15 @@
 # lodging_agent_app.py
 from dotenv import load_dotenv
-import os, re
-from langchain_community.chat_models import ChatOpenAI
-from langchain.agents import Tool, initialize_agent, AgentType
+import os
 import streamlit as st
-import pandas as pd
-from amadeus import Client, ResponseError
+from amadeus import Client
+from common.offer_cache import get_offer_cache
+from common.agent_registry import get_agent, get_client
+from common.endpoints import amadeus_options
+from common.amadeus_gateway import get_amadeus_gateway
+from common.telemetry import get_callbacks, get_telemetry
+from common.llm_cache import get_llm_cache, llm_cache_markdown
+from common.travel_tools import HOTEL_TOOL, search_hotels
 
 # -----------------------------
 # Load API keys
@@ -18,103 +22,40 @@ AMADEUS_CLIENT_SECRET = os.getenv("AMADEUS_CLIENT_SECRET")
 # -----------------------------
 # Initialize Amadeus client
 # -----------------------------
-amadeus = Client(client_id=AMADEUS_CLIENT_ID, client_secret=AMADEUS_CLIENT_SECRET)
-
-# -----------------------------
-# Initialize LLM
-# -----------------------------
-llm = ChatOpenAI(model_name="gpt-3.5-turbo", temperature=0, openai_api_key=OPENAI_API_KEY)
+# Calls go through the gateway: rate limit, in-flight deduplication and retry on 429/5xx
+amadeus = get_amadeus_gateway(
+    get_client(Client, client_id=AMADEUS_CLIENT_ID, client_secret=AMADEUS_CLIENT_SECRET, **amadeus_options()))
+offer_cache = get_offer_cache()
 
 # -----------------------------
 # Define Hotel Tool
 # -----------------------------
 def get_hotels(query: str) -> str:
-    try:
-        pattern = r"in\s+([A-Za-z\s]+)\s+from\s+(\d{4}-\d{2}-\d{2})\s+to\s+(\d{4}-\d{2}-\d{2})"
-        m = re.search(pattern, query, re.IGNORECASE)
-        if not m:
-            return "❌ Invalid query format. Example: 'Find hotels in Paris from 2025-11-01 to 2025-11-05'"
-
-        city, check_in, check_out = m.groups()
-        city = city.strip()
-
-        # Get IATA city code
-        loc = amadeus.reference_data.locations.get(keyword=city, subType="CITY")
-        if not loc or not getattr(loc, "data", None):
-            return f"❌ Could not find city '{city}'."
-        city_code = loc.data[0].get("iataCode")
-
-        # Get hotels in the city
-        hotels_resp = amadeus.reference_data.locations.hotels.by_city.get(cityCode=city_code)
-        hotels = getattr(hotels_resp, "data", [])[:5]
-        if not hotels:
-            return f"⚠️ No hotels found for {city}."
-
-        hotel_ids = [h["hotelId"] for h in hotels if "hotelId" in h]
-        if not hotel_ids:
-            return f"⚠️ No hotel IDs found for {city}."
-
-        # Get hotel offers
-        try:
-            offers_resp = amadeus.shopping.hotel_offers_search.get(
-                hotelIds=",".join(hotel_ids),
-                checkInDate=check_in,
-                checkOutDate=check_out,
-                adults=2
-            )
-            offers = getattr(offers_resp, "data", [])
-        except Exception:
-            offers = []
-
-        # Prepare results
-        hotel_list = []
-        for h in hotels:
-            o = next((x for x in offers if x.get("hotel", {}).get("hotelId") == h["hotelId"]), {})
-            offer = o.get("offers", [{}])[0] if o else {}
-            price = offer.get("price", {}).get("total", "N/A")
-            currency = offer.get("price", {}).get("currency", "")
-            name = h.get("name", "N/A")
-            address = ", ".join(h.get("address", {}).get("lines", ["N/A"]))
-
-            hotel_list.append({
-                "Hotel Name": name,
-                "Address": address,
-                "Price": price,
-                "Currency": currency
-            })
-
-        if not hotel_list:
-            return f"⚠️ No hotel offers found for {city}."
-
-        df = pd.DataFrame(hotel_list)
-        md_table = df.to_markdown(index=False)
-        return f"### Hotels in {city}\n{md_table}"
-
-    except ResponseError as e:
-        return f"Amadeus API error: {e}"
-    except Exception as e:
-        return f"⚠️ Unexpected error: {str(e)}"
+    # The ranked table is shown as hotel offers stream in, then replaced by the final answer
+    progress = st.empty()
+    result = search_hotels(amadeus, offer_cache, query, on_progress=progress.markdown)
+    progress.empty()
+    return result
 
 # -----------------------------
-# Define Tool
+# Initialize LLM, Tool and Agent (on first search, once per process)
 # -----------------------------
-hotel_tool = Tool(
-    name="Hotel Finder",
-    func=get_hotels,
-    description="Find hotels in a city. Example: 'Find hotels in Paris from 2025-11-01 to 2025-11-05'.",
-    return_direct=True
-)
+def load_agent():
+    """Built lazily so LangChain is not imported on cold start or on plain reruns."""
+    from langchain_community.chat_models import ChatOpenAI
+    from langchain.agents import Tool, initialize_agent, AgentType
 
-# -----------------------------
-# Initialize Agent
-# -----------------------------
-agent = initialize_agent(
-    tools=[hotel_tool],
-    llm=llm,
-    agent_type=AgentType.CHAT_CONVERSATIONAL_REACT_DESCRIPTION,
-    verbose=True,
-    handle_parsing_errors=True
-)
+    llm = get_client(ChatOpenAI, model_name="gpt-3.5-turbo", temperature=0, openai_api_key=OPENAI_API_KEY,
+                     cache=get_llm_cache("lodging"))
+
+    hotel_tool = Tool(func=get_hotels, **HOTEL_TOOL)
+
+    return get_agent("lodging", {"llm": id(llm), "tools": [hotel_tool.name]}, lambda: initialize_agent(
+        tools=[hotel_tool],
+        llm=llm,
+        agent_type=AgentType.CHAT_CONVERSATIONAL_REACT_DESCRIPTION,
+        handle_parsing_errors=True
+    ))
 
 # -----------------------------
 # Streamlit UI
@@ -130,9 +71,14 @@ if st.button("Search Hotels"):
     if city and check_in and check_out:
         query = f"Find hotels in {city} from {check_in} to {check_out}"
         try:
-            response = agent.run(query)
+            response = load_agent().run(query, callbacks=get_callbacks("lodging"))
         except Exception:
             response = get_hotels(query)
         st.markdown(response)
     else:
         st.warning("Please fill in all details (city, check-in, and check-out).")
+
+st.sidebar.markdown(offer_cache.stats_markdown())
+st.sidebar.markdown(amadeus.stats_markdown())
+st.sidebar.markdown(llm_cache_markdown("lodging"))
+get_telemetry().render_sidebar(st, "lodging")
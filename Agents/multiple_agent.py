@@ -1,46 +1,57 @@
 from dotenv import load_dotenv
 import os
-from langchain_openai import ChatOpenAI
-from langchain.agents import Tool, initialize_agent, AgentType
 import streamlit as st
-from langchain.utilities import SerpAPIWrapper
+from common.math_engine import evaluate_expression, evaluate_task, format_number
+from common.agent_registry import get_agent, get_client
+from common.search_cache import get_cached_search
+from common.summarizer import summarize
+from common.telemetry import get_callbacks, get_telemetry
 
 # Load API keys
 load_dotenv()
 api_key = os.getenv("OPENAI_API_KEY")
 serp_api_key = os.getenv("SERPAPI_API_KEY")
 
-# LLM
-llm = ChatOpenAI(model="gpt-3.5-turbo", temperature=0, openai_api_key=api_key)
-
 # Tools
 def calculator_tool(query: str) -> str:
     try:
-        a, operator, b = query.split()
-        a, b = float(a), float(b)
-        if operator == '+': return str(a + b)
-        if operator == '-': return str(a - b)
-        if operator == '*': return str(a * b)
-        if operator == '/': return str(a / b)
-        return "Error: Invalid operator"
-    except:
-        return "Error: Use format 'number operator number'"
-
-search = SerpAPIWrapper(serpapi_api_key=serp_api_key)
+        return format_number(evaluate_expression(query))
+    except ZeroDivisionError:
+        return "Error: Division by zero"
+    except Exception:
+        return "Error: Input must be an arithmetic expression, e.g. '(12 * 12) + 5'"
+
+def serpapi_search(query: str) -> str:
+    from langchain.utilities import SerpAPIWrapper
+
+    return get_client(SerpAPIWrapper, serpapi_api_key=serp_api_key).run(query)
+
 def search_tool(query: str) -> str:
-    return search.run(query)
+    # Cached per normalized query and shared across sessions; results come back already summarized
+    # so the agent does not need an extra Summarizer step.
+    results = get_cached_search("serpapi", serpapi_search).run(query)
+    return summarize(results, query=query)
 
 def summarize_tool(text: str) -> str:
-    return f"Summary: {text[:150]}..." if len(text) > 150 else f"Summary: {text}"
+    return f"Summary: {summarize(text)}"
 
-tools = [
-    Tool(name="Calculator", func=calculator_tool, description="Basic arithmetic"),
-    Tool(name="Web Search", func=search_tool, description="Google search"),
-    Tool(name="Summarizer", func=summarize_tool, description="Summarize long text content."),
-]
+def load_agent():
+    """LLM + agent, built once per process on first use (LangChain is only imported when needed)."""
+    from langchain_openai import ChatOpenAI
+    from langchain.agents import Tool, initialize_agent, AgentType
 
-# Initialize agent
-agent = initialize_agent(tools, llm, agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION, verbose=True)
+    tools = [
+        Tool(name="Calculator", func=calculator_tool, description="Evaluate a full arithmetic expression in one step, e.g. '(12 * 12) + 5' or 'sqrt(2) ^ 3'"),
+        Tool(name="Web Search", func=search_tool, description="Google search. Returns a short summary of the top results; no need to summarize it again."),
+        Tool(name="Summarizer", func=summarize_tool, description="Summarize long text content provided by the user."),
+    ]
+    llm = get_client(ChatOpenAI, model="gpt-3.5-turbo", temperature=0, openai_api_key=api_key)
+    return get_agent(
+        "multi_tool",
+        {"llm": id(llm), "tools": [t.name for t in tools], "agent": AgentType.ZERO_SHOT_REACT_DESCRIPTION},
+        lambda: initialize_agent(tools, llm, agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
+                                 return_intermediate_steps=True),
+    )
 
 # Streamlit UI
 st.title("🧮 Multi-Tool Agent")
@@ -49,6 +60,16 @@ st.subheader("Your assistant for calculations, web search, and summarization!")
 task = st.text_area("💡 Enter your task:")
 
 if task:  # Only run if user entered something
-    with st.spinner("Agent is thinking..."):
-        response = agent.run(task)
-    st.success(f"Agent response: {response}")
+    # Fast path: pure arithmetic never needs the agent
+    result = evaluate_task(task)
+    if result is not None:
+        st.success(f"Agent response: {format_number(result)}")
+        st.caption("⚡ Computed locally (no LLM call).")
+    else:
+        with st.spinner("Agent is thinking..."):
+            result = load_agent().invoke({"input": task}, config={"callbacks": get_callbacks("multi_tool")})
+        st.success(f"Agent response: {result['output']}")
+        st.caption(f"Agent steps: {len(result['intermediate_steps'])}")
+
+st.sidebar.markdown(get_cached_search("serpapi", serpapi_search).stats_markdown())
+get_telemetry().render_sidebar(st, "multi_tool")
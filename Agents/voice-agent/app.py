@@ -1,13 +1,15 @@
 import streamlit as st
-import speech_recognition as sr
-import pyttsx3
 from dotenv import load_dotenv
-import os
+import os, sys
 import datetime
 import webbrowser
-from langchain_openai import ChatOpenAI
-from langchain.agents import Tool, initialize_agent, AgentType
-import threading
+from tts_service import TTSService
+from intent_router import IntentRouter
+from speech_pipeline import MicrophoneSource, SpeechPipeline, get_recognizer
+
+# Shared helpers live in the parent Agents/ folder
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from common.telemetry import get_callbacks, get_telemetry
 
 # --------------------
 # Load environment
@@ -18,23 +20,15 @@ api_key = os.getenv("OPENAI_API_KEY")
 # --------------------
 # Initialize text-to-speech
 # --------------------
-# Initialize outside the function for better performance
-engine = pyttsx3.init()
+# One worker thread owns the pyttsx3 engine for the whole process; pyttsx3 itself is only
+# imported when that worker starts.
+@st.cache_resource
+def get_tts_service():
+    return TTSService()
 
 def speak(text):
-    """Speaks the text in a non-blocking thread."""
-    def _speak():
-        # Ensure the engine is initialized and configured if needed here
-        try:
-            # engine.stop() # Can be removed if the thread ensures single instance per call
-            engine.say(text)
-            engine.runAndWait()
-        except Exception as e:
-            # Handle error (e.g., engine already running, device error)
-            print(f"TTS Error: {e}")
-    
-    # Run TTS in a separate thread so Streamlit UI doesn't freeze
-    threading.Thread(target=_speak, daemon=True).start()
+    """Queues the text for speech; a new response interrupts the one still playing."""
+    get_tts_service().say(text, interrupt=True)
 
 
 # --------------------
@@ -56,24 +50,8 @@ def open_youtube(query: str) -> str:
     webbrowser.open(url)
     return f"I have opened YouTube search for '{query}'"
 
-tools = [
-    Tool(
-        name="Time",
-        func=tell_time,
-        description="Tell the current time when the user asks for the current time. Input is always an empty string."
-    ),
-    Tool(
-        name="Google",
-        func=open_google,
-        description="Use this only when the user explicitly says to open or search on Google. The input should be the search query."
-    ),
-    Tool(
-        name="YouTube",
-        func=open_youtube,
-        description="Use this only when the user explicitly says to search or open something on YouTube. The input should be the search query."
-    )
-]
-
+# Tools the local intent router can call directly
+LOCAL_TOOLS = {"time": tell_time, "google": open_google, "youtube": open_youtube}
 
 # --------------------
 # Initialize LLM + Agent
@@ -81,12 +59,32 @@ tools = [
 # Only initialize once
 @st.cache_resource
 def initialize_agent_system():
+    # LangChain is imported on the first command, not on cold start
+    from langchain_openai import ChatOpenAI
+    from langchain.agents import Tool, initialize_agent, AgentType
+
+    tools = [
+        Tool(
+            name="Time",
+            func=tell_time,
+            description="Tell the current time when the user asks for the current time. Input is always an empty string."
+        ),
+        Tool(
+            name="Google",
+            func=open_google,
+            description="Use this only when the user explicitly says to open or search on Google. The input should be the search query."
+        ),
+        Tool(
+            name="YouTube",
+            func=open_youtube,
+            description="Use this only when the user explicitly says to search or open something on YouTube. The input should be the search query."
+        )
+    ]
+
     llm = ChatOpenAI(model="gpt-3.5-turbo", temperature=0, openai_api_key=api_key)
-    agent = initialize_agent(tools, llm, agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION, verbose=False)
+    agent = initialize_agent(tools, llm, agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION)
     return agent
 
-agent = initialize_agent_system()
-
 
 # --------------------
 # Streamlit UI
@@ -101,31 +99,45 @@ st.warning("Say 'stop', 'exit', 'quit', or 'goodbye' to gracefully end the assis
 if "response" not in st.session_state:
     st.session_state.response = ""
 
-# Speech recognizer
-recognizer = sr.Recognizer()
+# The microphone is opened once and kept open by a background capture pipeline; voice
+# activity detection ends each command, and the recognizer backend comes from VOICE_RECOGNIZER
+# (google, vosk, whisper).
+@st.cache_resource
+def get_intent_router():
+    return IntentRouter()
+
+intent_router = get_intent_router()
+
+@st.cache_resource
+def get_speech_pipeline():
+    return SpeechPipeline(MicrophoneSource(), get_recognizer()).start(paused=True)
 
 def listen_once():
     """Capture a single voice command."""
-    with sr.Microphone() as source:
-        st.info("🎧 Listening... please speak now.")
-        # Reduce unnecessary ambient noise adjustment time
-        # recognizer.adjust_for_ambient_noise(source) 
-        try:
-            audio = recognizer.listen(source, timeout=5, phrase_time_limit=10)
-        except sr.WaitTimeoutError:
-            st.error("No speech detected. Timed out.")
-            return None
-            
-    try:
-        command = recognizer.recognize_google(audio).lower()
-        st.success(f"🗣️ You said: {command}")
-        return command
-    except sr.UnknownValueError:
-        # st.error("❌ Could not understand audio.") # Suppress error for cleaner UI on unknown input
+    pipeline = get_speech_pipeline()
+    st.session_state.speech_used = True
+    st.info("🎧 Listening... please speak now.")
+    partial_box = st.empty()
+    utterance = pipeline.listen(timeout=5, on_partial=lambda text: partial_box.caption(f"… {text}"))
+    partial_box.empty()
+
+    if pipeline.error:
+        st.error(f"⚠️ Microphone error: {pipeline.error}")
         return None
-    except sr.RequestError:
+    if utterance is None:
+        st.error("No speech detected. Timed out.")
+        return None
+    if utterance.error:
         st.error("⚠️ Speech recognition service error. Check your network connection.")
         return None
+    if not utterance.text:
+        # Could not understand audio; stay quiet for a cleaner UI
+        return None
+
+    command = utterance.text.lower()
+    st.success(f"🗣️ You said: {command}")
+    st.caption(f"Recognized {utterance.eos_to_text_ms:.0f} ms after you stopped speaking.")
+    return command
 
 # Buttons
 col1, col2 = st.columns(2)
@@ -144,10 +156,16 @@ if start_btn:
             response_text = "Goodbye! Have a nice day!"
             st.session_state.response = response_text
             speak(response_text)
+        elif (route := intent_router.route(command)).intent:
+            # Simple commands go straight to the tool, without an LLM round-trip
+            response_text = LOCAL_TOOLS[route.intent](route.argument)
+            st.session_state.response = response_text
+            st.caption(f"⚡ Handled locally ({route.intent}, {route.method}) in {route.elapsed_ms:.2f} ms")
+            speak(response_text)
         else:
             # Invoke the LangChain agent
             try:
-                response = agent.invoke(command)
+                response = initialize_agent_system().invoke(command, config={"callbacks": get_callbacks("voice")})
                 response_text = response["output"] # LangChain agent.invoke returns a dict
                 st.session_state.response = response_text
                 speak(response_text)
@@ -171,4 +189,10 @@ if st.session_state.response:
     st.info(st.session_state.response)
     
 # Clean up the output state after display if you want the box to clear on next run
-# However, keeping it in state is fine for reviewing the last response.
\ No newline at end of file
+# However, keeping it in state is fine for reviewing the last response.
+
+st.sidebar.markdown(get_tts_service().stats_markdown())
+st.sidebar.markdown(intent_router.stats_markdown())
+if st.session_state.get("speech_used"):
+    st.sidebar.markdown(get_speech_pipeline().stats_markdown())
+get_telemetry().render_sidebar(st, "voice")
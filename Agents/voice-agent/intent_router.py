@@ -0,0 +1,170 @@
+# intent_router.py
+"""
+Local intent router for the voice assistant.
+
+Simple commands such as "what time is it" or "open youtube for lofi music" used to go through a
+ZERO_SHOT_REACT loop with gpt-3.5-turbo: one to three LLM round-trips before `tell_time`,
+`open_google` or `open_youtube` ran. `IntentRouter.route` classifies the command locally in well
+under a millisecond and extracts the tool argument. It tries two things in order:
+
+1. Regex rules for the common phrasings (confidence 1.0).
+2. A scored keyword matcher, tolerant of recognizer typos ("you tube", "goggle"). It only routes
+   searches: "time" appears in too many questions for the agent ("what time is it in Tokyo",
+   "time complexity of quicksort"), so `tell_time` is reached through the regex rules alone.
+   Site names are just as common in questions ("who founded youtube"), so a search is only
+   routed when the command starts with a command verb or the site name ("play some jazz videos",
+   "goggle best pizza near me").
+
+Commands scoring below `threshold` return intent None and should fall through to the agent.
+"""
+
+import difflib
+import re
+import time
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_THRESHOLD = 0.6
+
+# Speech-recognizer spellings -> canonical words
+_NORMALIZE = [
+    (r"\byou tube\b", "youtube"), (r"\butube\b", "youtube"), (r"\bgoogle\.com\b", "google"),
+    (r"\bwhat's\b", "what is"), (r"\bwhats\b", "what is"), (r"\bit's\b", "it is"),
+]
+
+_ARG = r"(?P<arg>.+?)"
+_FILLER = r"(?:please\s+|can you\s+|could you\s+|hey\s+|ok(?:ay)?\s+)*"
+
+RULES: List[Tuple[str, str]] = [
+    ("time", r"^{f}(?:(?:do you know |tell me )?what (?:the )?time it is|what is the (?:current )?time(?: on the clock)?|what time is it|tell me the time|(?:the )?current time|time (?:now|please))(?: now| right now)?(?: please)?$"),
+    ("youtube", r"^{f}(?:open|search|play|find|look up|watch|go to)?\s*(?:on\s+)?youtube(?:\s+and)?(?:\s+(?:search|play|find|look up|show))?(?:\s+(?:for|me))?\s+{a}$"),
+    ("youtube", r"^{f}(?:search|play|find|look up|watch|show me|open)(?: for)?\s+{a}\s+(?:on|in|from)\s+youtube$"),
+    ("google", r"^{f}(?:open|search|find|look up|go to)?\s*(?:on\s+)?google(?:\s+and)?(?:\s+(?:search|find|look up))?(?:\s+(?:for|about))?\s+{a}$"),
+    ("google", r"^{f}(?:search|find|look up|google)(?: for| about)?\s+{a}\s+(?:on|in|with|using)\s+google$"),
+    ("google", r"^{f}google\s+{a}$"),
+    ("google", r"^{f}(?:search|look up|find)\s+(?:the web|the internet|online)\s+(?:for|about)\s+{a}$"),
+]
+_COMPILED_RULES = [(intent, re.compile(pattern.format(f=_FILLER, a=_ARG))) for intent, pattern in RULES]
+
+# Keyword weights for the scored matcher
+KEYWORDS: Dict[str, Dict[str, float]] = {
+    "time": {"time": 0.6, "clock": 0.5, "hour": 0.3, "now": 0.1, "current": 0.1, "what": 0.05},
+    "youtube": {"youtube": 0.8, "video": 0.6, "videos": 0.6, "watch": 0.25, "play": 0.2, "music": 0.1, "song": 0.1},
+    "google": {"google": 0.8, "search": 0.3, "web": 0.2, "browse": 0.2, "look": 0.1, "find": 0.1},
+}
+# Words stripped from the command to get the search query
+_STOPWORDS = {
+    "open", "search", "searching", "find", "look", "up", "play", "watch", "show", "me", "for", "on",
+    "in", "at", "the", "please", "can", "could", "you", "hey", "ok", "okay", "and", "go", "to", "about",
+    "using", "with", "some", "a", "videos", "video", "google", "youtube", "web", "browse",
+}
+_LEADING_ONLY = {"a", "the", "some", "me"}
+# A scored command must start (after filler) with one of these or with a site name
+_COMMAND_VERBS = {"open", "search", "play", "watch", "find", "look", "show", "go", "browse"}
+_FILLER_WORDS = {"please", "can", "could", "you", "hey", "ok", "okay"}
+_TRAILING = {"on", "in", "at", "using", "with", "please", "google", "youtube", "web"}
+
+
+def normalize(command: str) -> str:
+    text = command.lower().strip().rstrip("?.!")
+    for pattern, replacement in _NORMALIZE:
+        text = re.sub(pattern, replacement, text)
+    return re.sub(r"\s+", " ", text)
+
+
+class Route:
+    __slots__ = ("intent", "argument", "confidence", "method", "elapsed_ms")
+
+    def __init__(self, intent: Optional[str], argument: str, confidence: float, method: str, elapsed_ms: float = 0.0):
+        self.intent = intent
+        self.argument = argument
+        self.confidence = confidence
+        self.method = method
+        self.elapsed_ms = elapsed_ms
+
+    def __repr__(self):
+        return f"Route({self.intent!r}, {self.argument!r}, {self.confidence:.2f}, {self.method})"
+
+
+class IntentRouter:
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self.routed = 0
+        self.fallthrough = 0
+
+    def route(self, command: str) -> Route:
+        start = time.perf_counter()
+        text = normalize(command)
+        result = self._match_rules(text) or self._score(text)
+        if result.confidence < self.threshold:
+            result = Route(None, command, result.confidence, "fallthrough")
+            self.fallthrough += 1
+        else:
+            self.routed += 1
+        result.elapsed_ms = (time.perf_counter() - start) * 1000
+        return result
+
+    def _match_rules(self, text: str) -> Optional[Route]:
+        for intent, pattern in _COMPILED_RULES:
+            m = pattern.match(text)
+            if m:
+                return Route(intent, extract_query(m.groupdict().get("arg") or ""), 1.0, "rule")
+        return None
+
+    def _score(self, text: str) -> Route:
+        words = text.split()
+        scores = {}
+        for intent, weights in KEYWORDS.items():
+            score = 0.0
+            for word in words:
+                best = max((_similarity(word, keyword) * weight for keyword, weight in weights.items()), default=0.0)
+                score += best
+            scores[intent] = min(score, 1.0)
+        intent = max(scores, key=scores.get)
+        ranked = sorted(scores.values(), reverse=True)
+        # Penalize ambiguity: two intents with similar scores are not a confident match.
+        confidence = ranked[0] - 0.5 * ranked[1]
+        argument = "" if intent == "time" else extract_query(text, fuzzy=True)
+        if intent == "time":
+            confidence = 0.0  # phrasings the rules did not match are questions about time, not the clock
+        elif not _starts_like_command(words):
+            confidence = 0.0  # "who founded youtube" is a question about the site, not a search
+        elif not argument:
+            confidence = 0.0  # a search without a query needs the agent (or the user) to clarify
+        return Route(intent, argument, confidence, "score")
+
+    def stats_markdown(self) -> str:
+        total = self.routed + self.fallthrough
+        share = self.routed / total if total else 0.0
+        return f"**Intent router** — {self.routed}/{total} commands handled locally ({share:.0%})"
+
+
+def _similarity(word: str, keyword: str) -> float:
+    if word == keyword:
+        return 1.0
+    if abs(len(word) - len(keyword)) > 2 or len(word) < 4:
+        return 0.0
+    ratio = difflib.SequenceMatcher(None, word, keyword).ratio()
+    return ratio if ratio >= 0.8 else 0.0
+
+
+def _is_site(word: str) -> bool:
+    return any(_similarity(word, site) >= 0.8 for site in ("google", "youtube"))
+
+
+def _starts_like_command(words: List[str]) -> bool:
+    words = [w for w in words if w not in _FILLER_WORDS]
+    if not words:
+        return False
+    first = words[0]
+    return _is_site(first) or any(_similarity(first, verb) >= 0.8 for verb in _COMMAND_VERBS)
+
+
+def extract_query(text: str, fuzzy: bool = False) -> str:
+    """Search query left after dropping command words ("open youtube for" ...) at the edges."""
+    words = text.split()
+    leading = _STOPWORDS if fuzzy else _LEADING_ONLY
+    while words and (words[0] in leading or (fuzzy and _is_site(words[0]))):
+        words.pop(0)
+    while fuzzy and words and (words[-1] in _TRAILING or _is_site(words[-1])):
+        words.pop()
+    return " ".join(words).strip(" ,")
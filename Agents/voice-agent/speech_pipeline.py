@@ -0,0 +1,513 @@
+# speech_pipeline.py
+"""
+Continuous speech capture for the voice assistant.
+
+`listen_once` used to build a new `sr.Recognizer` and open the microphone on every button press,
+record up to 10 seconds and only then upload the whole clip to `recognize_google`, so the network
+round-trip started after the user had stopped talking. `SpeechPipeline` keeps one audio source open
+on a capture thread and processes it on a second thread:
+
+    source (mic / WAV) -> 30 ms frames -> VAD + utterance segmenter -> recognizer session
+                                                                   -> partial text while speaking
+                                                                   -> final text at end of speech
+
+Recognizers are pluggable (`RECOGNIZERS`): Google Web Speech through speech_recognition, Vosk and
+faster-whisper on the local CPU, and a dummy backend for wiring tests. Streaming backends (Vosk) get
+every frame as it arrives; local batch backends re-transcribe the growing utterance every
+`partial_interval_ms`. For every utterance the pipeline records end-of-speech -> text latency,
+measured from the last voiced frame to the moment the final text is available.
+
+WAV files can stand in for the microphone:
+
+    python speech_pipeline.py command.wav --recognizer vosk --realtime
+"""
+
+import argparse
+import json
+import math
+import os
+import queue
+import threading
+import time
+import wave
+from array import array
+from collections import deque
+from typing import Callable, Iterator, List, Optional, Tuple
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+SAMPLE_WIDTH = 2  # 16-bit PCM
+
+Frame = Tuple[bytes, float]  # (mono int16 PCM, capture time from time.perf_counter())
+
+
+# -----------------------------
+# Audio sources
+# -----------------------------
+class MicrophoneSource:
+    """Default microphone through speech_recognition/PyAudio, opened once for the whole session."""
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE, frame_ms: int = FRAME_MS, device_index: Optional[int] = None):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.device_index = device_index
+
+    def frames(self, stop: threading.Event) -> Iterator[Frame]:
+        import speech_recognition as sr
+
+        samples = self.sample_rate * self.frame_ms // 1000
+        with sr.Microphone(device_index=self.device_index, sample_rate=self.sample_rate, chunk_size=samples) as mic:
+            while not stop.is_set():
+                yield mic.stream.read(samples), time.perf_counter()
+
+
+class WavFileSource:
+    """16-bit PCM WAV file as a frame source. With `realtime`, frames are paced like a live microphone."""
+
+    def __init__(self, path: str, frame_ms: int = FRAME_MS, realtime: bool = False, trailing_silence_ms: int = 1000):
+        self.path = path
+        self.frame_ms = frame_ms
+        self.realtime = realtime
+        self.trailing_silence_ms = trailing_silence_ms
+        with wave.open(path, "rb") as wav:
+            if wav.getsampwidth() != SAMPLE_WIDTH:
+                raise ValueError(f"{path}: only 16-bit PCM WAV files are supported")
+            self.sample_rate = wav.getframerate()
+            self.channels = wav.getnchannels()
+
+    def frames(self, stop: threading.Event) -> Iterator[Frame]:
+        samples = self.sample_rate * self.frame_ms // 1000
+        interval = self.frame_ms / 1000
+        next_at = time.perf_counter()
+        for data in self._pcm(samples):
+            if stop.is_set():
+                break
+            if self.realtime:
+                next_at += interval
+                time.sleep(max(0.0, next_at - time.perf_counter()))
+            yield data, time.perf_counter()
+
+    def _pcm(self, samples: int) -> Iterator[bytes]:
+        with wave.open(self.path, "rb") as wav:
+            while True:
+                data = wav.readframes(samples)
+                if not data:
+                    break
+                if self.channels > 1:
+                    data = _downmix(data, self.channels)
+                yield data.ljust(samples * SAMPLE_WIDTH, b"\0")
+        # A little silence after the file, so a final utterance is closed by the VAD as it would be live
+        for _ in range(self.trailing_silence_ms // self.frame_ms):
+            yield bytes(samples * SAMPLE_WIDTH)
+
+
+def _downmix(data: bytes, channels: int) -> bytes:
+    pcm = array("h", data)
+    return array("h", (sum(pcm[i:i + channels]) // channels for i in range(0, len(pcm), channels))).tobytes()
+
+
+def rms(frame: bytes) -> float:
+    pcm = array("h", frame)
+    return math.sqrt(sum(s * s for s in pcm) / len(pcm)) if pcm else 0.0
+
+
+# -----------------------------
+# Voice activity detection
+# -----------------------------
+class EnergyVAD:
+    """RMS energy against an adaptive noise floor; no dependencies."""
+
+    def __init__(self, ratio: float = 3.0, min_rms: float = 300.0, adapt: float = 0.05):
+        self.ratio = ratio
+        self.min_rms = min_rms
+        self.adapt = adapt
+        self.noise_floor: Optional[float] = None
+
+    def is_speech(self, frame: bytes, sample_rate: int) -> bool:
+        level = rms(frame)
+        if self.noise_floor is None:
+            self.noise_floor = level
+        speech = level > max(self.min_rms, self.noise_floor * self.ratio)
+        if not speech:
+            self.noise_floor += self.adapt * (level - self.noise_floor)
+        return speech
+
+
+class WebRtcVAD:
+    """Google's WebRTC VAD (`pip install webrtcvad`); frames must be 10, 20 or 30 ms."""
+
+    def __init__(self, aggressiveness: int = 2):
+        import webrtcvad
+
+        self._vad = webrtcvad.Vad(aggressiveness)
+
+    def is_speech(self, frame: bytes, sample_rate: int) -> bool:
+        return self._vad.is_speech(frame, sample_rate)
+
+
+def default_vad():
+    try:
+        return WebRtcVAD()
+    except ImportError:
+        return EnergyVAD()
+
+
+# -----------------------------
+# Recognizers
+# -----------------------------
+class _BufferedSession:
+    """Collects an utterance for batch recognizers, with optional periodic partial transcripts."""
+
+    def __init__(self, recognizer, sample_rate: int, partial_interval_ms: Optional[int]):
+        self.recognizer = recognizer
+        self.sample_rate = sample_rate
+        self.partial_bytes = (sample_rate * SAMPLE_WIDTH * partial_interval_ms // 1000) if partial_interval_ms else None
+        self.buffer = bytearray()
+        self._next_partial = self.partial_bytes
+
+    def accept(self, frame: bytes) -> Optional[str]:
+        self.buffer += frame
+        if self.partial_bytes and len(self.buffer) >= self._next_partial:
+            self._next_partial += self.partial_bytes
+            return self.recognizer.transcribe(bytes(self.buffer), self.sample_rate)
+        return None
+
+    def finish(self) -> str:
+        return self.recognizer.transcribe(bytes(self.buffer), self.sample_rate)
+
+
+class GoogleRecognizer:
+    """Google Web Speech API via speech_recognition (network; no partials)."""
+
+    def __init__(self, language: str = "en-US"):
+        import speech_recognition as sr
+
+        self._sr = sr
+        self._recognizer = sr.Recognizer()
+        self.language = language
+
+    def session(self, sample_rate: int):
+        return _BufferedSession(self, sample_rate, partial_interval_ms=None)
+
+    def transcribe(self, pcm: bytes, sample_rate: int) -> str:
+        try:
+            return self._recognizer.recognize_google(self._sr.AudioData(pcm, sample_rate, SAMPLE_WIDTH),
+                                                     language=self.language)
+        except self._sr.UnknownValueError:
+            return ""
+
+
+class VoskRecognizer:
+    """Offline streaming recognizer (`pip install vosk`, model directory in VOSK_MODEL_PATH)."""
+
+    def __init__(self, model_path: Optional[str] = None):
+        from vosk import KaldiRecognizer, Model, SetLogLevel
+
+        SetLogLevel(-1)
+        self._kaldi = KaldiRecognizer
+        self._model = Model(model_path or os.getenv("VOSK_MODEL_PATH", "vosk-model-small-en-us"))
+
+    def session(self, sample_rate: int):
+        return _VoskSession(self._kaldi(self._model, sample_rate))
+
+    def transcribe(self, pcm: bytes, sample_rate: int) -> str:
+        session = self.session(sample_rate)
+        session.accept(pcm)
+        return session.finish()
+
+
+class _VoskSession:
+    def __init__(self, kaldi):
+        self.kaldi = kaldi
+        self.pieces: List[str] = []
+
+    def accept(self, frame: bytes) -> Optional[str]:
+        if self.kaldi.AcceptWaveform(frame):
+            text = json.loads(self.kaldi.Result()).get("text", "")
+            if text:
+                self.pieces.append(text)
+            return " ".join(self.pieces) or None
+        partial = json.loads(self.kaldi.PartialResult()).get("partial", "")
+        return " ".join(self.pieces + [partial]).strip() or None
+
+    def finish(self) -> str:
+        text = json.loads(self.kaldi.FinalResult()).get("text", "")
+        return " ".join(self.pieces + ([text] if text else []))
+
+
+class WhisperRecognizer:
+    """faster-whisper on the CPU (`pip install faster-whisper`); model size from WHISPER_MODEL."""
+
+    def __init__(self, model_size: Optional[str] = None, partial_interval_ms: int = 1000):
+        from faster_whisper import WhisperModel
+
+        self._model = WhisperModel(model_size or os.getenv("WHISPER_MODEL", "base.en"), device="cpu", compute_type="int8")
+        self.partial_interval_ms = partial_interval_ms
+
+    def session(self, sample_rate: int):
+        return _BufferedSession(self, sample_rate, self.partial_interval_ms)
+
+    def transcribe(self, pcm: bytes, sample_rate: int) -> str:
+        import numpy as np
+
+        audio = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+        if sample_rate != SAMPLE_RATE:  # whisper expects 16 kHz
+            positions = np.linspace(0, len(audio) - 1, int(len(audio) * SAMPLE_RATE / sample_rate))
+            audio = np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+        segments, _ = self._model.transcribe(audio, beam_size=1, language="en")
+        return " ".join(segment.text.strip() for segment in segments).strip()
+
+
+class DummyRecognizer:
+    """Describes the audio instead of transcribing it; for testing segmentation and wiring offline."""
+
+    def session(self, sample_rate: int):
+        return _BufferedSession(self, sample_rate, partial_interval_ms=500)
+
+    def transcribe(self, pcm: bytes, sample_rate: int) -> str:
+        return f"<{len(pcm) / (sample_rate * SAMPLE_WIDTH):.2f}s of speech>"
+
+
+RECOGNIZERS = {
+    "google": GoogleRecognizer,
+    "vosk": VoskRecognizer,
+    "whisper": WhisperRecognizer,
+    "dummy": DummyRecognizer,
+}
+
+
+def get_recognizer(name: Optional[str] = None):
+    """Recognizer backend by name (default: VOICE_RECOGNIZER env var, then "google")."""
+    name = (name or os.getenv("VOICE_RECOGNIZER", "google")).lower()
+    if name not in RECOGNIZERS:
+        raise KeyError(f"Unknown recognizer '{name}'. Available: {', '.join(RECOGNIZERS)}")
+    return RECOGNIZERS[name]()
+
+
+# -----------------------------
+# Pipeline
+# -----------------------------
+class Utterance:
+    def __init__(self, text: str, duration_s: float, eos_to_text_ms: float, partials: int, error: Optional[str] = None):
+        self.text = text
+        self.duration_s = duration_s
+        self.eos_to_text_ms = eos_to_text_ms
+        self.partials = partials
+        self.error = error
+
+    def __repr__(self):
+        return f"Utterance({self.text!r}, {self.duration_s:.2f}s, eos->text {self.eos_to_text_ms:.0f} ms)"
+
+
+class SpeechPipeline:
+    """
+    Background capture -> VAD -> recognizer. Final utterances are put on `results`; the latest
+    partial transcript is in `partial`. While paused, audio is read and discarded, so the
+    microphone stays open between commands.
+    """
+
+    def __init__(self, source, recognizer, vad=None, frame_ms: int = FRAME_MS, start_ms: int = 90,
+                 hangover_ms: int = 600, pre_roll_ms: int = 300, max_utterance_s: float = 10.0,
+                 on_partial: Optional[Callable[[str], None]] = None):
+        self.source = source
+        self.recognizer = recognizer
+        self.vad = vad or default_vad()
+        self.frame_ms = frame_ms
+        self.start_frames = max(1, start_ms // frame_ms)
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self.max_frames = int(max_utterance_s * 1000 / frame_ms)
+        self.on_partial = on_partial
+
+        self.results: "queue.Queue[Utterance]" = queue.Queue()
+        self.partial = ""
+        self.speaking = threading.Event()
+        self.finished = threading.Event()
+        self.latencies = deque(maxlen=100)
+        self.error: Optional[str] = None
+
+        self._frames: "queue.Queue[Optional[Frame]]" = queue.Queue(maxsize=1000)
+        self._pre_roll = deque(maxlen=max(1, pre_roll_ms // frame_ms))
+        self._stop = threading.Event()
+        self._paused = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    # -----------------------------
+    # Control
+    # -----------------------------
+    def start(self, paused: bool = False) -> "SpeechPipeline":
+        if paused:
+            self._paused.set()
+        self._threads = [
+            threading.Thread(target=self._capture, name="speech-capture", daemon=True),
+            threading.Thread(target=self._process, name="speech-process", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=2)
+
+    def pause(self) -> None:
+        self._paused.set()
+
+    def resume(self) -> None:
+        self._paused.clear()
+
+    def listen(self, timeout: float = 5.0, on_partial: Optional[Callable[[str], None]] = None) -> Optional[Utterance]:
+        """
+        Wait for the next utterance: returns None if nobody starts speaking within `timeout`
+        seconds. `on_partial` is called (on this thread) whenever the partial transcript changes.
+        """
+        while not self.results.empty():
+            self.results.get_nowait()
+        self.partial = ""
+        self.resume()
+        try:
+            deadline = time.monotonic() + timeout
+            last_partial = ""
+            while True:
+                try:
+                    return self.results.get(timeout=0.05)
+                except queue.Empty:
+                    pass
+                if on_partial and self.partial != last_partial:
+                    last_partial = self.partial
+                    on_partial(last_partial)
+                if self.error or self.finished.is_set():
+                    return None
+                if not self.speaking.is_set() and time.monotonic() > deadline:
+                    return None
+        finally:
+            self.pause()
+
+    # -----------------------------
+    # Threads
+    # -----------------------------
+    def _capture(self) -> None:
+        try:
+            for frame in self.source.frames(self._stop):
+                self._frames.put(frame)
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+        finally:
+            self._frames.put(None)
+
+    def _process(self) -> None:
+        sample_rate = self.source.sample_rate
+        session = None
+        voiced_run = silent_run = length = partials = 0
+        last_voiced_at = 0.0
+
+        while not self._stop.is_set():
+            item = self._frames.get()
+            if item is None:
+                break
+            frame, captured_at = item
+            if self._paused.is_set():
+                session, voiced_run = None, 0
+                self.speaking.clear()
+                continue
+
+            voiced = self.vad.is_speech(frame, sample_rate)
+            if session is None:
+                self._pre_roll.append(frame)
+                voiced_run = voiced_run + 1 if voiced else 0
+                if voiced_run < self.start_frames:
+                    continue
+                # Speech started: replay the pre-roll so the first syllable is not clipped
+                session = self.recognizer.session(sample_rate)
+                silent_run = partials = 0
+                length = len(self._pre_roll)
+                last_voiced_at = captured_at
+                self.speaking.set()
+                for buffered in self._pre_roll:
+                    self._accept(session, buffered)
+                self._pre_roll.clear()
+                continue
+
+            length += 1
+            if voiced:
+                silent_run, last_voiced_at = 0, captured_at
+            else:
+                silent_run += 1
+            if self._accept(session, frame):
+                partials += 1
+
+            if silent_run >= self.hangover_frames or length >= self.max_frames:
+                self._finish(session, length, partials, last_voiced_at)
+                session, voiced_run = None, 0
+
+        if session is not None:
+            self._finish(session, length, partials, last_voiced_at)
+        self.finished.set()
+
+    def _accept(self, session, frame: bytes) -> bool:
+        try:
+            partial = session.accept(frame)
+        except Exception:
+            return False
+        if partial and partial != self.partial:
+            self.partial = partial
+            if self.on_partial:
+                self.on_partial(partial)
+            return True
+        return False
+
+    def _finish(self, session, length: int, partials: int, last_voiced_at: float) -> None:
+        error = None
+        try:
+            text = session.finish().strip()
+        except Exception as e:
+            text, error = "", f"{type(e).__name__}: {e}"
+        latency_ms = (time.perf_counter() - last_voiced_at) * 1000
+        self.latencies.append(latency_ms)
+        self.speaking.clear()
+        self.results.put(Utterance(text, length * self.frame_ms / 1000, latency_ms, partials, error))
+
+    # -----------------------------
+    # Metrics
+    # -----------------------------
+    def stats_markdown(self) -> str:
+        if not self.latencies:
+            return "**Speech recognition** — no utterances yet"
+        ordered = sorted(self.latencies)
+        return (
+            f"**Speech recognition** ({type(self.recognizer).__name__}) — end of speech → text: "
+            f"last {self.latencies[-1]:.0f} ms, median {ordered[len(ordered) // 2]:.0f} ms "
+            f"over {len(ordered)} utterances"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the speech pipeline over WAV files instead of the microphone.")
+    parser.add_argument("wav", nargs="+")
+    parser.add_argument("--recognizer", default=os.getenv("VOICE_RECOGNIZER", "dummy"), choices=sorted(RECOGNIZERS))
+    parser.add_argument("--vad", choices=("energy", "webrtc"), default="energy")
+    parser.add_argument("--realtime", action="store_true", help="pace frames like a live microphone")
+    parser.add_argument("--hangover-ms", type=int, default=600)
+    args = parser.parse_args()
+
+    recognizer = get_recognizer(args.recognizer)
+    for path in args.wav:
+        print(f"== {path}")
+        pipeline = SpeechPipeline(
+            WavFileSource(path, realtime=args.realtime), recognizer,
+            vad=WebRtcVAD() if args.vad == "webrtc" else EnergyVAD(),
+            hangover_ms=args.hangover_ms, on_partial=lambda text: print(f"   … {text}"),
+        ).start()
+        pipeline.finished.wait()
+        while not pipeline.results.empty():
+            utterance = pipeline.results.get()
+            print(f"   {utterance.text!r}  ({utterance.duration_s:.2f}s of audio, "
+                  f"end of speech -> text {utterance.eos_to_text_ms:.0f} ms, {utterance.partials} partials)"
+                  + (f"  error: {utterance.error}" if utterance.error else ""))
+        if pipeline.error:
+            print(f"   source error: {pipeline.error}")
+        print(f"   {pipeline.stats_markdown()}")
+
+
+if __name__ == "__main__":
+    main()
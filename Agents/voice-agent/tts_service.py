@@ -0,0 +1,220 @@
+# tts_service.py
+"""
+Text-to-speech service for the voice assistant.
+
+`speak()` used to start a new thread per response, and every thread drove the same pyttsx3
+engine, so overlapping answers collided ("run loop already started") and each one paid thread
+start-up. `TTSService` keeps a single long-lived worker thread that owns the engine and reads
+from a bounded queue:
+
+- text is split into sentences and played one chunk at a time, so the first sentence starts
+  while later ones (or a streamed answer) are still arriving;
+- a new response interrupts the old one (`say(..., interrupt=True)`, the default): queued
+  chunks of the stale response are dropped and the sentence being spoken is stopped at the next
+  word boundary;
+- queue latency (enqueue -> playback) and time-to-first-audio (request -> first chunk played)
+  are recorded for the last `METRICS_WINDOW` utterances.
+"""
+
+import queue
+import re
+import threading
+import time
+from collections import deque
+from typing import Callable, Iterable, List, Optional
+
+MAX_QUEUE = 32
+METRICS_WINDOW = 100
+
+_SENTENCE_END = re.compile(r"(?<=[.!?;:])\s+|\n+")
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in _SENTENCE_END.split(text) if s.strip()]
+
+
+def _default_engine():
+    import pyttsx3
+
+    return pyttsx3.init()
+
+
+class _Request:
+    __slots__ = ("generation", "created_at", "first_audio_at")
+
+    def __init__(self, generation: int):
+        self.generation = generation
+        self.created_at = time.perf_counter()
+        self.first_audio_at = None
+
+
+class _Chunk:
+    __slots__ = ("request", "text", "enqueued_at")
+
+    def __init__(self, request: _Request, text: str):
+        self.request = request
+        self.text = text
+        self.enqueued_at = time.perf_counter()
+
+
+class TTSService:
+    """Single-worker, interruptible TTS queue. `engine_factory` is called on the worker thread."""
+
+    def __init__(self, engine_factory: Optional[Callable] = None, max_queue: int = MAX_QUEUE):
+        self._engine_factory = engine_factory or _default_engine
+        self._engine = None
+        self._queue: "queue.Queue[Optional[_Chunk]]" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._current: Optional[_Chunk] = None
+
+        self.queue_latency = deque(maxlen=METRICS_WINDOW)
+        self.first_audio = deque(maxlen=METRICS_WINDOW)
+        self.spoken = 0
+        self.cancelled = 0
+        self.dropped = 0
+        self.errors = 0
+
+        self._thread = threading.Thread(target=self._run, name="tts-worker", daemon=True)
+        self._thread.start()
+
+    # -----------------------------
+    # Producer side
+    # -----------------------------
+    def say(self, text: str, interrupt: bool = True) -> None:
+        """Queue `text` sentence by sentence. With `interrupt`, anything still playing is cut off."""
+        request = self._new_request(interrupt)
+        for sentence in split_sentences(text):
+            self._put(_Chunk(request, sentence))
+
+    def say_stream(self, fragments: Iterable[str], interrupt: bool = True) -> None:
+        """Speak text as it is produced (e.g. LLM tokens): each sentence is queued once complete."""
+        request = self._new_request(interrupt)
+        buffer = ""
+        for fragment in fragments:
+            if self._is_stale(request):
+                return
+            buffer += fragment
+            *complete, buffer = _SENTENCE_END.split(buffer)
+            for sentence in complete:
+                if sentence.strip():
+                    self._put(_Chunk(request, sentence.strip()))
+        if buffer.strip() and not self._is_stale(request):
+            self._put(_Chunk(request, buffer.strip()))
+
+    def cancel(self) -> None:
+        """Stop the current utterance and drop everything queued."""
+        with self._lock:
+            self._generation += 1
+        while True:
+            try:
+                chunk = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if chunk is None:  # keep a pending shutdown
+                self._queue.put_nowait(None)
+                break
+            self.cancelled += 1
+
+    def close(self, timeout: float = 5.0) -> None:
+        self.cancel()
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _new_request(self, interrupt: bool) -> _Request:
+        if interrupt:
+            self.cancel()
+        with self._lock:
+            return _Request(self._generation)
+
+    def _put(self, chunk: _Chunk) -> None:
+        # When the queue is full the oldest chunk goes: a backlog of speech is stale anyway.
+        while True:
+            try:
+                self._queue.put_nowait(chunk)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def _is_stale(self, request: _Request) -> bool:
+        return request.generation != self._generation
+
+    # -----------------------------
+    # Worker side (owns the engine)
+    # -----------------------------
+    def _run(self) -> None:
+        try:
+            self._engine = self._engine_factory()
+            if hasattr(self._engine, "connect"):
+                self._engine.connect("started-word", self._on_word)
+        except Exception as e:
+            print(f"TTS Error: could not initialize engine: {e}")
+            return
+
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                break
+            if self._is_stale(chunk.request):
+                self.cancelled += 1
+                continue
+
+            now = time.perf_counter()
+            self.queue_latency.append(now - chunk.enqueued_at)
+            if chunk.request.first_audio_at is None:
+                chunk.request.first_audio_at = now
+                self.first_audio.append(now - chunk.request.created_at)
+
+            self._current = chunk
+            try:
+                self._engine.say(chunk.text)
+                self._engine.runAndWait()
+                if self._is_stale(chunk.request):
+                    self.cancelled += 1
+                else:
+                    self.spoken += 1
+            except Exception as e:
+                self.errors += 1
+                print(f"TTS Error: {e}")
+            finally:
+                self._current = None
+
+    def _on_word(self, name, location, length) -> None:
+        # Runs inside runAndWait on the worker thread: the supported place to stop the engine.
+        current = self._current
+        if current is not None and self._is_stale(current.request):
+            self._engine.stop()
+
+    # -----------------------------
+    # Metrics
+    # -----------------------------
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> dict:
+        def avg(values):
+            return sum(values) / len(values) if values else 0.0
+
+        return {
+            "spoken": self.spoken,
+            "cancelled": self.cancelled,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "pending": self.pending,
+            "avg_queue_latency_ms": avg(self.queue_latency) * 1000,
+            "avg_first_audio_ms": avg(self.first_audio) * 1000,
+            "last_first_audio_ms": (self.first_audio[-1] * 1000) if self.first_audio else 0.0,
+        }
+
+    def stats_markdown(self) -> str:
+        s = self.stats()
+        return (
+            f"**Speech** — time to first audio: {s['last_first_audio_ms']:.0f} ms "
+            f"(avg {s['avg_first_audio_ms']:.0f} ms), queue latency avg {s['avg_queue_latency_ms']:.0f} ms, "
+            f"{s['spoken']} chunks spoken, {s['cancelled']} interrupted"
+        )
@@ -1,62 +1,50 @@
 #Weather_agent.py
 from dotenv import load_dotenv
 import os
-import requests
 import streamlit as st
-from langchain.chat_models import ChatOpenAI
-from langchain.agents import Tool, initialize_agent, AgentType
+from common.weather_client import get_weather_client
+from common.travel_tools import WEATHER_TOOL, weather_report
+from common.agent_registry import get_agent, get_client
+from common.telemetry import get_callbacks, get_telemetry
+from common.llm_cache import get_llm_cache, llm_cache_markdown
 
 # Load API keys from .env
 load_dotenv()
 api_key = os.getenv("OPENAI_API_KEY")
 weather_api_key = os.getenv("WEATHER_API_KEY")
 
-# Initialize LLM
-llm = ChatOpenAI(
-    model_name="gpt-3.5-turbo",
-    temperature=0,
-    openai_api_key=api_key
-)
+# Pooled, cached OpenWeather client (shared across reruns and sessions)
+weather_client = get_weather_client(weather_api_key)
 
 # Weather function
 def get_weather(city: str) -> str:
     """Fetch weather info for a city"""
-    try:
-        url = f"https://api.openweathermap.org/data/2.5/weather?q={city}&appid={weather_api_key}&units=metric"
-        data = requests.get(url).json()
-
-        if data.get("cod") != 200:
-            return f"❌ Error: {data.get('message', 'Failed to fetch weather')}"
+    return weather_report(weather_client, city)
 
-        weather = data["weather"][0]["description"].capitalize()
-        temp = data["main"]["temp"]
-        feels_like = data["main"]["feels_like"]
-        humidity = data["main"]["humidity"]
+def load_agent():
+    """LLM + agent, built once per process on the first question (keeps LangChain out of cold start)."""
+    from langchain.chat_models import ChatOpenAI
+    from langchain.agents import Tool, initialize_agent, AgentType
 
-        return (
-            f"🌤️ Weather in {city.title()}\n"
-            f"- Condition: {weather}\n"
-            f"- Temperature: {temp}°C (feels like {feels_like}°C)\n"
-            f"- Humidity: {humidity}%"
-        )
-    except Exception as e:
-        return f"⚠️ Error fetching weather: {str(e)}"
+    # Initialize LLM (built once per process, reused across Streamlit reruns)
+    llm = get_client(
+        ChatOpenAI,
+        model_name="gpt-3.5-turbo",
+        temperature=0,
+        openai_api_key=api_key,
+        cache=get_llm_cache("weather"),
+    )
 
-# Define Tool
-weather_tool = Tool(
-    name="Weather Info",
-    func=get_weather,
-    description="Get the current weather of any city in the world."
-)
+    # Define Tool
+    weather_tool = Tool(func=get_weather, **WEATHER_TOOL)
 
-# Initialize agent with parsing error handling
-agent = initialize_agent(
-    tools=[weather_tool],
-    llm=llm,
-    agent_type=AgentType.CHAT_CONVERSATIONAL_REACT_DESCRIPTION,
-    verbose=True,
-    handle_parsing_errors=True  # ensures agent retries on parsing failures
-)
+    # Initialize agent with parsing error handling
+    return get_agent("weather", {"llm": id(llm), "tools": [weather_tool.name]}, lambda: initialize_agent(
+        tools=[weather_tool],
+        llm=llm,
+        agent_type=AgentType.CHAT_CONVERSATIONAL_REACT_DESCRIPTION,
+        handle_parsing_errors=True  # ensures agent retries on parsing failures
+    ))
 
 # Streamlit UI
 st.title("🌤️ Weather Agent")
@@ -67,9 +55,14 @@ user_input = st.text_input("Enter your question (e.g., What's the weather in Del
 if user_input:
     try:
         # Try agent first
-        response = agent.run(user_input)
+        response = load_agent().run(user_input, callbacks=get_callbacks("weather"))
     except Exception as e:
         # Fallback: call tool directly
         response = get_weather(user_input)
 
     st.success(response)
+
+st.sidebar.markdown(weather_client.stats_markdown())
+st.sidebar.markdown(llm_cache_markdown("weather"))
+get_telemetry().render_sidebar(st, "weather")
+
@@ -0,0 +1,129 @@
+# history_manager.py
+"""
+Token-budgeted conversation history for KnowledgeBot.
+
+Sending the whole transcript on every turn makes prompt size, cost and latency grow linearly with
+the conversation. `ConversationHistory` keeps the most recent turns verbatim within a token budget
+and folds older turns into a running summary, which is updated incrementally (old summary + the
+newly evicted lines) instead of being regenerated from scratch. If the summarizer call fails, the
+evicted lines are kept verbatim (truncated to half the budget) instead of being lost.
+"""
+
+import logging
+from typing import Callable, List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+logger = logging.getLogger(__name__)
+
+# Rough per-message overhead of the chat format (role, separators)
+MESSAGE_OVERHEAD = 4
+
+SUMMARY_PROMPT = (
+    "Progressively summarize the conversation, adding onto the previous summary and returning a new summary. "
+    "Keep names, facts the user shared, and open questions. Be concise.\n\n"
+    "Current summary:\n{summary}\n\n"
+    "New lines of conversation:\n{new_lines}\n\n"
+    "New summary:"
+)
+
+
+def _default_token_counter() -> Callable[[str], int]:
+    try:
+        import tiktoken
+        try:
+            encoding = tiktoken.encoding_for_model("gpt-4o-mini")
+        except KeyError:
+            encoding = tiktoken.get_encoding("cl100k_base")
+        return lambda text: len(encoding.encode(text))
+    except ImportError:
+        # ~4 characters per token for English text
+        return lambda text: max(1, len(text) // 4)
+
+
+class ConversationHistory:
+    """Full transcript for display plus a bounded prompt window for the model."""
+
+    def __init__(self, system_message: SystemMessage, summarizer=None, token_budget: int = 2000,
+                 fold_target: float = 0.75, count_tokens: Optional[Callable[[str], int]] = None):
+        self.system_message = system_message
+        self.summarizer = summarizer
+        self.token_budget = token_budget
+        self.fold_target = fold_target
+        self.count_tokens = count_tokens or _default_token_counter()
+
+        self.transcript: List[BaseMessage] = []
+        self.summary = ""
+        self._summary_tokens = 0
+        self._window: List[BaseMessage] = []
+        self._window_counts: List[int] = []
+        self._window_tokens = 0
+        self._system_tokens = self._count(system_message)
+
+    def _count(self, message: BaseMessage) -> int:
+        return self.count_tokens(message.content) + MESSAGE_OVERHEAD
+
+    def append(self, message: BaseMessage) -> None:
+        """Adds a message, counting its tokens once, and folds old turns if over budget."""
+        tokens = self._count(message)
+        self.transcript.append(message)
+        self._window.append(message)
+        self._window_counts.append(tokens)
+        self._window_tokens += tokens
+        if isinstance(message, AIMessage):
+            self._fold_if_needed()
+
+    def prompt_tokens(self) -> int:
+        return self._system_tokens + self._summary_tokens + self._window_tokens
+
+    def build_prompt(self) -> List[BaseMessage]:
+        """System message, running summary (if any) and the recent verbatim turns."""
+        messages = [self.system_message]
+        if self.summary:
+            messages.append(SystemMessage(content=f"Summary of the earlier conversation: {self.summary}"))
+        return messages + self._window
+
+    def _fold_if_needed(self) -> None:
+        if self._window_tokens <= self.token_budget:
+            return
+
+        # Pick whole turns from the front until the window is back under the fold target,
+        # always keeping the latest exchange verbatim.
+        target = self.token_budget * self.fold_target
+        count, tokens = 0, self._window_tokens
+        while tokens > target and len(self._window) - count > 2:
+            tokens -= self._window_counts[count]
+            count += 1
+            if count < len(self._window) and not isinstance(self._window[count], HumanMessage):
+                tokens -= self._window_counts[count]
+                count += 1
+
+        if count:
+            # Summarize first: the turns leave the window only once they are in the summary.
+            self._update_summary(self._window[:count])
+            del self._window[:count]
+            del self._window_counts[:count]
+            self._window_tokens = tokens
+
+    def _update_summary(self, evicted: List[BaseMessage]) -> None:
+        new_lines = "\n".join(
+            f"{'User' if isinstance(m, HumanMessage) else 'Assistant'}: {m.content}" for m in evicted
+        )
+        if self.summarizer is None:
+            self.summary = self._truncated_summary(new_lines)
+        else:
+            prompt = SUMMARY_PROMPT.format(summary=self.summary or "(none)", new_lines=new_lines)
+            try:
+                self.summary = self.summarizer.invoke(prompt).content.strip()
+            except Exception:
+                # Rate limit, timeout, ...: keep the evicted lines verbatim rather than lose them.
+                logger.exception("Summarizing the conversation failed; keeping the evicted turns verbatim")
+                self.summary = self._truncated_summary(new_lines)
+        self._summary_tokens = self.count_tokens(self.summary) + MESSAGE_OVERHEAD
+
+    def _truncated_summary(self, new_lines: str) -> str:
+        """No model to summarize with: keep the most recent evicted lines within half the budget."""
+        lines = f"{self.summary}\n{new_lines}".strip().split("\n")
+        while len(lines) > 1 and self.count_tokens("\n".join(lines)) > self.token_budget // 2:
+            lines.pop(0)
+        return "\n".join(lines)
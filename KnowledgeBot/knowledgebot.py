@@ -3,6 +3,8 @@ from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from dotenv import load_dotenv
 import os
+import time
+from history_manager import ConversationHistory
 
 # --- Load API Key ---
 load_dotenv()
@@ -17,21 +19,61 @@ st.set_page_config(page_title="KnowledgeBot", page_icon="🤖", layout="centered
 st.title("KnowledgeBot 🤖")
 st.markdown("Hey there 👋 I'm KnowledgeBot — your chat companion for facts, logic, and learning. What are we tackling today?")
 
-# --- Initialize Chat State ---
-if "messages" not in st.session_state:
-    st.session_state.messages = [
-        SystemMessage(content="You are KnowledgeBot, a helpful and professional AI assistant.")
-    ]
-
 # --- Initialize Chat Model ---
 llm = ChatOpenAI(
     model="gpt-4o-mini",   # or "gpt-4-turbo"
     temperature=0.6,
     openai_api_key=api_key,
+    streaming=True,
 )
+# Deterministic model used to fold old turns into the running summary
+summarizer_llm = ChatOpenAI(model="gpt-4o-mini", temperature=0, openai_api_key=api_key)
+
+# --- Semantic Answer Cache (shared by all sessions) ---
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "semantic_cache_index")
+CACHE_THRESHOLD = float(os.getenv("KNOWLEDGEBOT_CACHE_THRESHOLD", "0.92"))
+CACHE_MAX_ENTRIES = int(os.getenv("KNOWLEDGEBOT_CACHE_MAX_ENTRIES", "1000"))
+
+
+# Built on the first opening question rather than at startup: FAISS and the index on disk are
+# only loaded once something actually needs them.
+@st.cache_resource
+def load_semantic_cache():
+    from langchain_openai import OpenAIEmbeddings
+    from semantic_cache import SemanticCache
+
+    embeddings = OpenAIEmbeddings(model="text-embedding-3-small", openai_api_key=api_key)
+    return SemanticCache(embeddings, path=CACHE_DIR, threshold=CACHE_THRESHOLD, max_entries=CACHE_MAX_ENTRIES)
+
+
+# --- Initialize Chat State ---
+# Recent turns are sent verbatim within this budget; older turns are folded into a summary.
+HISTORY_TOKEN_BUDGET = int(os.getenv("KNOWLEDGEBOT_HISTORY_TOKENS", "2000"))
+
+if "history" not in st.session_state:
+    st.session_state.history = ConversationHistory(
+        SystemMessage(content="You are KnowledgeBot, a helpful and professional AI assistant."),
+        summarizer=summarizer_llm,
+        token_budget=HISTORY_TOKEN_BUDGET,
+    )
+if "turn_metrics" not in st.session_state:
+    st.session_state.turn_metrics = []
+history = st.session_state.history
+
+
+def stream_response(messages, metrics: dict):
+    """Yields tokens from `llm.stream` and records time-to-first-token and total generation time."""
+    start = time.perf_counter()
+    for chunk in llm.stream(messages):
+        if not chunk.content:
+            continue
+        if "ttft" not in metrics:
+            metrics["ttft"] = time.perf_counter() - start
+        yield chunk.content
+    metrics["total"] = time.perf_counter() - start
 
 # --- Chat Interface ---
-for msg in st.session_state.messages:
+for msg in history.transcript:
     if isinstance(msg, HumanMessage):
         st.chat_message("user").markdown(msg.content)
     elif isinstance(msg, AIMessage):
@@ -41,12 +83,43 @@ for msg in st.session_state.messages:
 if prompt := st.chat_input("Type your message..."):
     # Display user message
     st.chat_message("user").markdown(prompt)
-    st.session_state.messages.append(HumanMessage(content=prompt))
+    history.append(HumanMessage(content=prompt))
+
+    # Only opening questions are cached: follow-ups depend on the conversation so far.
+    standalone = len(history.transcript) == 1
+    cached_answer = load_semantic_cache().lookup(prompt) if standalone else None
+
+    metrics = {"prompt_tokens": history.prompt_tokens()}
+    with st.chat_message("assistant"):
+        if cached_answer is not None:
+            st.markdown(cached_answer)
+            response_text = cached_answer
+            metrics.update(ttft=0.0, total=0.0, prompt_tokens=0, cached=True)
+        else:
+            # Stream the response into the assistant bubble as tokens arrive
+            response_text = st.write_stream(stream_response(history.build_prompt(), metrics))
+            if standalone:
+                load_semantic_cache().add(prompt, response_text)
 
-    # Generate response
-    with st.spinner("Thinking..."):
-        response = llm.invoke(st.session_state.messages)
+    history.append(AIMessage(content=response_text))
+    st.session_state.turn_metrics.append(metrics)
 
-    # Display AI message
-    st.chat_message("assistant").markdown(response.content)
-    st.session_state.messages.append(AIMessage(content=response.content))
+# --- Latency Metrics ---
+if st.session_state.turn_metrics:
+    last = st.session_state.turn_metrics[-1]
+    st.sidebar.header("Latency")
+    st.sidebar.metric("Time to first token", f"{last.get('ttft', 0):.2f}s")
+    st.sidebar.metric("Total generation time", f"{last.get('total', 0):.2f}s")
+    st.sidebar.metric("Prompt tokens (last turn)", last.get("prompt_tokens", 0))
+    semantic_cache = load_semantic_cache()
+    st.sidebar.caption(
+        f"Semantic cache: {len(semantic_cache)} answers, hit rate {semantic_cache.hit_rate():.0%}"
+        + (" — last answer served from cache" if last.get("cached") else "")
+    )
+    with st.sidebar.expander("All turns"):
+        st.table({
+            "Turn": list(range(1, len(st.session_state.turn_metrics) + 1)),
+            "TTFT (s)": [f"{m.get('ttft', 0):.2f}" for m in st.session_state.turn_metrics],
+            "Total (s)": [f"{m.get('total', 0):.2f}" for m in st.session_state.turn_metrics],
+            "Prompt tokens": [m.get("prompt_tokens", 0) for m in st.session_state.turn_metrics],
+        })
@@ -0,0 +1,146 @@
+# semantic_cache.py
+"""
+Semantic answer cache for KnowledgeBot.
+
+Users often ask the same factual question with slightly different wording. Questions are embedded
+and looked up in a local FAISS index (the same `FAISS.from_texts` approach as in Langchian.ipynb);
+above a similarity threshold the stored answer is returned instead of calling the model.
+
+- Size-bounded: least recently used entries are evicted past `max_entries`.
+- Persistent: the index and its bookkeeping are saved to `path` after every write.
+- Offline-friendly: any LangChain `Embeddings` works, including `LocalHashEmbeddings` below.
+- Concurrent: questions are embedded (a network call with OpenAIEmbeddings) outside the lock;
+  only the index search and update are serialized.
+"""
+
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import List, Optional
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import Embeddings
+
+ORDER_FILE = "lru.json"
+
+
+class LocalHashEmbeddings(Embeddings):
+    """
+    Dependency-free embeddings (hashed word and character-trigram counts, L2-normalized).
+    Good enough to catch re-phrasings offline and in tests; use OpenAIEmbeddings in production.
+    """
+
+    def __init__(self, dimensions: int = 512):
+        self.dimensions = dimensions
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        words = re.findall(r"[a-z0-9]+", text.lower())
+        features = words + [w[i:i + 3] for w in words for i in range(max(1, len(w) - 2))]
+        for feature in features:
+            digest = int(hashlib.md5(feature.encode()).hexdigest(), 16)
+            vector[digest % self.dimensions] += 1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+class SemanticCache:
+    """FAISS-backed question -> answer cache with LRU eviction and on-disk persistence."""
+
+    def __init__(self, embeddings: Embeddings, path: Optional[str] = None,
+                 threshold: float = 0.92, max_entries: int = 1000):
+        self.embeddings = embeddings
+        self.path = path
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._store: Optional[FAISS] = None
+        self._lru: "OrderedDict[str, float]" = OrderedDict()
+        self._load()
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(os.path.join(self.path, ORDER_FILE)):
+            return
+        self._store = FAISS.load_local(self.path, self.embeddings, allow_dangerous_deserialization=True,
+                                     normalize_L2=True)
+        with open(os.path.join(self.path, ORDER_FILE)) as f:
+            self._lru = OrderedDict(json.load(f))
+
+    def _save(self) -> None:
+        if not self.path or self._store is None:
+            return
+        self._store.save_local(self.path)
+        with open(os.path.join(self.path, ORDER_FILE), "w") as f:
+            json.dump(list(self._lru.items()), f)
+
+    # -----------------------------
+    # Lookup / insert
+    # -----------------------------
+    def lookup(self, question: str) -> Optional[str]:
+        """Stored answer for the most similar cached question, if it clears the threshold."""
+        if self._store is None or not self._lru:
+            with self._lock:
+                self.misses += 1
+            return None
+        vector = self.embeddings.embed_query(question)
+        with self._lock:
+            results = self._store.similarity_search_with_score_by_vector(vector, k=1)
+            if not results:
+                self.misses += 1
+                return None
+            doc, distance = results[0]
+            # Vectors are L2-normalized, so squared L2 distance = 2 - 2 * cosine similarity.
+            similarity = 1 - distance / 2
+            if similarity < self.threshold:
+                self.misses += 1
+                return None
+            self.hits += 1
+            entry_id = doc.metadata["id"]
+            if entry_id in self._lru:
+                self._lru.move_to_end(entry_id)
+                self._lru[entry_id] = time.time()
+            return doc.metadata["answer"]
+
+    def add(self, question: str, answer: str) -> None:
+        pair = (question, self.embeddings.embed_documents([question])[0])
+        with self._lock:
+            entry_id = uuid.uuid4().hex
+            metadata = {"id": entry_id, "answer": answer}
+            if self._store is None:
+                self._store = FAISS.from_embeddings([pair], self.embeddings, metadatas=[metadata],
+                                                    ids=[entry_id], normalize_L2=True)
+            else:
+                self._store.add_embeddings([pair], metadatas=[metadata], ids=[entry_id])
+            self._lru[entry_id] = time.time()
+
+            evicted = []
+            while len(self._lru) > self.max_entries:
+                evicted.append(self._lru.popitem(last=False)[0])
+            if evicted:
+                self._store.delete(evicted)
+            self._save()
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
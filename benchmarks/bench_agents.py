@@ -0,0 +1,264 @@
+# bench_agents.py
+"""
+Offline latency/throughput benchmark for the tools and agents, against local stand-ins.
+
+The OpenAI, Amadeus and OpenWeather stand-ins from standins.py are started in-process, the apps
+are pointed at them through the environment (Agents/common/endpoints.py) and each app script is
+executed bare, without `streamlit run`, to get its functions. A bare run has no session state,
+so module-level UI code may stop early. The tool and agent functions are defined before that
+point, so they are still used. Every scenario is then called from N concurrent sessions (threads),
+each making `--requests` calls. The report shows p50/p95 latency, throughput and upstream calls
+per request.
+
+The first call of each scenario builds the agent and opens connection pools; it is reported
+separately and left out of the percentiles. Response caches (offer, weather and LLM caches) are
+disabled unless --warm-caches is given, so every call reaches the stand-ins.
+
+    python benchmarks/bench_agents.py                                   # all scenarios, 1 and 8 sessions
+    python benchmarks/bench_agents.py --scenarios get_flights weekend_pipeline --sessions 1 4 16
+    python benchmarks/bench_agents.py --llm-latency 800 --api-latency 300 --offers 250
+    python benchmarks/bench_agents.py --save before.json                # e.g. on the old revision
+    python benchmarks/bench_agents.py --compare before.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, List, NamedTuple, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "Agents"))
+
+from standins import StandIns  # noqa: E402
+
+DEPART, RETURN = "2026-12-18", "2026-12-21"
+FLIGHTS = f"FROM: Delhi TO: Paris DEPART: {DEPART} RETURN: {RETURN}"
+HOTELS = f"CITY: Paris CHECKIN: {DEPART} CHECKOUT: {RETURN}"
+WEEKEND_PROMPT = (
+    "Execute a full travel plan: 1. weather, 2. round-trip flights, 3. lodging. "
+    f"Origin City: Delhi. Destination City: Paris. Departure Date: {DEPART}. Return Date: {RETURN}."
+)
+
+# Settings that would otherwise serve repeated calls from a cache instead of the stand-ins
+NO_CACHE_ENV = {"OFFER_CACHE_TTL": "0", "OFFER_CACHE_STALE": "0", "WEATHER_CACHE_TTL": "0", "LLM_CACHE": "0"}
+
+
+class Scenario(NamedTuple):
+    app: str
+    call: Callable[[dict], object]                # app globals -> result
+    script: List[Tuple[str, str]] = []            # tool calls the fake LLM makes before answering
+
+
+SCENARIOS = {
+    "get_flights": Scenario(
+        "Agents/flight_agent_app.py",
+        lambda app: app["get_flights"](f"Find flights from Delhi to Paris on {DEPART} returning on {RETURN}"),
+    ),
+    "get_hotels": Scenario(
+        "Agents/lodging_agent_app.py",
+        lambda app: app["get_hotels"](f"Find hotels in Paris from {DEPART} to {RETURN}"),
+    ),
+    "get_weather": Scenario(
+        "Agents/weather_agent.py",
+        lambda app: app["get_weather"]("Paris"),
+    ),
+    "calculator_agent": Scenario(
+        "Agents/calculator.py",
+        lambda app: app["load_agent"]().invoke(
+            "What is twelve times twelve plus five?", config={"callbacks": app["get_callbacks"]("calculator")}),
+        [("Calculator", "12 * 12 + 5")],
+    ),
+    "todo_agent": Scenario(
+        "Agents/to-do-list.py",
+        lambda app: app["initialize_agent"]().invoke(
+            {"input": "Add buy milk to my list"}, config={"callbacks": app["get_callbacks"]("todo")}),
+        [("Add_Item", "buy milk")],
+    ),
+    "weekend_pipeline": Scenario(
+        "Agents/Weekend_Planner/weekend_planner_app.py",
+        lambda app: app["plan_trip_pipeline"]("Delhi", "Paris", DEPART, RETURN)["plan"],
+    ),
+    "weekend_agent": Scenario(
+        "Agents/Weekend_Planner/weekend_planner_app.py",
+        lambda app: app["load_master_agent"]().run(WEEKEND_PROMPT, callbacks=app["get_callbacks"]("weekend_planner")),
+        [("weather_info", "Paris"), ("flight_finder", FLIGHTS), ("hotel_finder", HOTELS)],
+    ),
+}
+
+
+def load_app(script: str) -> dict:
+    """Execute an app script without `streamlit run` and return its globals."""
+    path = os.path.join(ROOT, script)
+    if os.path.dirname(path) not in sys.path:
+        sys.path.insert(0, os.path.dirname(path))  # like `streamlit run`: script directory first
+    namespace = {"__name__": "__bench__", "__file__": path}
+    with open(path, encoding="utf-8") as f:
+        code = compile(f.read(), path, "exec")
+    try:
+        exec(code, namespace)
+    except Exception as e:
+        print(f"  note: {script} stopped at module level ({type(e).__name__}: {e})", file=sys.stderr)
+    return namespace
+
+
+def is_error(result) -> bool:
+    """Tools report failures as text ("❌ ...", "⚠️ ...", "Amadeus API error: ...")."""
+    text = str(result.get("output", "") if isinstance(result, dict) else result).strip()
+    first = text.splitlines()[0] if text else ""
+    return not first or first.startswith(("❌", "⚠️")) or "error" in first.lower()
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))]
+
+
+def run_scenario(scenario: Scenario, app: dict, standins: StandIns, sessions: int, requests: int) -> dict:
+    standins.openai.script = scenario.script
+
+    start = time.perf_counter()
+    try:
+        first = scenario.call(app)
+    except Exception as e:
+        return {"error": f"{type(e).__name__}: {e}"}
+    first_ms = (time.perf_counter() - start) * 1000
+    if is_error(first):
+        return {"error": str(first).strip().splitlines()[0][:200]}
+
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def session():
+        for _ in range(requests):
+            t0 = time.perf_counter()
+            try:
+                failed = is_error(scenario.call(app))
+            except Exception:
+                failed = True
+            elapsed = (time.perf_counter() - t0) * 1000
+            with lock:
+                latencies.append(elapsed)
+                errors.append(failed)
+
+    before = standins.request_counts()
+    wall_start = time.perf_counter()
+    threads = [threading.Thread(target=session) for _ in range(sessions)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - wall_start
+    after = standins.request_counts()
+
+    calls = len(latencies)
+    return {
+        "calls": calls,
+        "errors": sum(errors),
+        "first_call_ms": first_ms,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "mean_ms": sum(latencies) / calls,
+        "max_ms": max(latencies),
+        "throughput_rps": calls / wall,
+        "upstream_per_call": {name: (after[name] - before[name]) / calls for name in after},
+    }
+
+
+def report(results: dict, baseline: dict = None) -> None:
+    print(f"\n{'Scenario':<24} {'sess':>4} {'p50 ms':>9} {'p95 ms':>9} {'req/s':>8} {'err':>4} "
+          f"{'first ms':>9}  upstream/call")
+    for key, r in results.items():
+        name, sessions = key.rsplit("@", 1)
+        if "error" in r:
+            print(f"{name:<24} {sessions:>4}   failed: {r['error']}")
+            continue
+        upstream = ", ".join(f"{k} {v:.1f}" for k, v in r["upstream_per_call"].items() if v)
+        print(f"{name:<24} {sessions:>4} {r['p50_ms']:9.1f} {r['p95_ms']:9.1f} {r['throughput_rps']:8.2f} "
+              f"{r['errors']:>4} {r['first_call_ms']:9.1f}  {upstream}")
+
+    if baseline:
+        print(f"\n{'Scenario':<24} {'sess':>4} {'p50 before':>11} {'p50 after':>10} {'p95 before':>11} "
+              f"{'p95 after':>10} {'req/s':>14}")
+        for key, r in results.items():
+            before = baseline.get(key, {})
+            if "p50_ms" not in r or "p50_ms" not in before:
+                continue
+            name, sessions = key.rsplit("@", 1)
+            print(f"{name:<24} {sessions:>4} {before['p50_ms']:11.1f} {r['p50_ms']:10.1f} {before['p95_ms']:11.1f} "
+                  f"{r['p95_ms']:10.1f} {before['throughput_rps']:6.2f} -> {r['throughput_rps']:.2f}")
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip()
+    except OSError:
+        return ""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="*", choices=sorted(SCENARIOS), help="default: all")
+    parser.add_argument("--sessions", nargs="*", type=int, default=[1, 8], help="concurrency levels")
+    parser.add_argument("--requests", type=int, default=10, help="calls per session")
+    parser.add_argument("--llm-latency", type=float, default=300.0, help="ms per chat completion")
+    parser.add_argument("--api-latency", type=float, default=150.0, help="ms per Amadeus/OpenWeather request")
+    parser.add_argument("--jitter", type=float, default=50.0, help="random extra ms per request")
+    parser.add_argument("--offers", type=int, default=50, help="flight offers per search")
+    parser.add_argument("--hotels", type=int, default=60, help="hotels per city")
+    parser.add_argument("--warm-caches", action="store_true", help="keep the offer and weather caches on and enable the LLM cache")
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="JSON file from an earlier --save to compare against")
+    args = parser.parse_args()
+
+    names = args.scenarios or list(SCENARIOS)
+    save = os.path.abspath(args.save) if args.save else None  # resolved before changing directory
+    compare = os.path.abspath(args.compare) if args.compare else None
+    workdir = tempfile.mkdtemp(prefix="bench_agents_")
+    results = {}
+
+    with StandIns(args.llm_latency, args.api_latency, args.jitter, args.offers, args.hotels) as standins:
+        os.environ.update(standins.env())
+        os.environ.update({
+            "OFFER_CACHE_PATH": os.path.join(workdir, "offer_cache.sqlite3"),
+            "AGENT_TELEMETRY_PATH": os.path.join(workdir, "agent_telemetry.jsonl"),
+            "LLM_CACHE_PATH": os.path.join(workdir, "llm_cache.sqlite3"),
+        })
+        if args.warm_caches:
+            os.environ["LLM_CACHE"] = "1"  # opt-in in the apps; on here so repeated prompts replay from disk
+        else:
+            os.environ.update(NO_CACHE_ENV)
+        os.chdir(workdir)  # apps that keep files in the working directory (to-do database) write here
+
+        apps = {}
+        for name in names:
+            scenario = SCENARIOS[name]
+            if scenario.app not in apps:
+                print(f"loading {scenario.app} ...", file=sys.stderr)
+                apps[scenario.app] = load_app(scenario.app)
+            for sessions in args.sessions:
+                print(f"running {name} with {sessions} session(s) ...", file=sys.stderr)
+                results[f"{name}@{sessions}"] = run_scenario(
+                    scenario, apps[scenario.app], standins, sessions, args.requests)
+
+    baseline = None
+    if compare:
+        with open(compare) as f:
+            baseline = json.load(f)["results"]
+    report(results, baseline)
+
+    if save:
+        config = {k: v for k, v in vars(args).items() if k not in ("save", "compare")}
+        with open(save, "w") as f:
+            json.dump({"revision": git_revision(), "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                       "config": config, "results": results}, f, indent=2)
+        print(f"\nSaved results to {save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+# bench_cold_start.py
+"""
+Cold-start benchmark for every app entry point.
+
+Each app is executed once per sample in a fresh interpreter under `python -X importtime`, the way
+Streamlit runs it on the first page load (module level top to bottom, no button pressed). Dummy
+credentials are used and nothing is clicked, so no network calls are made. For every app the report
+shows the wall time of the first render and the cumulative import time of the heaviest top-level
+packages.
+
+    python benchmarks/bench_cold_start.py                       # all apps, 3 runs each
+    python benchmarks/bench_cold_start.py --apps calculator.py knowledgebot.py --top 5
+    python benchmarks/bench_cold_start.py --save before.json    # e.g. on the old revision
+    python benchmarks/bench_cold_start.py --compare before.json # cold-start reduction per app
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENTRY_POINTS = [
+    "Agents/calculator.py",
+    "Agents/multiple_agent.py",
+    "Agents/weather_agent.py",
+    "Agents/to-do-list.py",
+    "Agents/flight_agent_app.py",
+    "Agents/lodging_agent_app.py",
+    "Agents/TheAIDoctorBrain.py",
+    "Agents/voice-agent/app.py",
+    "Agents/Weekend_Planner/weekend_planner_app.py",
+    "KnowledgeBot/knowledgebot.py",
+]
+
+DUMMY_ENV = {
+    "OPENAI_API_KEY": "sk-bench",
+    "SERPAPI_API_KEY": "bench",
+    "OPENWEATHER_API_KEY": "bench",
+    "AMADEUS_API_KEY": "bench",
+    "AMADEUS_API_SECRET": "bench",
+    "AMADEUS_CLIENT_ID": "bench",
+    "AMADEUS_CLIENT_SECRET": "bench",
+}
+
+# Runs the script the way `streamlit run` does: script directory first on sys.path, __main__ name.
+RUNNER = (
+    "import os, runpy, sys\n"
+    "script = sys.argv[1]\n"
+    "sys.path.insert(0, os.path.dirname(script))\n"
+    "runpy.run_path(script, run_name='__main__')\n"
+)
+
+# "import time:       123 |       4567 |     package.module"
+_IMPORT_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)")
+
+
+def parse_importtime(stderr: str) -> dict:
+    """Cumulative import time (ms) per top-level package, from `-X importtime` output."""
+    packages = defaultdict(float)
+    for line in stderr.splitlines():
+        m = _IMPORT_LINE.match(line)
+        if not m or len(m.group(3)) > 1:
+            continue  # only imports made directly by the app (or the runner), not nested ones
+        packages[m.group(4).split(".")[0]] += int(m.group(2)) / 1000
+    return dict(packages)
+
+
+def run_app(script: str, workdir: str) -> tuple:
+    env = dict(os.environ, **DUMMY_ENV, OFFER_CACHE_PATH=os.path.join(workdir, "offer_cache.sqlite3"))
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", RUNNER, os.path.join(ROOT, script)],
+        cwd=workdir, env=env, capture_output=True, text=True, timeout=300,
+    )
+    wall = (time.perf_counter() - start) * 1000
+    packages = parse_importtime(proc.stderr)
+    error = None
+    if proc.returncode != 0:
+        error = (proc.stderr.strip().splitlines() or ["exit code %d" % proc.returncode])[-1]
+    return wall, packages, error
+
+
+def measure(script: str, runs: int) -> dict:
+    walls, breakdowns, error = [], [], None
+    with tempfile.TemporaryDirectory() as workdir:
+        for _ in range(runs):
+            wall, packages, error = run_app(script, workdir)
+            if error:
+                break
+            walls.append(wall)
+            breakdowns.append(packages)
+    if error:
+        return {"error": error}
+
+    packages = {
+        name: statistics.median(b.get(name, 0.0) for b in breakdowns)
+        for name in set().union(*breakdowns)
+    }
+    return {
+        "wall_ms": statistics.median(walls),
+        "import_ms": sum(packages.values()),
+        "packages": dict(sorted(packages.items(), key=lambda kv: -kv[1])),
+    }
+
+
+def report(results: dict, top: int, baseline: dict = None) -> None:
+    for script, result in results.items():
+        print(f"\n{script}")
+        if "error" in result:
+            print(f"  failed: {result['error']}")
+            continue
+        line = f"  first render {result['wall_ms']:8.1f} ms   imports {result['import_ms']:8.1f} ms"
+        before = (baseline or {}).get(script, {})
+        if "wall_ms" in before:
+            saved = before["wall_ms"] - result["wall_ms"]
+            line += f"   (was {before['wall_ms']:.1f} ms, {saved:+.1f} ms saved, {saved / before['wall_ms']:.0%})"
+        print(line)
+        for name, ms in list(result["packages"].items())[:top]:
+            was = before.get("packages", {}).get(name)
+            suffix = f"   (was {was:.1f} ms)" if was is not None else ""
+            print(f"    {name:<28} {ms:8.1f} ms{suffix}")
+        deferred = [name for name in before.get("packages", {}) if name not in result["packages"]]
+        if deferred:
+            print(f"    no longer imported at startup: {', '.join(sorted(deferred))}")
+
+    if baseline:
+        print(f"\n{'App':<48} {'before':>10} {'after':>10} {'saved':>8}")
+        for script, result in results.items():
+            before = baseline.get(script, {})
+            if "wall_ms" in result and "wall_ms" in before:
+                print(f"{script:<48} {before['wall_ms']:8.1f}ms {result['wall_ms']:8.1f}ms "
+                      f"{1 - result['wall_ms'] / before['wall_ms']:8.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=8, help="packages shown per app")
+    parser.add_argument("--apps", nargs="*", help="entry points to run (file names or paths)")
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="JSON file from an earlier --save to compare against")
+    args = parser.parse_args()
+
+    scripts = ENTRY_POINTS
+    if args.apps:
+        scripts = [s for s in ENTRY_POINTS if any(s.endswith(a) for a in args.apps)]
+
+    results = {}
+    for script in scripts:
+        print(f"running {script} ...", file=sys.stderr)
+        results[script] = measure(script, args.runs)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    report(results, args.top, baseline)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved results to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
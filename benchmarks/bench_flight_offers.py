@@ -0,0 +1,109 @@
+# bench_flight_offers.py
+"""
+Micro-benchmark: legacy per-segment normalization vs the columnar FlightTable.
+
+The recorded payload in data/flight_offers_del_par.json is replicated (with shifted prices and
+departure times) to the requested number of offers. The legacy path is the nested loop + pandas
+`to_markdown` from the old get_flights; the new path flattens once, filters, sorts and renders
+one page.
+
+    python benchmarks/bench_flight_offers.py --offers 50 250 1000
+"""
+
+import argparse
+import copy
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "Agents"))
+
+from common.flight_offers import FlightTable, OUTBOUND  # noqa: E402
+
+RECORDED = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "flight_offers_del_par.json")
+
+
+def load_offers(count: int) -> list:
+    with open(RECORDED) as f:
+        recorded = json.load(f)["data"]
+    offers = []
+    for i in range(count):
+        offer = copy.deepcopy(recorded[i % len(recorded)])
+        offer["id"] = str(i + 1)
+        total = float(offer["price"]["total"]) + (i * 7) % 300
+        offer["price"]["total"] = offer["price"]["grandTotal"] = f"{total:.2f}"
+        hour = f"{i % 24:02d}"
+        first = offer["itineraries"][0]["segments"][0]["departure"]
+        first["at"] = first["at"][:11] + hour + first["at"][13:]
+        offers.append(offer)
+    return offers
+
+
+def legacy(offers, origin="DEL", dest="CDG"):
+    import pandas as pd
+
+    outbound, return_flights = [], []
+    for offer in offers:
+        for itinerary in offer["itineraries"]:
+            for seg in itinerary["segments"]:
+                flight_info = {
+                    "Airline": seg["carrierCode"], "Flight No": seg["number"],
+                    "From": seg["departure"]["iataCode"], "To": seg["arrival"]["iataCode"],
+                    "Departure": seg["departure"]["at"], "Arrival": seg["arrival"]["at"],
+                    "Price": offer["price"]["total"], "Direct": len(itinerary["segments"]) == 1,
+                }
+                if seg["departure"]["iataCode"] == origin:
+                    outbound.append(flight_info)
+                elif seg["departure"]["iataCode"] == dest:
+                    return_flights.append(flight_info)
+    return pd.DataFrame(outbound).to_markdown(index=False), pd.DataFrame(return_flights).to_markdown(index=False)
+
+
+def columnar(offers):
+    table = FlightTable.from_offers(offers)
+    cheapest = table.to_markdown(table.sort(table.select(direction=OUTBOUND)))
+    direct_morning = table.to_markdown(
+        table.sort(table.select(direction=OUTBOUND, direct_only=True, depart_after="06:00", depart_before="12:00"))
+    )
+    return cheapest, direct_morning
+
+
+def measure(fn, offers, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(offers)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--offers", type=int, nargs="+", default=[50, 250, 1000])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    try:
+        import pandas  # noqa: F401
+        import tabulate  # noqa: F401
+        has_legacy = True
+    except ImportError:
+        has_legacy = False
+        print("pandas/tabulate not installed: skipping the legacy path")
+
+    print(f"{'offers':>7} {'columnar (ms)':>14} {'legacy (ms)':>12} {'speedup':>8}")
+    for count in args.offers:
+        offers = load_offers(count)
+        new = measure(columnar, offers, args.runs)
+        if has_legacy:
+            old = measure(legacy, offers, args.runs)
+            print(f"{count:>7} {new * 1000:>14.3f} {old * 1000:>12.3f} {old / new:>7.1f}x")
+        else:
+            print(f"{count:>7} {new * 1000:>14.3f} {'-':>12} {'-':>8}")
+
+
+if __name__ == "__main__":
+    main()
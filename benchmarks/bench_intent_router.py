@@ -0,0 +1,87 @@
+# bench_intent_router.py
+"""
+Accuracy and latency of the voice assistant's local intent router.
+
+Every command in data/voice_commands.jsonl is labelled with the expected intent (`null` = should
+fall through to the LLM agent) and tool argument. The report shows intent accuracy, argument
+accuracy on correctly routed commands, how many commands are handled without the agent, routing
+latency percentiles, and every miss.
+
+    python benchmarks/bench_intent_router.py
+    python benchmarks/bench_intent_router.py --threshold 0.5 --repeat 1000
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "Agents", "voice-agent"))
+
+from intent_router import DEFAULT_THRESHOLD, IntentRouter  # noqa: E402
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "voice_commands.jsonl")
+
+
+def load_corpus(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=CORPUS)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--repeat", type=int, default=200, help="timing passes over the corpus")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    router = IntentRouter(threshold=args.threshold)
+
+    correct_intent = correct_arg = routed_expected = 0
+    misses = []
+    for case in corpus:
+        route = router.route(case["command"])
+        if route.intent == case["intent"]:
+            correct_intent += 1
+            if route.intent is not None:
+                routed_expected += 1
+                if route.argument == case["argument"]:
+                    correct_arg += 1
+                else:
+                    misses.append((case, route, "argument"))
+        else:
+            misses.append((case, route, "intent"))
+
+    latencies = []
+    for _ in range(args.repeat):
+        for case in corpus:
+            start = time.perf_counter()
+            router.route(case["command"])
+            latencies.append((time.perf_counter() - start) * 1e6)
+
+    local = sum(1 for case in corpus if case["intent"] is not None)
+    print(f"Commands:            {len(corpus)} ({local} local intents, {len(corpus) - local} for the agent)")
+    print(f"Intent accuracy:     {correct_intent / len(corpus):.1%}")
+    print(f"Argument accuracy:   {correct_arg / routed_expected:.1%} of correctly routed tool commands"
+          if routed_expected else "Argument accuracy:   n/a")
+    print(f"Handled locally:     {sum(1 for c in corpus if router.route(c['command']).intent)}/{len(corpus)}")
+    print(f"Routing latency:     p50 {statistics.median(latencies):.1f} µs   p95 {percentile(latencies, 0.95):.1f} µs   "
+          f"max {max(latencies):.1f} µs")
+    if misses:
+        print("\nMisses:")
+        for case, route, kind in misses:
+            print(f"  [{kind}] {case['command']!r}: expected {case['intent']!r}/{case['argument']!r}, "
+                  f"got {route.intent!r}/{route.argument!r} ({route.method}, {route.confidence:.2f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# bench_prompt_startup.py
+"""
+Cold-start benchmark: vendored ReAct prompts vs `hub.pull`.
+
+Each sample runs in a fresh interpreter so imports and file reads are measured cold.
+
+    python benchmarks/bench_prompt_startup.py            # local registry only
+    python benchmarks/bench_prompt_startup.py --hub      # also time hub.pull (needs network)
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AGENTS_DIR = os.path.join(ROOT, "Agents")
+
+LOCAL_SNIPPET = (
+    "from common.prompt_registry import load_prompt\n"
+    "load_prompt('react-chat'); load_prompt('react')\n"
+)
+HUB_SNIPPET = (
+    "from langchain import hub\n"
+    "hub.pull('hwchase17/react-chat'); hub.pull('hwchase17/react')\n"
+)
+BASELINE_SNIPPET = "from langchain.prompts import PromptTemplate\n"
+
+
+def time_snippet(snippet: str, runs: int) -> list:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", snippet], cwd=AGENTS_DIR, check=True)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def report(label: str, samples: list) -> None:
+    print(f"{label:<28} median {statistics.median(samples) * 1000:8.1f} ms   "
+          f"min {min(samples) * 1000:8.1f} ms   max {max(samples) * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--hub", action="store_true", help="also time hub.pull (network)")
+    args = parser.parse_args()
+
+    baseline = time_snippet(BASELINE_SNIPPET, args.runs)
+    local = time_snippet(LOCAL_SNIPPET, args.runs)
+    report("import only (baseline)", baseline)
+    report("local registry", local)
+    print(f"{'  prompt load overhead':<28} {(statistics.median(local) - statistics.median(baseline)) * 1000:8.1f} ms")
+
+    if args.hub:
+        hub = time_snippet(HUB_SNIPPET, args.runs)
+        report("hub.pull", hub)
+        print(f"{'  speedup':<28} {statistics.median(hub) / statistics.median(local):8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# bench_rerun.py
+"""
+Streamlit rerun benchmark: module-level construction vs the process-wide agent registry.
+
+Every widget interaction re-executes the app script. This times the setup part of one rerun
+(ChatOpenAI + Amadeus client + initialize_agent) built from scratch, and the same rerun served from
+`common.agent_registry`. No network calls are made; dummy credentials are used.
+
+    python benchmarks/bench_rerun.py --runs 50
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "Agents"))
+
+from langchain.agents import AgentType, Tool, initialize_agent  # noqa: E402
+from langchain_openai import ChatOpenAI  # noqa: E402
+
+from common import agent_registry  # noqa: E402
+from common.agent_registry import get_agent, get_client  # noqa: E402
+
+try:
+    from amadeus import Client
+except ImportError:  # the Amadeus SDK is optional for this benchmark
+    Client = None
+
+
+def _tools():
+    return [Tool(name="Echo", func=lambda q: q, description="Echo the input.")]
+
+
+def rerun_rebuild():
+    llm = ChatOpenAI(model="gpt-3.5-turbo", temperature=0, openai_api_key="sk-bench")
+    if Client:
+        Client(client_id="bench", client_secret="bench")
+    return initialize_agent(_tools(), llm, agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION, verbose=False)
+
+
+def rerun_registry():
+    llm = get_client(ChatOpenAI, model="gpt-3.5-turbo", temperature=0, openai_api_key="sk-bench")
+    if Client:
+        get_client(Client, client_id="bench", client_secret="bench")
+    tools = _tools()
+    return get_agent(
+        "bench",
+        {"llm": id(llm), "tools": [t.name for t in tools]},
+        lambda: initialize_agent(tools, llm, agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION, verbose=False),
+    )
+
+
+def measure(fn, runs):
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=30)
+    args = parser.parse_args()
+
+    rerun_rebuild()  # warm imports so both paths are compared fairly
+    agent_registry.clear()
+    first = measure(rerun_registry, 1)[0]
+
+    rebuild = measure(rerun_rebuild, args.runs)
+    cached = measure(rerun_registry, args.runs)
+
+    print(f"rebuild every rerun     median {statistics.median(rebuild) * 1000:9.3f} ms")
+    print(f"registry (first build)         {first * 1000:9.3f} ms")
+    print(f"registry (cached)       median {statistics.median(cached) * 1000:9.3f} ms")
+    print(f"saved per interaction          {(statistics.median(rebuild) - statistics.median(cached)) * 1000:9.3f} ms")
+    print(f"registry stats: {agent_registry.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+# bench_service.py
+"""
+Load test for the headless agent service (Agents/agent_service.py), against local stand-ins.
+
+The OpenAI, Amadeus and OpenWeather stand-ins from standins.py are started in-process, the service
+is imported with its environment pointed at them, and requests are sent through
+`httpx.ASGITransport`: no server or sockets in front of the app, so the numbers show the service
+itself. For each endpoint, a warm-up request builds the agent. Then `--requests` requests are fired
+at once, with at most `--clients` in flight. The report shows p50/p95 latency, throughput and how
+many requests were shed with 503 by the endpoint limiter.
+
+Any response other than 200 or 503, or an output that reads as a tool error, counts as a failure
+and makes the script exit with status 1, so it doubles as a smoke test of the service.
+
+    pip install httpx uvicorn
+    python benchmarks/bench_service.py                                  # every endpoint, 200 requests each
+    python benchmarks/bench_service.py --endpoints weather todo --requests 500 --stream
+    python benchmarks/bench_service.py --service-concurrency 20 --max-queue 50   # watch backpressure
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "Agents"))
+
+from bench_agents import NO_CACHE_ENV, is_error, percentile  # noqa: E402
+from standins import StandIns  # noqa: E402
+
+DEPART, RETURN = "2026-12-18", "2026-12-21"
+FLIGHT_QUERY = f"Find flights from Delhi to Paris on {DEPART} returning on {RETURN}"
+HOTEL_QUERY = f"Find hotels in Paris from {DEPART} to {RETURN}"
+
+# endpoint -> (user input, tool calls the fake LLM makes before answering)
+ENDPOINTS = {
+    "flight": (FLIGHT_QUERY, [("Flight Search", FLIGHT_QUERY)]),
+    "lodging": (HOTEL_QUERY, [("Hotel Finder", HOTEL_QUERY)]),
+    "weather": ("What is the weather in Paris right now?", [("Weather Info", "Paris")]),
+    "todo": ("Add buy milk to my list", [("Add_Item", "buy milk")]),
+    "knowledgebot": ("Explain how a token bucket rate limiter works.", []),
+}
+
+
+def stream_output(text: str) -> str:
+    """Final output of an NDJSON event stream, or the error event's message."""
+    output = ""
+    for line in text.splitlines():
+        event = json.loads(line)
+        if event["type"] == "output":
+            output = event["output"]
+        elif event["type"] == "error":
+            return f"❌ {event['error']}"
+    return output
+
+
+async def call(client, name: str, text: str, session: str, stream: bool):
+    """(status, output) for one request."""
+    path = f"/agents/{name}/stream" if stream else f"/agents/{name}"
+    response = await client.post(path, json={"input": text, "session_id": session})
+    if response.status_code != 200:
+        return response.status_code, response.text
+    return 200, stream_output(response.text) if stream else response.json()["output"]
+
+
+async def run_endpoint(client, name: str, requests: int, clients: int, stream: bool) -> dict:
+    text, _ = ENDPOINTS[name]
+    start = time.perf_counter()
+    status, output = await call(client, name, text, "bench-warmup", stream)
+    first_ms = (time.perf_counter() - start) * 1000
+    if status != 200 or is_error(output):
+        return {"error": f"{status}: {str(output).strip()[:200]}"}
+
+    gate = asyncio.Semaphore(clients)
+    latencies, statuses, failures = [], [], []
+
+    async def one(i: int):
+        async with gate:
+            t0 = time.perf_counter()
+            status, output = await call(client, name, text, f"bench-{i}", stream)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            statuses.append(status)
+            if status not in (200, 503) or (status == 200 and is_error(output)):
+                failures.append(f"{status}: {str(output).strip()[:200]}")
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    wall = time.perf_counter() - wall_start
+
+    ok = [ms for ms, status in zip(latencies, statuses) if status == 200]
+    return {
+        "requests": requests,
+        "ok": len(ok),
+        "shed": statuses.count(503),
+        "failed": len(failures),
+        "first_failure": failures[0] if failures else "",
+        "first_call_ms": first_ms,
+        "p50_ms": percentile(ok, 50) if ok else 0.0,
+        "p95_ms": percentile(ok, 95) if ok else 0.0,
+        "throughput_rps": len(ok) / wall,
+    }
+
+
+def report(results: dict) -> None:
+    print(f"\n{'Endpoint':<14} {'reqs':>5} {'ok':>5} {'503':>5} {'fail':>5} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'ok/s':>8} {'first ms':>9}")
+    for name, r in results.items():
+        if "error" in r:
+            print(f"{name:<14}   failed: {r['error']}")
+            continue
+        print(f"{name:<14} {r['requests']:>5} {r['ok']:>5} {r['shed']:>5} {r['failed']:>5} {r['p50_ms']:9.1f} "
+              f"{r['p95_ms']:9.1f} {r['throughput_rps']:8.1f} {r['first_call_ms']:9.1f}")
+        if r["first_failure"]:
+            print(f"{'':<14}   first failure: {r['first_failure']}")
+
+
+async def run(args, standins: StandIns) -> dict:
+    import httpx
+    import agent_service
+
+    results = {}
+    transport = httpx.ASGITransport(app=agent_service.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://agent-service", timeout=None) as client:
+        for name in args.endpoints or list(ENDPOINTS):
+            print(f"running {name}: {args.requests} requests, {args.clients} in flight ...", file=sys.stderr)
+            standins.openai.script = ENDPOINTS[name][1]
+            results[name] = await run_endpoint(client, name, args.requests, args.clients, args.stream)
+        metrics = await client.get("/metrics")
+        if metrics.status_code != 200:
+            results["metrics"] = {"error": f"/metrics answered {metrics.status_code}"}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoints", nargs="*", choices=sorted(ENDPOINTS), help="default: all")
+    parser.add_argument("--requests", type=int, default=200, help="requests per endpoint")
+    parser.add_argument("--clients", type=int, default=200, help="requests in flight at once")
+    parser.add_argument("--stream", action="store_true", help="use the NDJSON streaming endpoints")
+    parser.add_argument("--llm-latency", type=float, default=300.0, help="ms per chat completion")
+    parser.add_argument("--api-latency", type=float, default=150.0, help="ms per Amadeus/OpenWeather request")
+    parser.add_argument("--jitter", type=float, default=50.0, help="random extra ms per request")
+    parser.add_argument("--service-concurrency", type=int, help="AGENT_SERVICE_CONCURRENCY for this run")
+    parser.add_argument("--max-queue", type=int, help="AGENT_SERVICE_MAX_QUEUE for this run")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_service_")
+    with StandIns(args.llm_latency, args.api_latency, args.jitter) as standins:
+        os.environ.update(standins.env())
+        os.environ.update(NO_CACHE_ENV)
+        os.environ.update({
+            "OFFER_CACHE_PATH": os.path.join(workdir, "offer_cache.sqlite3"),
+            "AGENT_TELEMETRY_PATH": os.path.join(workdir, "agent_telemetry.jsonl"),
+            "LLM_CACHE_PATH": os.path.join(workdir, "llm_cache.sqlite3"),
+            "AGENT_SERVICE_TODO_DB": os.path.join(workdir, "todo_list.sqlite3"),
+        })
+        if args.service_concurrency:
+            os.environ["AGENT_SERVICE_CONCURRENCY"] = str(args.service_concurrency)
+        if args.max_queue is not None:
+            os.environ["AGENT_SERVICE_MAX_QUEUE"] = str(args.max_queue)
+        os.chdir(workdir)
+
+        results = asyncio.run(run(args, standins))
+
+    report(results)
+    if any("error" in r or r["failed"] for r in results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
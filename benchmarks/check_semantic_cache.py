@@ -0,0 +1,106 @@
+# check_semantic_cache.py
+"""
+Functional checks for KnowledgeBot's semantic answer cache, fully offline.
+
+Uses `LocalHashEmbeddings` (no API key, no network) and a temporary index directory. Prints
+PASS/FAIL per check and exits with status 1 if any check fails.
+
+- a re-phrased question hits, an unrelated one misses, an empty cache misses;
+- entries past `max_entries` are evicted least recently used first (a lookup refreshes an entry);
+- the index and LRU order survive a reload from disk;
+- concurrent lookups do not wait for each other's embedding call (it runs outside the lock).
+
+    pip install faiss-cpu langchain-community
+    python benchmarks/check_semantic_cache.py
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "KnowledgeBot"))
+
+from semantic_cache import LocalHashEmbeddings, SemanticCache  # noqa: E402
+
+THRESHOLD = 0.8
+EMBED_DELAY = 0.2   # seconds per embedding call in the concurrency check, like a network round-trip
+
+failures = []
+
+
+def check(name: str, ok: bool, detail: str = "") -> None:
+    print(f"{'PASS' if ok else 'FAIL'}  {name}" + (f"  ({detail})" if detail and not ok else ""))
+    if not ok:
+        failures.append(name)
+
+
+class SlowEmbeddings(LocalHashEmbeddings):
+    def embed_query(self, text):
+        time.sleep(EMBED_DELAY)
+        return super().embed_query(text)
+
+
+def check_lookups() -> None:
+    cache = SemanticCache(LocalHashEmbeddings(), threshold=THRESHOLD)
+    check("empty cache misses", cache.lookup("What is the capital of France?") is None)
+
+    cache.add("What is the capital of France?", "Paris.")
+    answer = cache.lookup("what's the capital of france")
+    check("re-phrased question hits", answer == "Paris.", repr(answer))
+    answer = cache.lookup("How do vaccines train the immune system?")
+    check("unrelated question misses", answer is None, repr(answer))
+    check("hit rate counts hits and misses", cache.hits == 1 and cache.misses == 2, f"{cache.hits}/{cache.misses}")
+
+
+def check_eviction_and_reload(path: str) -> None:
+    cache = SemanticCache(LocalHashEmbeddings(), path=path, threshold=THRESHOLD, max_entries=2)
+    cache.add("What is the capital of France?", "Paris.")
+    cache.add("What is the boiling point of water?", "100 °C at sea level.")
+    cache.lookup("What is the capital of France?")   # France is now the most recently used
+    cache.add("Who wrote Hamlet?", "William Shakespeare.")
+
+    check("size stays at max_entries", len(cache) == 2, str(len(cache)))
+    check("least recently used entry is evicted", cache.lookup("What is the boiling point of water?") is None)
+    check("recently used entry survives", cache.lookup("What is the capital of France?") == "Paris.")
+
+    reloaded = SemanticCache(LocalHashEmbeddings(), path=path, threshold=THRESHOLD, max_entries=2)
+    check("reload keeps the entries", len(reloaded) == 2, str(len(reloaded)))
+    check("reloaded cache answers", reloaded.lookup("Who wrote Hamlet?") == "William Shakespeare.")
+
+
+def check_concurrent_lookups() -> None:
+    cache = SemanticCache(SlowEmbeddings(), threshold=THRESHOLD)
+    cache.add("What is the capital of France?", "Paris.")
+
+    sessions = 8
+    answers = []
+    threads = [threading.Thread(target=lambda: answers.append(cache.lookup("What is the capital of France?")))
+               for _ in range(sessions)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    check("concurrent lookups all hit", answers == ["Paris."] * sessions, repr(answers))
+    # Serialized embedding calls would take sessions * EMBED_DELAY
+    check("concurrent lookups embed in parallel", elapsed < 3 * EMBED_DELAY,
+          f"{elapsed:.2f}s for {sessions} lookups")
+
+
+def main():
+    check_lookups()
+    check_eviction_and_reload(tempfile.mkdtemp(prefix="check_semantic_cache_"))
+    check_concurrent_lookups()
+
+    print(f"\n{len(failures)} check(s) failed" if failures else "\nAll checks passed")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# check_service.py
+"""
+Functional checks for the headless agent service (Agents/agent_service.py), against local stand-ins.
+
+Starts the OpenAI, Amadeus and OpenWeather stand-ins, imports the service with its environment
+pointed at them and sends requests through `httpx.ASGITransport`. Each check states the expected
+response; the script prints PASS/FAIL per check and exits with status 1 if any check fails.
+
+- 200: /health, /metrics, a weather agent run (JSON and NDJSON stream)
+- 400: invalid JSON, missing or empty input
+- 404: unknown path, unknown agent
+- 405: GET on an agent endpoint
+- 413: request body over 64 KB
+- 503: a second request while the weather endpoint (concurrency 1, no queue) is busy
+- 504: a run longer than the service timeout
+
+    pip install httpx
+    python benchmarks/check_service.py
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "Agents"))
+
+from bench_agents import NO_CACHE_ENV, is_error  # noqa: E402
+from standins import StandIns  # noqa: E402
+
+LLM_LATENCY_MS = 300.0   # long enough for a second request to arrive while the first one runs
+WEATHER = {"input": "What is the weather in Paris right now?"}
+
+failures = []
+
+
+def check(name: str, ok: bool, detail: str = "") -> None:
+    print(f"{'PASS' if ok else 'FAIL'}  {name}" + (f"  ({detail})" if detail and not ok else ""))
+    if not ok:
+        failures.append(name)
+
+
+async def run_checks(service, client) -> None:
+    r = await client.get("/health")
+    check("GET /health -> 200", r.status_code == 200 and "weather" in r.json().get("agents", []), r.text)
+
+    r = await client.post("/agents/weather", json=WEATHER)
+    check("POST /agents/weather -> 200 with output",
+          r.status_code == 200 and not is_error(r.json().get("output", "")), r.text[:200])
+
+    r = await client.post("/agents/weather/stream", json=WEATHER)
+    events = [json.loads(line) for line in r.text.splitlines() if line.strip()] if r.status_code == 200 else []
+    check("POST /agents/weather/stream -> 200 ending in an output event",
+          bool(events) and events[-1]["type"] == "output" and not any(e["type"] == "error" for e in events),
+          r.text[:200])
+
+    r = await client.post("/agents/weather", content=b"{not json")
+    check("invalid JSON -> 400", r.status_code == 400, r.text)
+    r = await client.post("/agents/weather", json={"session_id": "x"})
+    check("missing input -> 400", r.status_code == 400, r.text)
+    r = await client.post("/agents/weather", json={"input": "   "})
+    check("empty input -> 400", r.status_code == 400, r.text)
+
+    r = await client.post("/agents/nope", json=WEATHER)
+    check("unknown agent -> 404", r.status_code == 404, r.text)
+    r = await client.post("/nothing/here", json=WEATHER)
+    check("unknown path -> 404", r.status_code == 404, r.text)
+
+    r = await client.get("/agents/weather")
+    check("GET on an agent -> 405 with Allow", r.status_code == 405 and r.headers.get("allow") == "POST", r.text)
+
+    r = await client.post("/agents/weather", json={"input": "x" * (70 * 1024)})
+    check("body over 64 KB -> 413", r.status_code == 413, r.text)
+
+    first, second = await asyncio.gather(
+        client.post("/agents/weather", json=WEATHER),
+        client.post("/agents/weather", json=WEATHER),
+    )
+    statuses = sorted([first.status_code, second.status_code])
+    shed = first if first.status_code == 503 else second
+    check("request beyond concurrency and queue -> 503 with Retry-After",
+          statuses == [200, 503] and shed.headers.get("retry-after") == "1", f"statuses {statuses}")
+
+    timeout = service.TIMEOUT
+    service.TIMEOUT = 0.05   # well under one stand-in LLM round-trip
+    try:
+        r = await client.post("/agents/weather", json=WEATHER)
+    finally:
+        service.TIMEOUT = timeout
+    check("run longer than AGENT_SERVICE_TIMEOUT -> 504", r.status_code == 504, r.text)
+
+    r = await client.get("/metrics")
+    check("GET /metrics -> 200 counting the shed request",
+          r.status_code == 200 and 'agent_service_rejected_total{endpoint="weather"} 1' in r.text, r.text[-300:])
+
+
+async def main_async(standins) -> None:
+    import httpx
+    import agent_service
+
+    transport = httpx.ASGITransport(app=agent_service.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://agent-service", timeout=None) as client:
+        await run_checks(agent_service, client)
+
+
+def main():
+    workdir = tempfile.mkdtemp(prefix="check_service_")
+    with StandIns(LLM_LATENCY_MS, 0.0, 0.0) as standins:
+        standins.openai.script = [("Weather Info", "Paris")]
+        os.environ.update(standins.env())
+        os.environ.update(NO_CACHE_ENV)
+        os.environ.update({
+            "OFFER_CACHE_PATH": os.path.join(workdir, "offer_cache.sqlite3"),
+            "AGENT_TELEMETRY_PATH": os.path.join(workdir, "agent_telemetry.jsonl"),
+            "LLM_CACHE_PATH": os.path.join(workdir, "llm_cache.sqlite3"),
+            "AGENT_SERVICE_TODO_DB": os.path.join(workdir, "todo_list.sqlite3"),
+            "AGENT_SERVICE_CONCURRENCY_WEATHER": "1",
+            "AGENT_SERVICE_MAX_QUEUE": "0",
+            "AGENT_SERVICE_TIMEOUT": "30",
+        })
+        os.chdir(workdir)
+        asyncio.run(main_async(standins))
+
+    print(f"\n{len(failures)} check(s) failed" if failures else "\nAll checks passed")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
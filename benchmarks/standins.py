@@ -0,0 +1,348 @@
+# standins.py
+"""
+Local stand-ins for OpenAI, Amadeus and OpenWeather, for offline benchmarks.
+
+Three small HTTP servers answer the endpoints the apps use:
+
+- OpenAI: POST /v1/chat/completions. Replies follow a script of tool calls (ReAct text for the
+  ZERO_SHOT / react-chat agents, `function_call` or `tool_calls` for function-calling agents) and
+  then a final answer; prompts without tools get a plain answer. Token usage is estimated from the
+  text (about 4 characters per token). `"stream": true` requests get the same reply as server-sent
+  `chat.completion.chunk` events.
+- Amadeus: OAuth token, city lookup, flight offers (the recorded DEL-PAR payload replicated to
+  `offers` entries), hotel list by city (`hotels` entries) and hotel offers.
+- OpenWeather: GET /data/2.5/weather.
+
+Each server has its own latency (plus random jitter) per request. `StandIns.env()` returns the
+environment variables that point the apps at the servers (see Agents/common/endpoints.py).
+
+    python benchmarks/standins.py --llm-latency 400 --api-latency 150
+    # then paste the printed `export ...` lines into another shell and `streamlit run` an app
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from bench_flight_offers import load_offers
+
+CHARS_PER_TOKEN = 4
+
+# "Action: the action to take, should be one of [Calculator, Web Search]"
+_REACT_TOOLS = re.compile(r"should be one of \[([^\]]*)\]")
+_REACT_OBSERVATION = re.compile(r"^Observation:", re.MULTILINE)
+_REACT_FORMAT_LINE = "Observation: the result of the action"
+
+
+class StandInServer:
+    """ThreadingHTTPServer on 127.0.0.1 with a per-request latency and a JSON route table."""
+
+    name = "stand-in"
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, port: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.requests = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+
+            def do_GET(self):
+                server._handle(self, "GET")
+
+            def do_POST(self):
+                server._handle(self, "POST")
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name=self.name, daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self.httpd.server_address[1]
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self) -> "StandInServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _handle(self, request: BaseHTTPRequestHandler, method: str) -> None:
+        with self._lock:
+            self.requests += 1
+        url = urlparse(request.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        length = int(request.headers.get("Content-Length") or 0)
+        body = request.rfile.read(length) if length else b""
+
+        delay = self.latency_ms + random.uniform(0, self.jitter_ms)
+        if delay:
+            time.sleep(delay / 1000)
+        status, payload = self.route(method, url.path, query, body)
+
+        # bytes are a pre-rendered event stream (streamed chat completions); anything else is JSON
+        data = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        request.send_response(status)
+        request.send_header("Content-Type", "text/event-stream" if isinstance(payload, bytes) else "application/json")
+        request.send_header("Content-Length", str(len(data)))
+        request.end_headers()
+        request.wfile.write(data)
+
+    def route(self, method: str, path: str, query: dict, body: bytes) -> Tuple[int, dict]:
+        raise NotImplementedError
+
+
+# -----------------------------
+# OpenAI
+# -----------------------------
+def _text(content) -> str:
+    if isinstance(content, list):  # multi-part content
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content or ""
+
+
+class FakeOpenAI(StandInServer):
+    """
+    OpenAI-compatible chat endpoint. `script` is the list of (tool, input) calls an agent makes
+    before answering; steps whose tool is not offered in the request are skipped, so one script
+    can serve several agents.
+    """
+
+    name = "fake-openai"
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, port: int = 0,
+                 script: Optional[List[Tuple[str, str]]] = None, answer_chars: int = 400):
+        super().__init__(latency_ms, jitter_ms, port)
+        self.script = script or []
+        self.answer_chars = answer_chars
+
+    def answer(self) -> str:
+        sentence = "Here is a summary based on the tool results. "
+        return (sentence * (self.answer_chars // len(sentence) + 1))[:self.answer_chars].strip()
+
+    def route(self, method, path, query, body):
+        if method != "POST" or not path.endswith("/chat/completions"):
+            return 404, {"error": {"message": f"unknown endpoint {path}", "type": "invalid_request_error"}}
+        request = json.loads(body or b"{}")
+        messages = request.get("messages", [])
+        prompt = "\n".join(_text(m.get("content")) for m in messages)
+
+        if request.get("functions") or request.get("tools"):
+            message, finish = self._function_call(request, messages)
+        elif _REACT_TOOLS.search(prompt):
+            message, finish = self._react(prompt), "stop"
+        else:
+            message, finish = {"role": "assistant", "content": self.answer()}, "stop"
+
+        completion = (message.get("content") or "") + json.dumps(message.get("function_call") or message.get("tool_calls") or "")
+        prompt_tokens = len(prompt) // CHARS_PER_TOKEN + 1
+        completion_tokens = len(completion) // CHARS_PER_TOKEN + 1
+        response = {
+            "id": f"chatcmpl-bench{self.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "gpt-3.5-turbo"),
+            "choices": [{"index": 0, "message": message, "finish_reason": finish}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }
+        if request.get("stream"):
+            return 200, self._event_stream(response, (request.get("stream_options") or {}).get("include_usage"))
+        return 200, response
+
+    def _event_stream(self, response: dict, include_usage: bool) -> bytes:
+        """The completion as SSE chunks: role, content a few words at a time (or the call), finish, [DONE]."""
+        message, finish = response["choices"][0]["message"], response["choices"][0]["finish_reason"]
+        deltas = [{"role": "assistant", "content": ""}]
+        if message.get("function_call"):
+            deltas.append({"function_call": message["function_call"]})
+        elif message.get("tool_calls"):
+            deltas.append({"tool_calls": [dict(call, index=i) for i, call in enumerate(message["tool_calls"])]})
+        else:
+            words = re.findall(r"\S+\s*", message.get("content") or "")
+            deltas += [{"content": "".join(words[i:i + 3])} for i in range(0, len(words), 3)]
+
+        base = {k: response[k] for k in ("id", "created", "model")}
+        chunks = [dict(base, object="chat.completion.chunk",
+                       choices=[{"index": 0, "delta": delta, "finish_reason": None}]) for delta in deltas]
+        chunks.append(dict(base, object="chat.completion.chunk", choices=[{"index": 0, "delta": {}, "finish_reason": finish}]))
+        if include_usage:
+            chunks.append(dict(base, object="chat.completion.chunk", choices=[], usage=response["usage"]))
+        return "".join(f"data: {json.dumps(chunk)}\n\n" for chunk in chunks).encode() + b"data: [DONE]\n\n"
+
+    def _next_step(self, offered: List[str], done: int) -> Optional[Tuple[str, str]]:
+        steps = [(tool, arg) for tool, arg in self.script if tool in offered]
+        return steps[done] if done < len(steps) else None
+
+    def _react(self, prompt: str) -> dict:
+        offered = [t.strip() for t in _REACT_TOOLS.search(prompt).group(1).split(",")]
+        done = len(_REACT_OBSERVATION.findall(prompt)) - prompt.count(_REACT_FORMAT_LINE)
+        step = self._next_step(offered, max(done, 0))
+        if step:
+            content = f"Thought: I should use {step[0]}.\nAction: {step[0]}\nAction Input: {step[1]}"
+        else:
+            content = f"Thought: I now know the final answer.\nFinal Answer: {self.answer()}"
+        return {"role": "assistant", "content": content}
+
+    def _function_call(self, request: dict, messages: list) -> Tuple[dict, str]:
+        if request.get("functions"):
+            offered = [f["name"] for f in request["functions"]]
+        else:
+            offered = [t["function"]["name"] for t in request["tools"]]
+        done = sum(1 for m in messages if m.get("role") in ("function", "tool"))
+        step = self._next_step(offered, done)
+        if not step:
+            return {"role": "assistant", "content": self.answer()}, "stop"
+
+        arguments = json.dumps({"__arg1": step[1]})  # single-input LangChain tools
+        if request.get("functions"):
+            return {"role": "assistant", "content": None,
+                    "function_call": {"name": step[0], "arguments": arguments}}, "function_call"
+        return {"role": "assistant", "content": None, "tool_calls": [{
+            "id": f"call_{done}", "type": "function", "function": {"name": step[0], "arguments": arguments},
+        }]}, "tool_calls"
+
+
+# -----------------------------
+# Amadeus
+# -----------------------------
+class FakeAmadeus(StandInServer):
+    name = "fake-amadeus"
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, port: int = 0,
+                 offers: int = 50, hotels: int = 60):
+        super().__init__(latency_ms, jitter_ms, port)
+        self.flight_offers = load_offers(offers)
+        self.hotel_count = hotels
+
+    def _hotel(self, i: int, city: str) -> dict:
+        return {
+            "hotelId": f"BN{city[:3].upper()}{i:04d}",
+            "name": f"Bench Hotel {i}",
+            "iataCode": city,
+            "address": {"lines": [f"{i} Rue du Test"], "cityName": city, "postalCode": "75001", "countryCode": "FR"},
+            "geoCode": {"latitude": 48.85, "longitude": 2.35},
+        }
+
+    def route(self, method, path, query, body):
+        if path == "/v1/security/oauth2/token":
+            return 200, {"type": "amadeusOAuth2Token", "access_token": "bench-token", "token_type": "Bearer",
+                         "expires_in": 1799, "state": "approved"}
+        if path == "/v1/reference-data/locations":
+            keyword = query.get("keyword", "XXX")
+            code = re.sub(r"[^A-Z]", "", keyword.upper())[:3].ljust(3, "X")
+            return 200, {"data": [{"type": "location", "subType": "CITY", "name": keyword.upper(), "iataCode": code,
+                                   "address": {"cityCode": code, "countryCode": "XX"}}]}
+        if path == "/v2/shopping/flight-offers":
+            offers = self.flight_offers[:int(query.get("max", len(self.flight_offers)))]
+            return 200, {"meta": {"count": len(offers)}, "data": offers}
+        if path == "/v1/reference-data/locations/hotels/by-city":
+            city = query.get("cityCode", "PAR")
+            return 200, {"data": [self._hotel(i, city) for i in range(self.hotel_count)]}
+        if path == "/v3/shopping/hotel-offers":
+            data = []
+            for n, hotel_id in enumerate(query.get("hotelIds", "").split(",")):
+                data.append({
+                    "type": "hotel-offers", "available": True,
+                    "hotel": {"hotelId": hotel_id, "name": f"Bench Hotel {hotel_id[-4:]}", "cityCode": hotel_id[2:5],
+                              "address": {"lines": [f"{n} Rue du Test"], "countryCode": "FR"}},
+                    "offers": [{"id": f"OF{hotel_id}", "checkInDate": query.get("checkInDate"),
+                                "checkOutDate": query.get("checkOutDate"),
+                                "price": {"currency": "EUR", "total": f"{90 + (n * 37) % 400:.2f}"}}],
+                })
+            return 200, {"data": data}
+        return 404, {"errors": [{"status": 404, "title": "NOT FOUND", "detail": path}]}
+
+
+# -----------------------------
+# OpenWeather
+# -----------------------------
+class FakeOpenWeather(StandInServer):
+    name = "fake-openweather"
+
+    def route(self, method, path, query, body):
+        if path != "/data/2.5/weather":
+            return 404, {"cod": 404, "message": "not found"}
+        return 200, {
+            "cod": 200, "name": query.get("q", "").title(),
+            "weather": [{"id": 800, "main": "Clear", "description": "clear sky"}],
+            "main": {"temp": 21.5, "feels_like": 20.9, "humidity": 40, "pressure": 1015},
+            "wind": {"speed": 3.1}, "sys": {"country": "XX"},
+        }
+
+
+class StandIns:
+    """The three stand-ins together; use as a context manager."""
+
+    def __init__(self, llm_latency_ms: float = 0.0, api_latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 offers: int = 50, hotels: int = 60, answer_chars: int = 400):
+        self.openai = FakeOpenAI(llm_latency_ms, jitter_ms, answer_chars=answer_chars)
+        self.amadeus = FakeAmadeus(api_latency_ms, jitter_ms, offers=offers, hotels=hotels)
+        self.weather = FakeOpenWeather(api_latency_ms, jitter_ms)
+
+    def __enter__(self) -> "StandIns":
+        for server in (self.openai, self.amadeus, self.weather):
+            server.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        for server in (self.openai, self.amadeus, self.weather):
+            server.stop()
+
+    def env(self) -> dict:
+        return {
+            "OPENAI_API_KEY": "sk-bench",
+            "OPENAI_BASE_URL": f"{self.openai.url}/v1",
+            "OPENAI_API_BASE": f"{self.openai.url}/v1",
+            "AMADEUS_CLIENT_ID": "bench",
+            "AMADEUS_CLIENT_SECRET": "bench",
+            "AMADEUS_HOST": "127.0.0.1",
+            "AMADEUS_PORT": str(self.amadeus.port),
+            "AMADEUS_SSL": "false",
+            "WEATHER_API_KEY": "bench",
+            "OPENWEATHER_URL": f"{self.weather.url}/data/2.5/weather",
+            "SERPAPI_API_KEY": "bench",
+        }
+
+    def request_counts(self) -> dict:
+        return {"openai": self.openai.requests, "amadeus": self.amadeus.requests, "openweather": self.weather.requests}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm-latency", type=float, default=300.0, help="ms per chat completion")
+    parser.add_argument("--api-latency", type=float, default=150.0, help="ms per Amadeus/OpenWeather request")
+    parser.add_argument("--jitter", type=float, default=50.0, help="random extra ms per request")
+    parser.add_argument("--offers", type=int, default=50, help="flight offers per search")
+    parser.add_argument("--hotels", type=int, default=60, help="hotels per city")
+    args = parser.parse_args()
+
+    with StandIns(args.llm_latency, args.api_latency, args.jitter, args.offers, args.hotels) as standins:
+        print("\n".join(f"export {k}={v}" for k, v in standins.env().items()))
+        print("\nStand-ins running; press Ctrl+C to stop.", flush=True)
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()